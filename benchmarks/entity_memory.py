@@ -0,0 +1,154 @@
+# Measures the memory used by each enemy and weapon, and how long reading and writing their most used attributes
+# takes, for comparing changes to how entities store their state (e.g. __slots__).
+# Results can be saved, and later runs compared against them - entity_baseline.json holds the results from before
+# Fighter, Enemy, Weapon and ScrollHeightActor used __slots__. As with run_benchmarks.py, times depend on the machine,
+# so compare results from the same machine.
+#
+# Usage: python benchmarks/entity_memory.py [--count N] [--baseline FILE] [--save-baseline]
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent))
+
+# Sets up Pygame Zero to run without a window, so must be imported before anything else from the game
+from game.systems.Headless import init_headless
+
+from pygame import Vector2
+
+from game.controls.AutoControls import AutoControls
+from game.entities.Barrel import Barrel
+from game.entities.EnemyKappa import EnemyKappa
+from game.entities.EnemyScooterboy import EnemyScooterboy
+from game.entities.EnemyVax import EnemyVax
+from game.systems.Game import Game
+import game.runtime as runtime
+
+DEFAULT_BASELINE = BENCHMARKS_DIR / "entity_baseline.json"
+
+ENTITY_TYPES = {
+    "EnemyVax": EnemyVax,
+    "EnemyKappa": EnemyKappa,
+    "EnemyScooterboy": EnemyScooterboy,
+    "Barrel": Barrel,
+}
+
+# Repetitions of each attribute access test, per entity
+ACCESS_REPEATS = 200
+
+# Timings are the best of this many runs, to reduce the effect of other activity on the machine
+TRIALS = 5
+
+
+def measure_memory(cls, count):
+    # Average bytes allocated per object, while creating count of them
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [cls(Vector2(400 + i % 400, 300 + i % 180)) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def measure_creation(cls, count):
+    # Microseconds to create each object
+    start = time.perf_counter()
+    objects = [cls(Vector2(400 + i % 400, 300 + i % 180)) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    del objects
+    return elapsed * 1000000 / count
+
+
+def measure_fighter_access(enemies):
+    # Nanoseconds per attribute access, reading and writing the attributes Fighter.update and Enemy.update use most
+    start = time.perf_counter()
+    for _ in range(ACCESS_REPEATS):
+        for enemy in enemies:
+            enemy.attack_timer -= 1
+            enemy.frame += 1
+            if enemy.hit_timer > 0 or enemy.height_above_ground > 0:
+                pass
+            enemy.state_timer -= 1
+            enemy.vpos.x += enemy.vel.x
+            if enemy.falling_state is None or enemy.weapon is not None:
+                pass
+    elapsed = time.perf_counter() - start
+    # 13 attribute accesses per enemy per repeat
+    return elapsed * 1000000000 / (ACCESS_REPEATS * len(enemies) * 13)
+
+
+def measure_weapon_access(weapons):
+    start = time.perf_counter()
+    for _ in range(ACCESS_REPEATS):
+        for weapon in weapons:
+            if not weapon.held and weapon.height_above_ground == 0:
+                weapon.vpos.x += weapon.vel.x
+                weapon.vel.x *= weapon.ground_friction
+    elapsed = time.perf_counter() - start
+    # 7 attribute accesses per weapon per repeat
+    return elapsed * 1000000000 / (ACCESS_REPEATS * len(weapons) * 7)
+
+
+def run(count):
+    results = {}
+    for name, cls in ENTITY_TYPES.items():
+        results[name] = {
+            "bytes_per_object": measure_memory(cls, count),
+            "create_us": min(measure_creation(cls, count) for _ in range(TRIALS)),
+        }
+    enemies = [EnemyVax(Vector2(400 + i % 400, 300)) for i in range(count)]
+    results["EnemyVax"]["access_ns"] = min(measure_fighter_access(enemies) for _ in range(TRIALS))
+    barrels = [Barrel(Vector2(400 + i % 400, 300)) for i in range(count)]
+    results["Barrel"]["access_ns"] = min(measure_weapon_access(barrels) for _ in range(TRIALS))
+    return results
+
+
+def print_results(results, baseline):
+    for name, result in results.items():
+        line = f"{name:<16}"
+        for key, value in result.items():
+            line += f"  {key} {value:9.1f}"
+            base = baseline.get(name, {}).get(key)
+            if base:
+                line += f" ({(value / base - 1) * 100:+6.1f}%)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory use and attribute access time of entities")
+    parser.add_argument("--count", type=int, default=2000, help="number of each type of entity to create (default: %(default)s)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="results to compare against or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    args = parser.parse_args()
+
+    init_headless()
+    with contextlib.redirect_stdout(io.StringIO()):
+        runtime.set_game(Game(AutoControls(), seed=1))
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["entities"]
+
+    results = run(args.count)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({"python": sys.version.split()[0], "count": args.count, "entities": results}, file, indent=1)
+        print(f"Saved baseline to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
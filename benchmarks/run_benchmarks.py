@@ -0,0 +1,181 @@
+# Measures how long Game.update and Game.draw take per frame in a set of scripted scenarios (see scenarios.py), run
+# without a window. Results can be saved as a baseline, and later runs compared against it, reporting any scenario
+# which has got slower by more than a threshold.
+# Timings depend on the machine, so the baseline should be saved on the same machine as it is compared on.
+#
+# Usage: python benchmarks/run_benchmarks.py [--scenario NAME ...] [--frames N] [--baseline FILE] [--save-baseline]
+#                                             [--threshold FRACTION] [--output FILE]
+# Exits with status 1 if any regressions were found
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent))
+
+# Sets up Pygame Zero to run without a window, so must be imported before anything else from the game
+from game.systems.Headless import init_headless
+
+import builtins
+import pygame
+import pgzero.game
+from pgzero.screen import Screen
+
+from game.config import WIDTH, HEIGHT
+import game.runtime as runtime
+from scenarios import get_scenarios
+
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+
+# Frames run before measuring starts, e.g. while images are loaded and caches filled
+WARMUP_FRAMES = 60
+
+# A scenario has regressed if it is this much slower than the baseline (as a fraction), and by at least MIN_REGRESSION_MS
+DEFAULT_THRESHOLD = 0.15
+MIN_REGRESSION_MS = 0.05
+
+# Measurements compared against the baseline
+COMPARED_STATS = ("mean", "p95")
+
+
+def init():
+    init_headless()
+    # Unlike a headless playthrough, we draw, so load each sprite's images at stage load as in the real game
+    runtime.atlas.preload = True
+
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    screen = Screen(surface)
+    runtime.set_screen(screen)
+    pgzero.game.screen = surface
+    builtins.screen = screen
+    return screen
+
+
+def summarise(times):
+    times_ms = sorted(t * 1000 for t in times)
+    count = len(times_ms)
+    return {
+        "mean": sum(times_ms) / count,
+        "p50": times_ms[count // 2],
+        "p95": times_ms[min(count - 1, int(count * 0.95))],
+        "max": times_ms[-1],
+    }
+
+
+def run_scenario(scenario, screen, frames):
+    update_times = []
+    draw_times = []
+    # The game prints when stages start etc, which would distort timings
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = scenario.create_game()
+        for frame in range(WARMUP_FRAMES + frames):
+            scenario.script(game, frame)
+            start = time.perf_counter()
+            game.update()
+            update_end = time.perf_counter()
+            game.draw(screen)
+            draw_end = time.perf_counter()
+            if frame >= WARMUP_FRAMES:
+                update_times.append(update_end - start)
+                draw_times.append(draw_end - update_end)
+        game.shutdown()
+    return {"frames": frames, "update": summarise(update_times), "draw": summarise(draw_times)}
+
+
+def compare(results, baseline, threshold):
+    # Returns a list of (scenario, part, stat, baseline ms, current ms) for each regression
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for part in ("update", "draw"):
+            for stat in COMPARED_STATS:
+                base_ms = base[part][stat]
+                current_ms = result[part][stat]
+                if current_ms > base_ms * (1 + threshold) and current_ms - base_ms >= MIN_REGRESSION_MS:
+                    regressions.append((name, part, stat, base_ms, current_ms))
+    return regressions
+
+
+def print_result(name, result, base):
+    line = f"{name:<18}"
+    for part in ("update", "draw"):
+        line += f"  {part} mean {result[part]['mean']:7.3f}ms p95 {result[part]['p95']:7.3f}ms"
+        if base is not None:
+            change = (result[part]["mean"] / base[part]["mean"] - 1) * 100 if base[part]["mean"] > 0 else 0.0
+            line += f" ({change:+5.1f}%)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Game.update and Game.draw in scripted scenarios")
+    parser.add_argument("--scenario", action="append", help="run only this scenario (can be given more than once)")
+    parser.add_argument("--frames", type=int, default=None, help="frames to measure per scenario (default: per scenario)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline file to compare against or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="fraction slower than the baseline which counts as a regression (default: %(default)s)")
+    parser.add_argument("--output", help="also save the results to this file")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args()
+
+    scenarios = get_scenarios()
+    if args.list:
+        for scenario in scenarios:
+            print(scenario.name)
+        return 0
+    if args.scenario:
+        unknown = set(args.scenario) - {scenario.name for scenario in scenarios}
+        if unknown:
+            parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.scenario]
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["scenarios"]
+
+    screen = init()
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(scenario, screen, args.frames or scenario.frames)
+        print_result(scenario.name, results[scenario.name], baseline.get(scenario.name))
+
+    data = {"python": sys.version.split()[0], "pygame": pygame.version.ver, "scenarios": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=1)
+    if args.save_baseline:
+        if args.scenario and os.path.exists(args.baseline):
+            # Only replace the scenarios which were run
+            with open(args.baseline, encoding="utf-8") as file:
+                saved = json.load(file)
+            saved["scenarios"].update(results)
+            data["scenarios"] = saved["scenarios"]
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=1)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline found at {args.baseline}, run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for name, part, stat, base_ms, current_ms in regressions:
+            print(f"  {name} {part} {stat}: {base_ms:.3f}ms -> {current_ms:.3f}ms ({(current_ms / base_ms - 1) * 100:+.1f}%)")
+        return 1
+    print(f"\nNo regressions over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
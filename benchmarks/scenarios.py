@@ -0,0 +1,185 @@
+import math
+from random import Random
+
+from pygame import Vector2
+
+from game.config import *
+from game.actors.Fighter import Fighter
+from game.controls.AutoControls import AutoControls
+from game.entities.Barrel import Barrel
+from game.entities.EnemyHoodie import EnemyHoodie
+from game.entities.EnemyKappa import EnemyKappa
+from game.entities.EnemyPortal import EnemyPortal
+from game.entities.EnemyVax import EnemyVax
+from game.systems.Game import Game
+from game.systems.Weather import WeatherSystem
+import game.runtime as runtime
+
+# Scripted situations for benchmarking Game.update and Game.draw, see run_benchmarks.py.
+# Each scenario creates a game in a particular state, and script is called before each frame to keep it in that state
+# (e.g. replacing defeated enemies) - so that each frame measured does a similar amount of work, and so that the game
+# doesn't move on to the next stage part way through
+
+
+class Scenario:
+    frames = 600
+    seed = 1
+
+    def __init__(self, name):
+        self.name = name
+
+    def create_game(self):
+        # Each scenario starts with no weather
+        runtime.set_weather(WeatherSystem())
+        game = Game(AutoControls(), seed=self.seed)
+        runtime.set_game(game)
+
+        # Skip the intro text and the fade in after it, and the first (empty) stage
+        game.text_active = False
+        game.timer = 255
+        game.stage_index = 0
+        self.setup(game)
+        return game
+
+    def setup(self, game):
+        pass
+
+    def script(self, game, frame):
+        # The player can't die, so that the scenario doesn't end early
+        game.player.health = game.player.start_health
+
+
+class BrawlScenario(Scenario):
+    # The player fighting a group of enemies, with defeated enemies replaced so there are always num_enemies of them
+    ENEMY_TYPES = (EnemyVax, EnemyHoodie, EnemyKappa)
+
+    def __init__(self, num_enemies):
+        super().__init__(f"brawl_{num_enemies}")
+        self.num_enemies = num_enemies
+        self.rng = Random(num_enemies)
+
+    def setup(self, game):
+        self.add_enemies(game)
+
+    def add_enemies(self, game):
+        while len(game.enemies) < self.num_enemies:
+            enemy_type = BrawlScenario.ENEMY_TYPES[self.rng.randrange(len(BrawlScenario.ENEMY_TYPES))]
+            pos = (game.scroll_offset.x + self.rng.randint(50, WIDTH - 50), self.rng.randint(MIN_WALK_Y, HEIGHT - 1))
+            game.spawn_enemy(enemy_type(pos, start_timer=self.rng.randint(0, 60)))
+
+    def script(self, game, frame):
+        super().script(game, frame)
+        self.add_enemies(game)
+
+
+class PortalScenario(Scenario):
+    # A portal which spawns an enemy every two seconds, up to MAX_ENEMIES at once. The portal is replaced if destroyed
+    MAX_ENEMIES = 12
+    frames = 1200
+
+    def __init__(self):
+        super().__init__("portal")
+
+    def setup(self, game):
+        self.add_portal(game)
+
+    def add_portal(self, game):
+        # Portals can only spawn enemy types which they have a spawning animation for
+        portal = EnemyPortal((game.scroll_offset.x + WIDTH - 150, 400), (EnemyVax, EnemyHoodie),
+                             spawn_interval=120, max_enemies=PortalScenario.MAX_ENEMIES, start_timer=0)
+        game.spawn_enemy(portal)
+
+    def script(self, game, frame):
+        super().script(game, frame)
+        if not any(isinstance(enemy, EnemyPortal) for enemy in game.enemies):
+            self.add_portal(game)
+
+
+class BarrelScenario(Scenario):
+    # Barrels rolling back and forth across the screen, among a few enemies. Whenever a barrel has slowed down or has
+    # left the screen, it is thrown back the other way
+    NUM_BARRELS = 8
+
+    def __init__(self):
+        super().__init__("barrel_ping_pong")
+
+    def setup(self, game):
+        self.brawl = BrawlScenario(4)
+        self.brawl.setup(game)
+        for i in range(BarrelScenario.NUM_BARRELS):
+            barrel = Barrel(Vector2(100 + i * 80, MIN_WALK_Y + 20 + i * 18))
+            game.weapons.append(barrel)
+            self.throw(barrel, 1 if i % 2 == 0 else -1)
+
+    def throw(self, barrel, dir_x):
+        # As if thrown by a fighter (with nobody to be immune to being hit by it), who must first pick it up
+        barrel.pick_up(Fighter.WEAPON_HOLD_HEIGHT)
+        barrel.throw(dir_x, None)
+
+    def script(self, game, frame):
+        self.brawl.script(game, frame)
+        for weapon in game.weapons:
+            if isinstance(weapon, Barrel) and not weapon.held:
+                screen_x = weapon.vpos.x - game.scroll_offset.x
+                if abs(weapon.vel.x) < 1 or screen_x < 0 or screen_x > WIDTH:
+                    # Throwing moves the barrel forward, so start it far enough from the edge to stay on screen
+                    weapon.vpos.x = min(max(weapon.vpos.x, game.scroll_offset.x + 150), game.scroll_offset.x + WIDTH - 150)
+                    self.throw(weapon, 1 if screen_x < WIDTH / 2 else -1)
+
+
+class WeatherScenario(Scenario):
+    # Heavy weather during a fight with a few enemies
+    INTENSITY = 2000
+
+    def __init__(self, kind):
+        super().__init__(f"weather_{kind}")
+        self.kind = kind
+
+    def setup(self, game):
+        self.brawl = BrawlScenario(4)
+        self.brawl.setup(game)
+        runtime.weather.reseed(self.seed)
+        runtime.weather.set_weather({"type": self.kind, "intensity": WeatherScenario.INTENSITY, "ramp_seconds": 0})
+
+    def script(self, game, frame):
+        self.brawl.script(game, frame)
+
+
+class CreditsScenario(Scenario):
+    frames = 1500
+
+    def __init__(self):
+        super().__init__("credits")
+
+    def setup(self, game):
+        runtime.weather.reseed(self.seed)
+        runtime.weather.set_weather("snow")
+        game.credits_active = True
+        game.start_credits()
+
+
+class ScrollScenario(Scenario):
+    # Scrolling through the whole level, from the first background tile to the last
+    frames = 1000
+
+    def __init__(self):
+        super().__init__("long_scroll")
+        self.level_width = len(BACKGROUND_TILES) * BACKGROUND_TILE_SPACING
+        self.speed = math.ceil(self.level_width / ScrollScenario.frames)
+
+    def setup(self, game):
+        game.max_scroll_offset_x = self.level_width + WIDTH
+
+    def script(self, game, frame):
+        super().script(game, frame)
+        game.scroll_offset.x = (frame * self.speed) % self.level_width
+        game.boundary.left = game.scroll_offset.x
+        game.player.vpos.x = game.scroll_offset.x + WIDTH / 3
+
+
+def get_scenarios():
+    scenarios = [BrawlScenario(num_enemies) for num_enemies in (1, 2, 4, 8, 16, 32, 64)]
+    scenarios += [PortalScenario(), BarrelScenario()]
+    scenarios += [WeatherScenario(kind) for kind in ("rain", "snow", "leaves")]
+    scenarios += [CreditsScenario(), ScrollScenario()]
+    return scenarios
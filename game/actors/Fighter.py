@@ -1,6 +1,5 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from random import randint
 
 from pygame import Vector2, Rect
 import pgzero
@@ -8,12 +7,30 @@ import pgzero
 from game.config import *
 from game.utils import *
 from game.actors.ScrollHeightActor import ScrollHeightActor
+from game.assets.AnimationAtlas import anim_id, BLANK_HANDLE
 from game.combat.attacks_data import ATTACKS
 from game.entities.Scooter import Scooter
+from game.systems.SoundBank import SOUND_PRIORITY_LOW
 import game.runtime as runtime
 
 
+# Animation ids for the animation types used by all fighters, see AnimationAtlas
+ANIM_KNOCKED_OFF = anim_id("knocked_off")
+ANIM_DIE = anim_id("die")
+ANIM_KNOCKDOWN = anim_id("knockdown")
+ANIM_GETUP = anim_id("getup")
+ANIM_THROWN = anim_id("thrown")
+ANIM_HIT = anim_id("hit")
+ANIM_WALK = anim_id("walk")
+ANIM_STAND = anim_id("stand")
+
+
 class Fighter(ScrollHeightActor, ABC):
+    __slots__ = ("speed", "sprite", "anim_update_rate", "stand_frames", "facing_x", "frame", "last_attack",
+                 "attack_timer", "falling_state", "walking", "vel", "pickup_animation", "hit_timer", "hit_frame",
+                 "stamina", "max_stamina", "half_hit_area", "health", "start_health", "lives", "colour_variant",
+                 "anim_table", "hit_sound", "weapon", "just_knocked_off_scooter", "use_die_animation", "logs")
+
     WEAPON_HOLD_HEIGHT = 100
 
     class FallingState(Enum):
@@ -27,6 +44,8 @@ class Fighter(ScrollHeightActor, ABC):
         if DEBUG_LOGGING_ENABLED:
             l = f"{runtime.game.timer} {str} {self.vpos}"
             print(self, l)
+            if self.logs is None:
+                self.logs = []
             self.logs.append(l)
 
     def __init__(self, pos, anchor, speed, sprite, health, anim_update_rate=8, stamina=500, half_hit_area=Vector2(25, 20), lives=1, colour_variant=None, separate_shadow=False, hit_sound=None):
@@ -80,6 +99,9 @@ class Fighter(ScrollHeightActor, ABC):
         # Used for enemies with multiple colour variants - appended to sprite name
         self.colour_variant = colour_variant
 
+        # Table of image handles for each of our animation frames, created by load_animations
+        self.anim_table = None
+
         self.hit_sound = hit_sound
 
         self.weapon = None
@@ -89,7 +111,8 @@ class Fighter(ScrollHeightActor, ABC):
 
         self.use_die_animation = False
 
-        self.logs = []
+        # Debug log messages, created on first use, see log
+        self.logs = None
 
     def update(self):
         self.attack_timer -= 1
@@ -122,6 +145,15 @@ class Fighter(ScrollHeightActor, ABC):
 
             self.frame += 1
 
+            # Check if we need to transition from the knocked off scooter animation to the knockdown stage. This used
+            # to happen in determine_sprite, but it has a side effect on the game, so it must also happen when the game
+            # is running without drawing anything
+            if self.just_knocked_off_scooter and self.frame > 10:
+                self.just_knocked_off_scooter = False
+
+                # Create the scooter as an independent object
+                runtime.game.scooters.append(Scooter(self.vpos, self.facing_x, self.colour_variant))
+
             if self.frame > 120:
                 # If we're not yet out of health, get up and reset stamina
                 if self.health > 0:
@@ -196,7 +228,8 @@ class Fighter(ScrollHeightActor, ABC):
                 # Before deciding if we want to attack - do we instead want to pick up or drop a weapon?
                 if self.weapon is None:
                     # Find weapons within reach
-                    nearby_weapons = [weapon for weapon in runtime.game.weapons if (weapon.vpos - self.vpos).length() < 50]
+                    nearby_weapons = [weapon for weapon in runtime.game.spatial_index.get_weapons_near(self.vpos, 50)
+                                      if (weapon.vpos - self.vpos).length() < 50]
                     if len(nearby_weapons) > 0:
                         if self.determine_pick_up_weapon():
                             # Sort nearby weapons by distance. length_squared is used to order them instead of
@@ -228,7 +261,7 @@ class Fighter(ScrollHeightActor, ABC):
                         if attack.initial_sound is not None:
                             # * = unpack the elements of the tuple (sound to play, and number of variations) into
                             # arguments to pass to play_sound
-                            runtime.game.play_sound(*attack.initial_sound)
+                            runtime.game.play_sound(*attack.initial_sound, priority=SOUND_PRIORITY_LOW)
 
                         # Is this a flying kick?
                         if attack.flying_kick:
@@ -267,10 +300,8 @@ class Fighter(ScrollHeightActor, ABC):
                 # Currently attacking
                 self.frame += 1
 
-                frame = self.get_attack_frame()
-
                 # If current frame of attack is a hit frame, inflict damage to enemies
-                if frame in self.last_attack.hit_frames:
+                if self.last_attack.is_hit_frame[self.get_attack_frame_index()]:
                     # Is this a throw attack?
                     if self.last_attack.throw:
                         # If the current attack is a grab attack, that means we're the boss throwing the player
@@ -327,7 +358,7 @@ class Fighter(ScrollHeightActor, ABC):
                 # Hit timer ensures we can't receive damage again until it's counted down, and stuns the fighter
                 # Stronger attacks stun for longer
                 self.hit_timer = attack.strength * 8 * attack.stun_time_multiplier
-                self.hit_frame = randint(0, 1)
+                self.hit_frame = runtime.rng.randint(0, 1)
 
                 # Stop our attack if we're in the middle of one - unless it's a flying kick, in which case continue.
                 # Code elsewhere will ensure we don't do the 'been hit' animation at the end of a flying kick
@@ -357,7 +388,7 @@ class Fighter(ScrollHeightActor, ABC):
                     # If we're knocked down due to being out of stamina, and we're close to death, just die already
                     if self.health < 3:
                         self.health = 0
-                        self.use_die_animation = (randint(0,1) == 0)    # Use die animation 50% of the time
+                        self.use_die_animation = (runtime.rng.randint(0,1) == 0)    # Use die animation 50% of the time
 
                 # If the attacker was using a weapon, tell the weapon that it was used
                 # Must check that hitter is a Fighter, as it might be a barrel!
@@ -378,11 +409,20 @@ class Fighter(ScrollHeightActor, ABC):
         # EnemyHoodie may drop stick on death
         pass
 
-    def draw(self, offset):
+    def load_animations(self):
+        # Look up (and, unless running headless, load) all of our animation frames. Called when the stage is set up so
+        # that this doesn't cause a delay the first time each animation is shown
+        if self.anim_table is None:
+            self.anim_table = runtime.atlas.get_table(self.sprite, self.colour_variant)
+
+    def add_blits(self, blits, offset):
         # Determine sprite to use based on our current action
-        self.image = self.determine_sprite()
+        self.set_image_handle(self.determine_sprite())
+
+        super().add_blits(blits, offset)
 
-        super().draw(offset)
+    def draw_debug(self, offset):
+        super().draw_debug(offset)
 
         if DEBUG_SHOW_HEALTH_AND_STAMINA:
             text = f"HP: {self.health}\nSTM: {self.stamina}"
@@ -391,13 +431,14 @@ class Fighter(ScrollHeightActor, ABC):
         if DEBUG_SHOW_HIT_AREA_WIDTH:
             screen.draw.rect(Rect(self.x - self.half_hit_area.x, self.y - self.half_hit_area.y, self.half_hit_area.x * 2, self.half_hit_area.y * 2), (255,255,255))
 
-        if DEBUG_SHOW_LOGS:
+        if DEBUG_SHOW_LOGS and self.logs is not None:
             y = self.y
             for l in reversed(self.logs):
                 screen.draw.text(l, fontsize=14, center=(self.x, y), color="#FFFFFF", align="center")
                 y += 10
 
     def determine_sprite(self):
+        # Returns the handle of the image to display, see AnimationAtlas
         show = True
 
         if self.falling_state == Fighter.FallingState.FALLING:
@@ -408,99 +449,82 @@ class Fighter(ScrollHeightActor, ABC):
             if show:
                 # When we fall down, we stay on the last frame (2) for an extended period
                 # If we've only just fallen off a scooter, play knocked_off frame 0 before
-                # continuing from knockdown frame 1
+                # continuing from knockdown frame 1 (the transition happens in update)
                 if self.just_knocked_off_scooter:
-                    # Check if we need to transition to the knockdown stage of the animation
-                    if self.frame > 10:
-                        self.just_knocked_off_scooter = False
-
-                        # Create the scooter as an independent object
-                        runtime.game.scooters.append(Scooter(self.vpos, self.facing_x, self.colour_variant))
-
-                # Now choose the sprite to use this frame
-                if self.just_knocked_off_scooter:
-                    anim_type = "knocked_off"
+                    anim_type = ANIM_KNOCKED_OFF
                     frame = 0
                 elif self.use_die_animation:
-                    anim_type = "die"
+                    anim_type = ANIM_DIE
                     frame = min(self.frame // 20, 2)
                 else:
                     last_frame = 3 if self.__class__.__name__ == "EnemyScooterboy" else 2
-                    anim_type = "knockdown"
+                    anim_type = ANIM_KNOCKDOWN
                     frame = min(self.frame // 10, last_frame)
 
         elif self.falling_state == Fighter.FallingState.GETTING_UP:
-            anim_type = "getup"
+            anim_type = ANIM_GETUP
             frame = min(self.frame // 10, 1)
 
         elif self.falling_state == Fighter.FallingState.GRABBED:
             show = False
 
         elif self.falling_state == Fighter.FallingState.THROWN:
-            anim_type = "thrown"
+            anim_type = ANIM_THROWN
             frame = min(self.frame // 12, 3)
 
         elif self.hit_timer > 0:
             frame = self.hit_frame
-            anim_type = "hit"
+            anim_type = ANIM_HIT
 
         elif self.pickup_animation is not None:
             # Doing animation for picking up a weapon
             frame = min(self.frame // 12, self.weapon.end_pickup_frame)
-            anim_type = f"pickup_{self.pickup_animation}"
+            anim_type = self.weapon.pickup_anim_id
 
         elif self.attack_timer > 0:
-            # Currently attacking
-            anim_type = self.last_attack.sprite
-            frame = self.get_attack_frame()
+            # Currently attacking. The image for each game frame of each attack is worked out once, see SpriteTable
+            facing_id = 1 if self.facing_x == 1 else 0
+            if self.anim_table is None:
+                self.load_animations()
+            return self.anim_table.get_attack_handles(self.last_attack, facing_id)[self.get_attack_frame_index()]
 
         else:
             # Walking or standing
+            # The weapon name is part of the walking/standing animation type when holding a weapon (e.g. walk_stick).
+            # This isn't done for weapon attack animations, because barrel is released during the throw animation
             if self.walking:
                 # There are four walk animation frames, we take self.frame (an unbounded number incrementing by 1 each
                 # game frame) and divide it by self.anim_update_rate (giving that many frames of delay between
                 # switching animation frames), the result of that is MODded 4 to reduce it to the actual animation
                 # frame to use in the range 0-3
-                anim_type = "walk"
+                anim_type = ANIM_WALK if self.weapon is None else self.weapon.walk_anim_id
                 frame = (self.frame // self.anim_update_rate) % 4  # 4 frames of walking animation
             else:
                 # Standing
                 # Use anim_type stand or walk depending on whether we have a weapon - we only have 'walk' sprites
                 # for weapons
                 if(self.weapon is None):
-                    anim_type = "stand"
+                    anim_type = ANIM_STAND
                     frame = (self.frame // self.anim_update_rate) % self.stand_frames
                 else:
-                    anim_type = "walk"
+                    anim_type = self.weapon.walk_anim_id
                     frame = 0
-                
-
-            # Add the weapon name to the walking/standing animation
-            # This isn't done for weapon attack animations, because barrel is released during the throw animation
-            anim_type += ("_" + self.weapon.name) if self.weapon is not None else ""
 
         if show:
             # In sprite filenames, 0 = facing left, 1 = right
             facing_id = 1 if self.facing_x == 1 else 0
-            image = f"{self.sprite}_{anim_type}_{facing_id}_{frame}"
-            if self.colour_variant is not None:
-                image += "_" + str(self.colour_variant)
-            sprite_dir = SPRITE_DIRS.get(self.sprite, "")
-            if sprite_dir:
-                image = f"{sprite_dir}/{image}"
+            if self.anim_table is None:
+                self.load_animations()
+            return self.anim_table.lookup(anim_type, facing_id, frame)
         else:
-            image = BLANK_IMAGE
-
-        return image
+            return BLANK_HANDLE
 
-    def get_attack_frame(self):
-        # return value of this function is an animation frame, e.g. we are on the third frame of the punch animation
-        # self.frame is a game frame, increasing by 1 every 1/60th of a second
+    def get_attack_frame_index(self):
+        # Index into the current attack's per-game-frame tables (see Attack), i.e. the number of game frames since we
+        # started the attack. self.frame is a game frame, increasing by 1 every 1/60th of a second
         # We use self.last_attack to get the current attack that we're doing, i.e. it's the last attack we started
         # doing, and we're still doing it
-        frame = (self.frame // self.last_attack.frame_time)
-        frame = min(frame, self.last_attack.frames - 1)
-        return frame
+        return min(self.frame, self.last_attack.last_frame_index)
 
     def override_walking(self):
         # Used by subclasses to prevent the usual walking/attacking behaviour
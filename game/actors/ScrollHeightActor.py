@@ -1,7 +1,10 @@
+from pgzero.actor import calculate_anchor
 from pgzero.builtins import Actor
 from pygame import Vector2
 
 from game import config
+from game.assets.AnimationAtlas import BLANK_HANDLE
+import game.runtime as runtime
 
 
 # The ScrollHeightActor class extends Pygame Zero's Actor class by providing the attribute 'vpos', which stores the
@@ -12,31 +15,106 @@ from game import config
 # should be taken into account when determining draw order, as a fighter who is jumping will be further up the screen
 # on the Y axis than if they were on the ground, but it's their Y position in relation to the ground which should
 # determine whether they're drawn behind or in front of other actors.
+# Images are tracked by their handle in the animation atlas (see AnimationAtlas), so that fighters can switch sprites
+# each frame without building and looking up filenames. Setting image by name still works, and gives the same result.
+# Images from the sprite sheets have been trimmed of their transparent borders (see sheet_packer). The actor's rect and
+# anchor point are still worked out from the size of the original image, so that positions are the same whether the
+# image has been trimmed or not, and the trimmed image is drawn image_offset from the rect's top left corner, where its
+# pixels were in the original image. Rotating actors (Actor.angle) isn't supported.
+# This class and its main subclasses (Fighter, Enemy, Weapon) list their attributes in __slots__, which makes them
+# quicker to access and the objects smaller - see benchmarks/entity_memory.py. Actor's own attributes are still stored
+# in each object's __dict__
 class ScrollHeightActor(Actor):
+    __slots__ = ("image_handle", "image_offset", "vpos", "height_above_ground", "shadow_actor")
+
+    # Every attribute set on an Actor is checked against this, to see whether it should be passed on to the Actor's
+    # rect (e.g. x, topleft). Actor has it as a list, which is slow to search
+    DELEGATED_ATTRIBUTES = frozenset(Actor.DELEGATED_ATTRIBUTES)
+
     def __init__(self, img, pos, anchor=None, separate_shadow=False):
+        # Handle of the current image, -1 until an image has been set. Actor's constructor sets the image
+        self.image_handle = -1
         super().__init__(img, pos, anchor=anchor)
         self.vpos = Vector2(pos)
         self.height_above_ground = 0
         if separate_shadow:
-            self.shadow_actor = Actor(config.BLANK_IMAGE, pos, anchor=anchor)
+            self.shadow_actor = ScrollHeightActor(config.BLANK_IMAGE, pos, anchor=anchor)
         else:
             self.shadow_actor = None
 
     # We draw with the supplied Vector2 offset to enable scrolling
     def draw(self, offset):
+        # Draw on our own - the game draws its objects together through its RenderQueue instead
+        blits = []
+        self.add_blits(blits, offset)
+        screen.surface.blits(blits, doreturn=False)
+        self.draw_debug(offset)
+
+    def add_blits(self, blits, offset):
+        # Add the (surface, screen position) pairs to draw us to blits, in the order they should be drawn
         # Draw shadow first, if we are using a separate shadow sprite (most have the shadow as part of the sprite
         # but for player it is separate)
         if self.shadow_actor is not None:
-            self.shadow_actor.pos = (self.vpos.x - offset.x, self.vpos.y - offset.y)
-            self.shadow_actor.image = config.BLANK_IMAGE if self.image == config.BLANK_IMAGE else self.image + "_shadow"
-            self.shadow_actor.draw()
+            # The shadow is always on the ground, directly below us
+            self.shadow_actor.vpos = self.vpos
+            if self.image_handle == BLANK_HANDLE:
+                self.shadow_actor.set_image_handle(BLANK_HANDLE)
+            else:
+                self.shadow_actor.set_image_handle(runtime.atlas.get_shadow(self.image_handle))
+            self.shadow_actor.add_blits(blits, offset)
 
-        # Set Actor's screen pos
-        self.pos = (self.vpos.x - offset.x, self.vpos.y - offset.y - self.height_above_ground)
-        super().draw()
+        self.update_screen_pos(offset)
+        # The blank image is fully transparent, so there's nothing to draw
+        if self.image_handle != BLANK_HANDLE:
+            # Pygame rounds blit positions towards zero, so the position the original image would have been drawn at is
+            # worked out first
+            left, top = self.topleft
+            offset_x, offset_y = self.image_offset
+            blits.append((self._surf, (int(left) + offset_x, int(top) + offset_y)))
+
+    def draw_debug(self, offset):
+        # Called after add_blits, once the blits have been drawn
         if config.DEBUG_SHOW_ANCHOR_POINTS:
             screen.draw.circle(self.pos, 5, (255, 255, 255))
 
+    @property
+    def image(self):
+        return self._image_name
+
+    @image.setter
+    def image(self, image):
+        self.set_image_handle(runtime.atlas.get_handle(image))
+
+    def set_image_handle(self, handle):
+        # Nothing to do if the image hasn't changed, which is the case on most frames
+        if handle == self.image_handle:
+            return
+        atlas = runtime.atlas
+        self.image_handle = handle
+        self._image_name = atlas.names[handle]
+        self._orig_surf = self._surf = atlas.get_surface(handle)
+        self.image_offset = atlas.offsets[handle]
+        self._update_pos()
+
+    def _update_pos(self):
+        # Replaces Actor's version, which sizes the rect to the (possibly trimmed) surface
+        pos = self.pos
+        self.width, self.height = runtime.atlas.sizes[self.image_handle]
+        self._calc_anchor()
+        self.pos = pos
+
+    def _calc_anchor(self):
+        # Replaces Actor's version, which works out the anchor point from the size of the (possibly trimmed) surface
+        anchor_x, anchor_y = self._anchor_value
+        width, height = runtime.atlas.sizes[self.image_handle]
+        self._anchor = self._untransformed_anchor = (calculate_anchor(anchor_x, "x", width),
+                                                     calculate_anchor(anchor_y, "y", height))
+
+    def update_screen_pos(self, offset):
+        # Set Actor's screen pos. Normally this happens as part of drawing, but when running headless (no draw calls)
+        # it must be called each frame so that code which relies on the screen position, such as on_screen, still works
+        self.pos = (self.vpos.x - offset.x, self.vpos.y - offset.y - self.height_above_ground)
+
     def on_screen(self):
         # Use self.x rather than self.vpos.x to get actual screen position rather than world position
         # Note that self.x only updates when the actor is drawn, so if vpos.x is updated during update causing the
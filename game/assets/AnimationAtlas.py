@@ -0,0 +1,198 @@
+import os
+
+import pgzero.loaders
+
+from game.config import BLANK_IMAGE, SPRITE_DIRS
+
+
+# Animation types (e.g. "walk", "rpunch", "pickup_stick") are interned to integer ids when the game loads, so that
+# choosing a sprite each frame can index lists rather than building filenames and looking them up by name
+ANIM_NAMES = []
+ANIM_IDS = {}
+
+
+def anim_id(name):
+    if name not in ANIM_IDS:
+        ANIM_IDS[name] = len(ANIM_NAMES)
+        ANIM_NAMES.append(name)
+    return ANIM_IDS[name]
+
+
+# Handle of the blank image, always the first image in the atlas
+BLANK_HANDLE = 0
+
+
+class SpriteTable:
+    # Image handles for every animation frame of one sprite (e.g. "hero") in one colour variant (or None for sprites
+    # which don't have colour variants), indexed by [anim_id][facing][frame], where facing is 0 for left or 1 for right
+
+    def __init__(self, atlas, sprite, colour_variant):
+        self.atlas = atlas
+        self.sprite = sprite
+        self.colour_variant = colour_variant
+        sprite_dir = SPRITE_DIRS.get(sprite, "")
+        self.prefix = f"{sprite_dir}/" if sprite_dir else ""
+        self.frames = []
+        # Attack id -> image handles for each game frame of that attack, for each facing, see get_attack_handles
+        self.attack_handles = {}
+
+    def add(self, anim, facing, frame, handle):
+        while len(self.frames) <= anim:
+            self.frames.append(None)
+        if self.frames[anim] is None:
+            self.frames[anim] = [[], []]
+        frames = self.frames[anim][facing]
+        while len(frames) <= frame:
+            frames.append(None)
+        frames[frame] = handle
+
+    def get_name(self, anim, facing, frame):
+        name = f"{self.prefix}{self.sprite}_{ANIM_NAMES[anim]}_{facing}_{frame}"
+        if self.colour_variant is not None:
+            name += f"_{self.colour_variant}"
+        return name
+
+    def lookup(self, anim, facing, frame):
+        try:
+            handle = self.frames[anim][facing][frame]
+            if handle is not None:
+                return handle
+        except (IndexError, TypeError):
+            pass
+        # Not found when the table was built (e.g. the animation type was first used after that), so resolve it by
+        # name. This only happens once for each frame
+        handle = self.atlas.get_handle(self.get_name(anim, facing, frame))
+        self.add(anim, facing, frame, handle)
+        return handle
+
+    def get_attack_handles(self, attack, facing):
+        # Image handle for each game frame of the attack (see Attack.anim_frames), worked out the first time this sprite
+        # performs it
+        handles = self.attack_handles.get(attack.id)
+        if handles is None:
+            handles = self.attack_handles[attack.id] = [
+                [self.lookup(attack.anim_id, facing_id, frame) for frame in attack.anim_frames] for facing_id in range(2)]
+        return handles[facing]
+
+
+class AnimationAtlas:
+    # Every image used by actors is given an integer handle the first time it is used. Actors then switch images by
+    # handle rather than by name, which avoids building filename strings and looking them up each frame.
+    # Surfaces are loaded through sprite_sheets (see SpriteSheets), from the packed sprite sheets if they have been made,
+    # otherwise through Pygame Zero's image loader, in which case they are shared with anything that loads the same
+    # image by name. Recoloured images aren't kept here, as sprite_sheets limits how many of them are kept.
+
+    def __init__(self, sprite_sheets):
+        self.sprite_sheets = sprite_sheets
+        self.names = [BLANK_IMAGE]
+        self.surfaces = [None]
+        # Images from the sprite sheets are trimmed of their transparent borders. For each loaded image, the position
+        # of its top left corner in the original image, and the original image's size, see ScrollHeightActor
+        self.offsets = [None]
+        self.sizes = [None]
+        # Handle of the separate shadow image for each image, where one exists (only used by the player and barrel)
+        self.shadows = [BLANK_HANDLE]
+        self.handles = {BLANK_IMAGE: BLANK_HANDLE}
+        self.tables = {}
+        self.dir_listings = {}
+
+        # If True, all of a sprite's frames are loaded when its table is built (at stage load), rather than when each
+        # frame is first shown
+        self.preload = True
+
+    def get_handle(self, name):
+        handle = self.handles.get(name)
+        if handle is None:
+            handle = len(self.names)
+            self.handles[name] = handle
+            self.names.append(name)
+            self.surfaces.append(None)
+            self.offsets.append(None)
+            self.sizes.append(None)
+            self.shadows.append(None)
+        return handle
+
+    def get_surface(self, handle):
+        surface = self.surfaces[handle]
+        if surface is None:
+            surface = self.load_surface(handle)
+        return surface
+
+    def load_surface(self, handle):
+        name = self.names[handle]
+        surface, self.offsets[handle], self.sizes[handle] = self.sprite_sheets.load_trimmed(name)
+        if not self.sprite_sheets.is_recoloured(name):
+            self.surfaces[handle] = surface
+        return surface
+
+    def release(self, names):
+        # Lets go of the surfaces of the given images, which are loaded again if they're used later. Their handles,
+        # offsets and sizes are kept
+        for name in names:
+            handle = self.handles.get(name)
+            if handle is not None:
+                self.surfaces[handle] = None
+
+    def get_shadow(self, handle):
+        shadow = self.shadows[handle]
+        if shadow is None:
+            shadow = self.shadows[handle] = self.get_handle(self.names[handle] + "_shadow")
+        return shadow
+
+    def list_dir(self, sprite_dir):
+        if sprite_dir not in self.dir_listings:
+            path = os.path.join(pgzero.loaders.root, "images", sprite_dir)
+            try:
+                files = sorted(os.listdir(path))
+            except FileNotFoundError:
+                files = []
+            self.dir_listings[sprite_dir] = [os.path.splitext(file)[0] for file in files if file.endswith(".png")]
+        return self.dir_listings[sprite_dir]
+
+    def get_table(self, sprite, colour_variant=None):
+        key = (sprite, colour_variant)
+        table = self.tables.get(key)
+        if table is None:
+            table = self.tables[key] = self.build_table(sprite, colour_variant)
+        return table
+
+    def build_table(self, sprite, colour_variant):
+        # Find every frame of every animation for this sprite and colour variant on disk.
+        # Filenames are in the format sprite_anim_facing_frame, with _variant on the end for sprites with colour
+        # variants, and _shadow on the end of separate shadow images. The animation type may contain underscores
+        table = SpriteTable(self, sprite, colour_variant)
+        sprite_dir = SPRITE_DIRS.get(sprite, "")
+        stems = self.list_dir(sprite_dir)
+        stem_set = set(stems)
+        num_suffixes = 2 if colour_variant is None else 3
+        for stem in stems:
+            if not stem.startswith(sprite + "_") or stem.endswith("_shadow"):
+                continue
+            parts = stem[len(sprite) + 1:].split("_")
+            if len(parts) <= num_suffixes or not all(part.isdigit() for part in parts[-num_suffixes:]):
+                continue
+            if colour_variant is not None and int(parts[-1]) != colour_variant:
+                continue
+            facing, frame = int(parts[-num_suffixes]), int(parts[-num_suffixes + 1])
+            if facing > 1:
+                continue
+            handle = self.get_handle(table.prefix + stem)
+            table.add(anim_id("_".join(parts[:-num_suffixes])), facing, frame, handle)
+            if stem + "_shadow" in stem_set:
+                self.shadows[handle] = self.get_handle(table.prefix + stem + "_shadow")
+
+        if self.preload:
+            self.load_table(table)
+        return table
+
+    def load_table(self, table):
+        for anim in table.frames:
+            if anim is None:
+                continue
+            for facing in anim:
+                for handle in facing:
+                    if handle is not None:
+                        self.get_surface(handle)
+                        shadow = self.shadows[handle]
+                        if shadow is not None and shadow != BLANK_HANDLE:
+                            self.get_surface(shadow)
@@ -0,0 +1,134 @@
+import json
+import sys
+
+from game.config import BACKGROUND_TILES, BACKGROUND_TILE_SPACING, BACKGROUND_TILE_WIDTH, ITEMS_DIR, SPRITE_DIRS, WIDTH
+
+# Lists the images each stage needs, so that they can be loaded before the stage starts (see AssetPreloader) rather
+# than the first time each one is drawn.
+# A manifest is a dictionary with:
+#   "sprites" - every image for each sprite in SPRITE_DIRS, keyed on sprite name
+#   "backgrounds" - the background tiles
+#   "stages" - for each stage in order, a dictionary with the stage name and the images it needs
+# Image names are as passed to images.load, e.g. "characters/hero/hero_walk_0_0"
+
+
+def get_sprite_images(atlas, sprite, colour_variant=None):
+    # Every frame of every animation for this sprite, including separate shadow images. If colour_variant is given,
+    # only images for that variant are included
+    sprite_dir = SPRITE_DIRS.get(sprite, "")
+    prefix = f"{sprite_dir}/" if sprite_dir else ""
+    suffix = f"_{colour_variant}"
+    names = []
+    for stem in atlas.list_dir(sprite_dir):
+        if not stem.startswith(sprite + "_"):
+            continue
+        if colour_variant is not None and not stem.removesuffix("_shadow").endswith(suffix):
+            continue
+        names.append(prefix + stem)
+    return names
+
+
+def get_background_tiles(start_scroll_x, end_scroll_x):
+    # Background tiles which appear on screen while scrolling from start_scroll_x to end_scroll_x. Tile i is drawn at
+    # i * BACKGROUND_TILE_SPACING - BACKGROUND_TILE_SPACING - scroll_x, see BackgroundLayer
+    first = max(0, int((start_scroll_x - BACKGROUND_TILE_WIDTH) // BACKGROUND_TILE_SPACING) + 1)
+    last = min(len(BACKGROUND_TILES) - 1, int((end_scroll_x + WIDTH) // BACKGROUND_TILE_SPACING) + 1)
+    return BACKGROUND_TILES[first:last + 1]
+
+
+def get_enemy_classes(spec):
+    # The class of the enemy the spec creates, followed by those of any enemies it can spawn (e.g. a portal's)
+    return [spec.cls, *spec.kwargs.get("enemies", ())]
+
+
+def get_stage_images(atlas, stage, start_scroll_x):
+    # The stage's enemies haven't been created yet, only their specs (see Stage), so which colour variant each one
+    # will have isn't known - all variants are included
+    names = list(get_background_tiles(start_scroll_x, stage.max_scroll_x))
+    for spec in stage.enemies:
+        for cls in get_enemy_classes(spec):
+            sprite = cls.SPRITE
+            names.extend(get_sprite_images(atlas, sprite))
+            intro_image = getattr(cls, "BOSS_INTRO_IMAGE", None)
+            if intro_image:
+                sprite_dir = SPRITE_DIRS.get(sprite, "")
+                names.append(f"{sprite_dir}/{intro_image}" if sprite_dir else intro_image)
+
+    # Weapons and powerups switch between images from the same directory (ITEMS_DIR), and there are only a few of
+    # those, so include the whole directory
+    if stage.weapons or stage.powerups:
+        names.extend(f"{ITEMS_DIR}/{stem}" for stem in atlas.list_dir(ITEMS_DIR))
+
+    # Remove duplicates, keeping the order
+    return list(dict.fromkeys(names))
+
+
+def build_manifest(atlas, stages):
+    manifest = {
+        "sprites": {sprite: get_sprite_images(atlas, sprite) for sprite in SPRITE_DIRS},
+        "backgrounds": list(BACKGROUND_TILES),
+        "stages": [],
+    }
+    scroll_x = 0
+    for stage in stages:
+        manifest["stages"].append({"name": stage.name, "images": get_stage_images(atlas, stage, scroll_x)})
+        scroll_x = max(scroll_x, stage.max_scroll_x)
+    return manifest
+
+
+def get_released_images(manifest, index, is_pinned):
+    # Images which stages before index need, other than those the stage at index or the one after it need, and those
+    # for which is_pinned returns True. Returns the released images and the kept ones
+    stages = manifest["stages"]
+    kept = {name for stage in stages[index:index + 2] for name in stage["images"]}
+    released = {name for stage in stages[:index] for name in stage["images"]
+                if name not in kept and not is_pinned(name)}
+    return released, kept
+
+
+def check_releases(manifest, stages):
+    # Returns a message for each sprite which would be released (see get_released_images) as a stage starts, although
+    # that stage or the next one can create an enemy using it. This is worked out from the stages' enemy specs, rather
+    # than the images listed in the manifest, so that it catches enemies the manifest has missed
+    problems = []
+    for index in range(1, len(stages)):
+        released = get_released_images(manifest, index, lambda name: False)[0]
+        for stage_index in range(index, min(index + 2, len(stages))):
+            for spec in stages[stage_index].enemies:
+                for cls in get_enemy_classes(spec):
+                    sprite_dir = SPRITE_DIRS.get(cls.SPRITE, "")
+                    prefix = f"{sprite_dir}/{cls.SPRITE}_" if sprite_dir else f"{cls.SPRITE}_"
+                    intro_image = getattr(cls, "BOSS_INTRO_IMAGE", None)
+                    intro_name = f"{sprite_dir}/{intro_image}" if sprite_dir else intro_image
+                    needed = sorted(name for name in released if name.startswith(prefix) or name == intro_name)
+                    if needed:
+                        problems.append(f"Starting stage {index} releases {len(needed)} images of {cls.SPRITE}, "
+                                        f"which stage {stage_index} needs, e.g. {needed[0]}")
+    return problems
+
+
+def write_manifest(manifest, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1)
+
+
+if __name__ == "__main__":
+    # Usage: python -m game.assets.AssetManifest [output file | --check]
+    # Writes the manifest for the game's stages as JSON, to the given file or to standard output. With --check, checks
+    # instead that no stage's images are released before it ends (see check_releases)
+    from game.systems.Headless import init_headless
+    import game.runtime as runtime
+    import game.stages.setup_stages as stage_setup
+    from game.config import STAGES_FILE
+
+    init_headless()
+    stage_setup.load_stages(STAGES_FILE)
+    manifest = build_manifest(runtime.atlas, stage_setup.STAGES)
+    if sys.argv[1:] == ["--check"]:
+        problems = check_releases(manifest, stage_setup.STAGES)
+        print("\n".join(problems) if problems else "No images are released while a stage needs them")
+        sys.exit(1 if problems else 0)
+    elif len(sys.argv) > 1:
+        write_manifest(manifest, sys.argv[1])
+    else:
+        json.dump(manifest, sys.stdout, indent=1)
@@ -0,0 +1,137 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import weakref
+
+import pgzero.loaders
+import pygame
+
+from game.config import ASSET_PACK_ENABLED, ASSET_PACK_FILE, SPRITE_SHEETS_DIR
+
+# The pack starts with HEADER - MAGIC, PACK_VERSION, and the position and length of its index, which is at the end of
+# the file (see asset_packer, which describes its format)
+HEADER = struct.Struct("<8sIQQ")
+MAGIC = b"MASKPACK"
+# Changed whenever the pack format changes
+PACK_VERSION = 1
+# Pixel data for each image starts at a multiple of this many bytes - the usual size of a memory page, so that the
+# memory used by an image can be released, see release_pixels
+DATA_ALIGNMENT = 4096
+# Byte order of each pixel in the pack. This is the order used by the display on almost every machine, so images can
+# be drawn straight from the pack without converting them
+PIXEL_FORMAT = "BGRA"
+
+
+class AssetPack:
+    # Loads images from the asset pack made by asset_packer, which holds the already decoded pixels of every image the
+    # game loads by name. The pack is memory mapped, and each image is a surface made directly on the mapped pixels, so
+    # loading an image doesn't read, decompress or copy anything - the operating system reads the pixels from disk (or
+    # its file cache) the first time they're drawn.
+    # install makes a Pygame Zero image loader load images from the pack, so that images.load works as before. Images
+    # which aren't in the pack, or whose file has changed since the pack was made, are loaded from their own files.
+    # The pack is mapped copy on write, so drawing onto a loaded image changes that image in memory, but not the pack.
+    # Once no surface uses an image's pixels (e.g. the SurfaceCache has discarded it), the operating system is told it
+    # can drop them from memory, rather than keeping them there until it needs the memory for something else.
+    # Used by the game's image loader, which the AssetPreloader may call at the same time from a different thread
+
+    def __init__(self):
+        self.enabled = ASSET_PACK_ENABLED
+        # Path relative to the images directory (e.g. "ui/health.png") -> (offset, width, height, file size, file
+        # modification time), loaded the first time an image is asked for, as Pygame Zero's root directory isn't known
+        # before then
+        self.entries = None
+        self.images_dir = None
+        self.pack = None
+        self.pixels = None
+        # Offset of each image whose pixels are in use -> number of surfaces using them, and a weak reference to each
+        # of those surfaces, see release_pixels
+        self.users = {}
+        self.surface_refs = set()
+        # Re-entrant, as the garbage collector may free a surface, and so call release_pixels, while it's held
+        self.users_lock = threading.RLock()
+        # Whether the display uses a different pixel format than the pack, in which case images are converted
+        self.convert = False
+        self.reported_changed = False
+        self.lock = threading.Lock()
+
+    def install(self, loader):
+        # Makes loader (a Pygame Zero ImageLoader) look images up in the pack before loading them from their files
+        load_file = loader._load
+
+        def load(path):
+            surface = self.load(path)
+            return surface if surface is not None else load_file(path)
+
+        loader._load = load
+
+    def check_index(self):
+        if self.entries is None:
+            with self.lock:
+                if self.entries is None:
+                    self.load_index()
+
+    def load_index(self):
+        self.images_dir = os.path.join(pgzero.loaders.root, "images")
+        if not self.enabled:
+            self.entries = {}
+            return
+        path = os.path.join(self.images_dir, SPRITE_SHEETS_DIR, ASSET_PACK_FILE)
+        try:
+            with open(path, "rb") as file:
+                pack = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+            return
+        magic, version, index_offset, index_length = HEADER.unpack_from(pack)
+        if magic != MAGIC or version != PACK_VERSION:
+            print(f"Ignoring {path} as it was made by a different version of asset_packer, run it again to update it")
+            self.entries = {}
+            return
+        index = json.loads(pack[index_offset:index_offset + index_length])
+        self.pack = pack
+        self.pixels = memoryview(pack)
+        probe = pygame.image.frombuffer(bytearray(4), (1, 1), PIXEL_FORMAT)
+        self.convert = pygame.display.get_surface() is not None and \
+            probe.convert_alpha().get_masks() != probe.get_masks()
+        self.entries = {name: tuple(entry) for name, entry in index["images"].items()}
+
+    def load(self, path):
+        # Returns None if the image isn't in the pack or has changed since the pack was made
+        self.check_index()
+        if not self.entries:
+            return None
+        name = os.path.relpath(path, self.images_dir).replace(os.sep, "/")
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        offset, width, height, file_size, modified = entry
+        stat = os.stat(path)
+        if stat.st_size != file_size or stat.st_mtime_ns != modified:
+            if not self.reported_changed:
+                self.reported_changed = True
+                print("Some images have changed since the asset pack was made, run asset_packer again to update it")
+            return None
+        length = width * height * 4
+        surface = pygame.image.frombuffer(self.pixels[offset:offset + length], (width, height), PIXEL_FORMAT)
+        if hasattr(self.pack, "madvise"):
+            surface_ref = weakref.ref(surface, lambda ref: self.release_pixels(ref, offset, length))
+            with self.users_lock:
+                self.users[offset] = self.users.get(offset, 0) + 1
+                self.surface_refs.add(surface_ref)
+        return surface.convert_alpha() if self.convert else surface
+
+    def release_pixels(self, ref, offset, length):
+        # Called when a surface made from the pack is no longer used. If no other surface uses the same pixels, the
+        # whole memory pages they cover are dropped - they're read from the file again if the image is loaded again
+        with self.users_lock:
+            self.surface_refs.discard(ref)
+            self.users[offset] -= 1
+            if self.users[offset] > 0:
+                return
+            del self.users[offset]
+        start = -(-offset // mmap.PAGESIZE) * mmap.PAGESIZE
+        end = (offset + length) // mmap.PAGESIZE * mmap.PAGESIZE
+        if end > start:
+            self.pack.madvise(mmap.MADV_DONTNEED, start, end - start)
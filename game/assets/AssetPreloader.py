@@ -0,0 +1,114 @@
+import os
+import queue
+import threading
+import time
+
+from game.assets.AssetManifest import build_manifest, get_released_images
+
+
+class AssetPreloader:
+    # Loads the images for upcoming stages on a background thread while the current stage is being played, so that
+    # there's no pause the first time an enemy, boss intro or background tile is shown.
+    # Images are loaded through sprite_sheets (see SpriteSheets), which caches the sprite sheets they're packed into, or
+    # Pygame Zero's image loader, which caches images which aren't packed - so when the game later loads the same image
+    # (directly or through the AnimationAtlas), its sheet or the image itself is already loaded and converted, and
+    # mirrored images have already been flipped. Recoloured images are made by the game when it first shows them, as
+    # only the images they're made from are loaded here. If the game asks for an image before the preloader has got to
+    # it, it is simply loaded then, as it would have been without the preloader.
+    # As each stage starts, the images which only earlier stages needed are discarded, see release_stages_before.
+    # Keeps a record of the number of images and time taken for each directory, see get_stats
+
+    def __init__(self, sprite_sheets, surface_cache):
+        self.sprite_sheets = sprite_sheets
+        self.surface_cache = surface_cache
+        # Disabled when running headless, as nothing is drawn
+        self.enabled = True
+        self.atlas = None
+        self.manifest = None
+        self.queue = queue.Queue()
+        self.thread = None
+        self.requested = set()
+        self.queued_stages = set()
+
+        # Directory -> [number of images loaded, total seconds]
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+    def start_game(self, atlas, stages, first_stage=0):
+        # Called when a new game starts. Work out which images each stage needs, and start loading the first two
+        if not self.enabled:
+            return
+        self.atlas = atlas
+        self.manifest = build_manifest(atlas, stages)
+        self.queued_stages.clear()
+        self.preload_stage(first_stage)
+        self.preload_stage(first_stage + 1)
+
+    def preload_stage(self, index):
+        if not self.enabled or self.manifest is None or index in self.queued_stages:
+            return
+        stages = self.manifest["stages"]
+        if 0 <= index < len(stages):
+            self.queued_stages.add(index)
+            self.preload(stages[index]["images"])
+
+    def release_stages_before(self, index):
+        # Discards the images which stages before index need, other than those the stage at index or the one after it
+        # (which is being preloaded) need, or which are pinned in the surface cache
+        if not self.enabled or self.manifest is None:
+            return
+        released, kept = get_released_images(self.manifest, index, self.surface_cache.is_pinned)
+        if not released:
+            return
+        self.atlas.release(released)
+        self.sprite_sheets.release(released)
+        sheets = self.sprite_sheets.get_sheet_names(released) - self.sprite_sheets.get_sheet_names(kept)
+        self.surface_cache.release(released | sheets)
+        # So that they're loaded again if a later stage needs them
+        self.requested -= released
+
+    def preload(self, names):
+        if not self.enabled:
+            return
+        for name in names:
+            if name not in self.requested:
+                self.requested.add(name)
+                self.queue.put(name)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            name = self.queue.get()
+            start = time.perf_counter()
+            try:
+                self.sprite_sheets.preload(name)
+            except Exception as ex:
+                # Missing images will give an error when the game tries to use them, not here
+                print(f"Preloading {name} failed: {ex}")
+                continue
+            finally:
+                self.queue.task_done()
+            self.add_stat(os.path.dirname(name), time.perf_counter() - start)
+
+    def add_stat(self, directory, seconds):
+        with self.stats_lock:
+            stat = self.stats.setdefault(directory, [0, 0.0])
+            stat[0] += 1
+            stat[1] += seconds
+
+    def is_idle(self):
+        return self.queue.unfinished_tasks == 0
+
+    def wait(self):
+        # Block until everything requested so far has been loaded
+        self.queue.join()
+
+    def get_stats(self):
+        with self.stats_lock:
+            return {directory: {"images": count, "ms": seconds * 1000} for directory, (count, seconds) in sorted(self.stats.items())}
+
+    def print_stats(self):
+        for directory, stat in self.get_stats().items():
+            print(f"{directory}: {stat['images']} images in {stat['ms']:.1f}ms")
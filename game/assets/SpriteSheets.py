@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy
+import pgzero.loaders
+import pygame
+from pygame import Rect
+
+from game.assets.recolour import get_lookup, recolour
+from game.config import RECOLOUR_CACHE_SIZE, SPRITE_SHEETS_DIR, SPRITE_SHEETS_ENABLED
+
+# The sheets' index, written by sheet_packer, which describes its format
+INDEX_FILE = "index.json"
+# Changed whenever the index format changes
+INDEX_VERSION = 3
+
+
+class SpriteSheets:
+    # Loads actor images from the sprite sheets made by sheet_packer. An image which has been packed is returned as a
+    # subsurface of its sheet, so the first image used from a sheet loads the whole sheet, and the rest of its images
+    # then cost nothing to load. Sheets are loaded through Pygame Zero's image loader, so are kept by the SurfaceCache
+    # (and by the subsurfaces of them in use), and discarded along with the images from them, see release.
+    # Images which aren't in a sheet, or all images if the sheets haven't been made, are loaded from their own files
+    # through Pygame Zero's image loader, as before.
+    # Packed images have been trimmed of their transparent borders, see load_trimmed.
+    # Right facing images which are mirror images of the left facing ones aren't in the sheets (see sheet_packer), so
+    # they're made by flipping the left facing image the first time they're loaded, and kept for next time.
+    # Colour variants which can be made by recolouring variant 0 aren't in the sheets either (see recolour). They're
+    # made when they're first loaded, and kept in a cache of the RECOLOUR_CACHE_SIZE most recently used, so having
+    # several colour variants costs little more than having one.
+    # Used by the AnimationAtlas and AssetPreloader, which may call load at the same time from different threads.
+    # Recolouring is only done on the main thread - the preloader only loads the images they're made from
+
+    def __init__(self):
+        self.enabled = SPRITE_SHEETS_ENABLED
+        # Image name -> (sheet number, rect in sheet, offset in original image, size of original image), loaded the
+        # first time an image is asked for, as Pygame Zero's root directory isn't known before then
+        self.entries = None
+        # Image name -> name of the image it's a mirror image of
+        self.mirrors = {}
+        # Image name -> (surface, offset, size) for mirrored images which have been loaded
+        self.mirrored = {}
+        # Image name -> (name of the image it's a recolour of, recolour lookup array)
+        self.recolours = {}
+        # Image name -> (surface, offset, size) for recoloured images, least recently used first
+        self.recoloured = OrderedDict()
+        self.sheet_names = []
+        self.lock = threading.Lock()
+
+    def load_index(self):
+        self.entries = {}
+        if not self.enabled:
+            return
+        path = os.path.join(pgzero.loaders.root, "images", SPRITE_SHEETS_DIR, INDEX_FILE)
+        try:
+            with open(path, encoding="utf-8") as file:
+                index = json.load(file)
+        except FileNotFoundError:
+            return
+        if index.get("version") != INDEX_VERSION:
+            print(f"Ignoring {path} as it was made by a different version of sheet_packer, run it again to update it")
+            return
+        self.sheet_names = [f"{SPRITE_SHEETS_DIR}/{name}" for name in index["sheets"]]
+        tables = {key: get_lookup((numpy.array(bins), numpy.array(changes)))
+                  for key, (bins, changes) in index["recolour_tables"].items()}
+        self.entries = {}
+        for name, entry in index["images"].items():
+            if "mirror" in entry:
+                self.mirrors[name] = entry["mirror"]
+            elif "recolour" in entry:
+                self.recolours[name] = (entry["recolour"], tables[entry["table"]])
+            else:
+                self.entries[name] = (entry["sheet"], Rect(entry["rect"]), tuple(entry["offset"]), tuple(entry["size"]))
+
+    def check_index(self):
+        if self.entries is None:
+            with self.lock:
+                if self.entries is None:
+                    self.load_index()
+
+    def load(self, name):
+        return self.load_trimmed(name)[0]
+
+    def preload(self, name):
+        # Loads everything needed to make the image, without recolouring it
+        self.check_index()
+        recolour_entry = self.recolours.get(name)
+        self.load(recolour_entry[0] if recolour_entry is not None else name)
+
+    def is_recoloured(self, name):
+        # Recoloured images are kept in a cache of limited size, so shouldn't be kept by the caller
+        self.check_index()
+        return name in self.recolours
+
+    def load_trimmed(self, name):
+        # Returns (surface, offset, size) - the surface may have been trimmed, in which case offset is the position of
+        # its top left corner in the original image, and size is the original image's size
+        self.check_index()
+        entry = self.entries.get(name)
+        if entry is None:
+            if name in self.mirrors:
+                return self.load_mirrored(name)
+            if name in self.recolours:
+                return self.load_recoloured(name)
+            surface = pgzero.loaders.images.load(name)
+            return surface, (0, 0), surface.get_size()
+        sheet_number, rect, offset, size = entry
+        return self.get_sheet(sheet_number).subsurface(rect), offset, size
+
+    def load_mirrored(self, name):
+        mirrored = self.mirrored.get(name)
+        if mirrored is None:
+            surface, (offset_x, offset_y), size = self.load_trimmed(self.mirrors[name])
+            # The trimmed area is mirrored too, so its offset is now measured from the right of the original image
+            offset_x = size[0] - offset_x - surface.get_width()
+            mirrored = self.mirrored[name] = (pygame.transform.flip(surface, True, False), (offset_x, offset_y), size)
+        return mirrored
+
+    def load_recoloured(self, name):
+        recoloured = self.recoloured.get(name)
+        if recoloured is not None:
+            self.recoloured.move_to_end(name)
+            return recoloured
+        base_name, lookup = self.recolours[name]
+        surface, offset, size = self.load_trimmed(base_name)
+        recoloured = self.recoloured[name] = (recolour(surface, lookup), offset, size)
+        if len(self.recoloured) > RECOLOUR_CACHE_SIZE:
+            self.recoloured.popitem(last=False)
+        return recoloured
+
+    def get_sheet(self, sheet_number):
+        # Locked so that the AssetPreloader and the game don't both load the same sheet at once
+        with self.lock:
+            return pgzero.loaders.images.load(self.sheet_names[sheet_number])
+
+    def get_sheet_names(self, names):
+        # Names of the sheets which the given images, or the images they're made from, are in
+        self.check_index()
+        sheet_names = set()
+        for name in names:
+            while name in self.mirrors or name in self.recolours:
+                name = self.mirrors[name] if name in self.mirrors else self.recolours[name][0]
+            entry = self.entries.get(name)
+            if entry is not None:
+                sheet_names.add(self.sheet_names[entry[0]])
+        return sheet_names
+
+    def release(self, names):
+        # Discards the mirrored and recoloured images with the given names. The sheets are discarded by the SurfaceCache
+        for name in names:
+            self.mirrored.pop(name, None)
+            self.recoloured.pop(name, None)
@@ -0,0 +1,118 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class SurfaceCache:
+    # Replaces the cache of Pygame Zero's image loader, which would otherwise keep every image it has loaded for as long
+    # as the game runs. When the images held add up to more than budget bytes, the least recently used ones are
+    # discarded, apart from those whose names start with one of pinned (e.g. the HUD and the player's images), which
+    # are always kept. When a stage starts, the images which only earlier stages needed are also discarded, see
+    # AssetPreloader.release_stages_before.
+    # A discarded image may still be in use, e.g. by an actor, or as the sheet behind images in the AnimationAtlas. A
+    # weak reference to it is kept, so that if it's loaded again while still in use, the same surface is returned
+    # rather than a second copy being loaded.
+    # hits and misses count how many requested images were and weren't already loaded.
+    # Used by the image loader, which the AssetPreloader may call at the same time from a different thread
+
+    def __init__(self, budget, pinned):
+        self.budget = budget
+        self.pinned = tuple(pinned)
+        # Image loader cache key (see ResourceLoader.cache_key, the image name comes first) -> surface, least recently
+        # used first
+        self.surfaces = OrderedDict()
+        self.sizes = {}
+        self.pinned_keys = set()
+        self.bytes = 0
+        self.discarded = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.released = 0
+        self.lock = threading.Lock()
+        # The (key, surface) each thread last found, see __contains__
+        self.found = threading.local()
+
+    def install(self, loader):
+        # Makes loader (a Pygame Zero ImageLoader) keep the images it loads here
+        loader.cache = self
+
+    def is_pinned(self, name):
+        return name.startswith(self.pinned)
+
+    # The image loader uses the cache as a dictionary - it checks whether an image is loaded, then gets it, or loads and
+    # adds it. Checking is counted as a hit or miss, and marks the image as the most recently used. Another thread may
+    # discard the image in between checking and getting it (by releasing it, or adding an image which evicts it), so
+    # the surface found when checking is kept for the checking thread, and that's what getting it returns
+
+    def __contains__(self, key):
+        with self.lock:
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.surfaces.move_to_end(key)
+            else:
+                surface = self.discarded.pop(key, None)
+                if surface is not None:
+                    self.add(key, surface)
+            if surface is None:
+                self.misses += 1
+                return False
+            self.hits += 1
+        self.found.entry = (key, surface)
+        return True
+
+    def __getitem__(self, key):
+        entry = getattr(self.found, "entry", None)
+        if entry is not None and entry[0] == key:
+            self.found.entry = None
+            return entry[1]
+        with self.lock:
+            return self.surfaces[key]
+
+    def __setitem__(self, key, surface):
+        with self.lock:
+            if key in self.surfaces:
+                self.remove(key)
+            self.add(key, surface)
+
+    def add(self, key, surface):
+        self.surfaces[key] = surface
+        self.sizes[key] = surface.get_pitch() * surface.get_height()
+        self.bytes += self.sizes[key]
+        if self.is_pinned(key[0]):
+            self.pinned_keys.add(key)
+        if self.bytes > self.budget:
+            # The image just added is never discarded, even if it's bigger than the budget by itself
+            for old_key in list(self.surfaces):
+                if self.bytes <= self.budget or old_key == key:
+                    break
+                if old_key not in self.pinned_keys:
+                    self.remove(old_key)
+                    self.evicted += 1
+
+    def remove(self, key):
+        surface = self.surfaces.pop(key)
+        self.bytes -= self.sizes.pop(key)
+        self.pinned_keys.discard(key)
+        self.discarded[key] = surface
+
+    def release(self, names):
+        # Discards the images with the given names, apart from pinned ones
+        with self.lock:
+            for key in [key for key in self.surfaces if key[0] in names and key not in self.pinned_keys]:
+                self.remove(key)
+                self.released += 1
+
+    def get_stats(self):
+        with self.lock:
+            pinned_bytes = sum(self.sizes[key] for key in self.pinned_keys)
+            return {"entries": len(self.surfaces), "bytes": self.bytes, "pinned_bytes": pinned_bytes,
+                    "budget": self.budget, "hits": self.hits, "misses": self.misses, "evicted": self.evicted,
+                    "released": self.released}
+
+    def print_stats(self):
+        stats = self.get_stats()
+        print(f"surface cache: {stats['entries']} images, {stats['bytes'] / 1000000:.1f}MB "
+              f"({stats['pinned_bytes'] / 1000000:.1f}MB pinned) of {stats['budget'] / 1000000:.0f}MB, "
+              f"{stats['hits']} hits, {stats['misses']} misses, {stats['evicted']} evicted, "
+              f"{stats['released']} released")
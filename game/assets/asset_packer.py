@@ -0,0 +1,78 @@
+import json
+import os
+from pathlib import Path
+
+import pygame
+from pgzero.loaders import ImageLoader
+
+from game.assets.AssetPack import DATA_ALIGNMENT, HEADER, MAGIC, PACK_VERSION, PIXEL_FORMAT
+from game.assets.SpriteSheets import INDEX_FILE, INDEX_VERSION
+from game.config import ASSET_PACK_FILE, SPRITE_SHEETS_DIR
+
+# Writes the decoded pixels of every image the game loads by name into one file, the asset pack, which AssetPack maps
+# into memory so that images can be used without decoding their PNG files (see AssetPack). Run this after
+# sheet_packer, and whenever images are added or changed:
+#   python -m game.assets.asset_packer
+# Images which are packed into the sprite sheets aren't included, as the game loads them from the sheets, which are.
+# An image which has changed since the pack was made is loaded from its file instead, until the pack is made again.
+# The pack is written to images/SPRITE_SHEETS_DIR/ASSET_PACK_FILE, and is laid out as:
+#   HEADER - MAGIC, PACK_VERSION, and the offset and length in bytes of the index
+#   pixel data of each image - width * height pixels in PIXEL_FORMAT, starting at a multiple of DATA_ALIGNMENT
+#   index - JSON, with "images" mapping each image's path relative to the images directory (e.g. "ui/health.png") to
+#       [offset of its pixel data, width, height, file size, file modification time in nanoseconds]. The file size and
+#       time are used to tell whether the image has changed since
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+IMAGES_DIR = ROOT_DIR / "images"
+
+
+def get_sheet_images():
+    # Paths of images which are in the sprite sheets, if they've been made
+    try:
+        with open(IMAGES_DIR / SPRITE_SHEETS_DIR / INDEX_FILE, encoding="utf-8") as file:
+            index = json.load(file)
+    except FileNotFoundError:
+        return set()
+    if index.get("version") != INDEX_VERSION:
+        return set()
+    return {f"{name}.png" for name in index["images"]}
+
+
+def get_image_paths():
+    # Images which Pygame Zero can load (it refuses filenames which aren't lower case), other than those in the sheets
+    sheet_images = get_sheet_images()
+    paths = []
+    for path in sorted(IMAGES_DIR.rglob("*")):
+        name = path.relative_to(IMAGES_DIR).as_posix()
+        if path.suffix[1:] in ImageLoader.EXTNS and name == name.lower() and name not in sheet_images:
+            paths.append(path)
+    return paths
+
+
+def pack_all(output_path=IMAGES_DIR / SPRITE_SHEETS_DIR / ASSET_PACK_FILE):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    index = {"images": {}}
+    # Written to a temporary file first, so that the game never maps a partly written pack
+    temp_path = output_path.with_suffix(".tmp")
+    with open(temp_path, "wb") as file:
+        file.write(bytes(HEADER.size))
+        for path in get_image_paths():
+            surface = pygame.image.load(path)
+            offset = (file.tell() + DATA_ALIGNMENT - 1) // DATA_ALIGNMENT * DATA_ALIGNMENT
+            file.write(bytes(offset - file.tell()))
+            file.write(pygame.image.tobytes(surface, PIXEL_FORMAT))
+            stat = path.stat()
+            index["images"][path.relative_to(IMAGES_DIR).as_posix()] = [
+                offset, surface.get_width(), surface.get_height(), stat.st_size, stat.st_mtime_ns]
+        index_offset = file.tell()
+        index_data = json.dumps(index, separators=(",", ":")).encode()
+        file.write(index_data)
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, PACK_VERSION, index_offset, len(index_data)))
+    os.replace(temp_path, output_path)
+    print(f"Packed {len(index['images'])} images into {output_path}, {index_offset / 1000000:.0f}MB")
+
+
+if __name__ == "__main__":
+    # Usage: python -m game.assets.asset_packer
+    pack_all()
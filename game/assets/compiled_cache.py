@@ -0,0 +1,42 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+# Data files which are checked and converted into another form when loaded (e.g. stage files, attacks.json) can save
+# the result here, so that next time the file can be loaded without doing that again. Cache files are named after the
+# hash of the data file's contents, so a changed file is never loaded from an out of date cache file.
+# version should be changed whenever the code which produces the cached form changes
+
+CACHE_DIR = Path(__file__).resolve().parents[2] / "cache"
+
+
+def get_cache_path(prefix, contents, version):
+    digest = hashlib.sha1(contents + f"/{version}".encode()).hexdigest()
+    return CACHE_DIR / f"{prefix}_{digest}.bin"
+
+
+def load_compiled(prefix, contents, version):
+    # Returns None if the file hasn't been cached
+    cache_path = get_cache_path(prefix, contents, version)
+    if not cache_path.exists():
+        return None
+    try:
+        with cache_path.open("rb") as file:
+            return pickle.load(file)
+    except Exception as ex:
+        print(f"Couldn't load {cache_path}: {ex}")
+        return None
+
+
+def save_compiled(prefix, contents, version, compiled):
+    cache_path = get_cache_path(prefix, contents, version)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Written to a temporary file first so that a partly written file is never loaded
+        temp_path = cache_path.with_suffix(".tmp")
+        with temp_path.open("wb") as file:
+            pickle.dump(compiled, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError as ex:
+        print(f"Couldn't save {cache_path}: {ex}")
@@ -0,0 +1,82 @@
+import numpy
+import pygame
+
+# Colour variants of a sprite (e.g. the three outfits vax can wear) are the same drawing in different colours. Rather
+# than storing every frame of every variant, sheet_packer stores variant 0, and a recolour table for each other
+# variant, which gives the change to make to each colour in variant 0 to get the colour in that variant.
+# Colours are grouped into bins by the top TABLE_BITS bits of their red, green and blue values, and the table has an
+# entry for each bin which is used, with the average change for the colours in that bin. A colour whose bin isn't in
+# the table is left as it is. The alpha channel is left as it is, as variants only differ in colour.
+# The table is stored as (bins, changes), and expanded into a lookup array with an entry for every bin (see
+# get_lookup) before recolouring with it.
+# The artwork wasn't made by palette swapping, so a table can't reproduce every image of a variant - the packer checks
+# each image (see get_error), and keeps the variant's own image unless the table reproduces it exactly
+
+TABLE_BITS = 6
+
+
+def get_pixels(surface):
+    # (width, height, 4) array of RGBA values, as ints so that differences can be negative
+    return numpy.dstack((pygame.surfarray.pixels3d(surface), pygame.surfarray.pixels_alpha(surface))).astype(numpy.int32)
+
+
+def get_bins(rgb):
+    shift = 8 - TABLE_BITS
+    return (((rgb[..., 0] >> shift) << (TABLE_BITS * 2)) | ((rgb[..., 1] >> shift) << TABLE_BITS)
+            | (rgb[..., 2] >> shift))
+
+
+def fit_table(pairs):
+    # Returns (bins, changes) - sorted array of the bins used, and the change in red, green and blue for each - from a
+    # list of (base surface, variant surface) pairs of the same size. Only pixels visible in both are used
+    base_rgb = []
+    variant_rgb = []
+    for base, variant in pairs:
+        base_pixels = get_pixels(base)
+        variant_pixels = get_pixels(variant)
+        visible = (base_pixels[..., 3] > 0) & (variant_pixels[..., 3] > 0)
+        base_rgb.append(base_pixels[visible][:, :3])
+        variant_rgb.append(variant_pixels[visible][:, :3])
+    base_rgb = numpy.concatenate(base_rgb)
+    variant_rgb = numpy.concatenate(variant_rgb)
+    bins, inverse, counts = numpy.unique(get_bins(base_rgb), return_inverse=True, return_counts=True)
+    totals = numpy.zeros((len(bins), 3))
+    numpy.add.at(totals, inverse, variant_rgb - base_rgb)
+    changes = numpy.rint(totals / counts[:, None]).astype(numpy.int32)
+    return bins.astype(numpy.int32), changes
+
+
+def get_lookup(table):
+    # Change in red, green and blue for every bin, indexed by bin
+    bins, changes = table
+    lookup = numpy.zeros((1 << (TABLE_BITS * 3), 3), numpy.int16)
+    lookup[bins] = changes
+    return lookup
+
+
+def recolour_pixels(rgb, lookup):
+    return numpy.clip(rgb + lookup[get_bins(rgb)], 0, 255)
+
+
+def get_error(base, variant, lookup):
+    # How closely the table reproduces the variant from the base image - the largest difference in any channel, over
+    # every pixel visible in either image, between the recoloured base image and the variant
+    base_pixels = get_pixels(base)
+    variant_pixels = get_pixels(variant)
+    visible = (base_pixels[..., 3] > 0) | (variant_pixels[..., 3] > 0)
+    if not visible.any():
+        return 0.0
+    base_pixels = base_pixels[visible]
+    variant_pixels = variant_pixels[visible]
+    difference = numpy.abs(recolour_pixels(base_pixels[:, :3], lookup) - variant_pixels[:, :3]).max(axis=1)
+    difference = numpy.maximum(difference, numpy.abs(base_pixels[:, 3] - variant_pixels[:, 3]))
+    return int(difference.max())
+
+
+def recolour(surface, lookup):
+    # Returns a recoloured copy of surface
+    result = surface.copy()
+    rgb = pygame.surfarray.pixels3d(result)
+    rgb[...] = recolour_pixels(rgb.astype(numpy.int32), lookup)
+    del rgb
+    return result
@@ -0,0 +1,237 @@
+import json
+from pathlib import Path
+
+import numpy
+import pygame
+
+from game.assets import recolour
+from game.assets.SpriteSheets import INDEX_FILE, INDEX_VERSION
+from game.config import ASYMMETRIC_ANIMATIONS, ITEMS_DIR, MIRROR_FACINGS, RECOLOUR_VARIANTS, SPRITE_DIRS, \
+    SPRITE_SHEETS_DIR
+
+# Packs the images of each sprite in SPRITE_DIRS, and the weapon and powerup images in ITEMS_DIR, into a few large
+# sprite sheets, so that the game opens and decodes a few files for each sprite rather than hundreds (see
+# SpriteSheets, which loads them). Run this whenever images in those directories are added or changed:
+#   python -m game.assets.sheet_packer
+# and then asset_packer, which packs the sheets into the asset pack (see AssetPack)
+# Most of each character frame is transparent, so each image is trimmed to the smallest rectangle containing all its
+# visible pixels before being packed. This makes the sheets much smaller, and means that drawing an image only blends
+# the pixels within that rectangle. The game still positions actors as if their images were the original size - see
+# ScrollHeightActor.set_image_handle.
+# Most animations are drawn symmetrically, so that each right facing image (facing 1) is a mirror image of the left
+# facing one (facing 0). If MIRROR_FACINGS is True, those right facing images aren't packed, and the game makes them by
+# flipping the left facing image instead. Animations listed in ASYMMETRIC_ANIMATIONS keep both facings. Other right
+# facing images are checked against the mirrored left facing image, and kept if they differ, with a warning.
+# If RECOLOUR_VARIANTS is True, images of colour variants other than variant 0 aren't packed either, if they can be
+# made by recolouring the same image in variant 0 (see recolour) exactly - every visible pixel the same.
+# The sheets are written to images/SPRITE_SHEETS_DIR, along with index.json, which has:
+#   "version" - INDEX_VERSION, the game ignores an index with a different version
+#   "sheets" - filenames of the sheet images, without the extension
+#   "images" - for each packed image, keyed on its name as passed to images.load (e.g. "characters/hero/hero_walk_0_0"):
+#       "sheet" - index in "sheets"
+#       "rect" - [x, y, width, height] of the trimmed image in its sheet
+#       "size" - [width, height] of the original image
+#       "offset" - [x, y] of the trimmed image's top left corner in the original image. Actor anchor points are
+#           relative to the original image, so the trimmed image is drawn this far right and down from where the
+#           original would have been
+#     or for a right facing image which is made by flipping the left facing one:
+#       "mirror" - the name of the left facing image
+#     or for a colour variant which is made by recolouring variant 0:
+#       "recolour" - the name of the same image in variant 0
+#       "table" - key of the recolour table in "recolour_tables"
+#   "recolour_tables" - keyed on sprite and variant number (e.g. "vax_1"), [bins, changes] - see recolour
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+IMAGES_DIR = ROOT_DIR / "images"
+
+# Maximum width and height of each sheet
+SHEET_SIZE = 4096
+
+# Images wider or taller than this (e.g. boss intro images, which are only shown once) are left as separate files
+MAX_IMAGE_SIZE = 512
+
+
+def get_groups():
+    # Directory -> images to pack from it. Images in a sprite's directory which aren't frames of that sprite are skipped
+    groups = {}
+    for sprite, sprite_dir in SPRITE_DIRS.items():
+        stems = sorted(path.stem for path in (IMAGES_DIR / sprite_dir).glob("*.png"))
+        groups.setdefault(sprite_dir, []).extend(stem for stem in stems if stem.startswith(sprite + "_"))
+    groups[ITEMS_DIR] = sorted(path.stem for path in (IMAGES_DIR / ITEMS_DIR).glob("*.png"))
+    return groups
+
+
+def get_mirror_source(stem):
+    # For a right facing image, the name of the left facing image it would be a mirror image of, otherwise None.
+    # Filenames are sprite_anim_facing_frame, with _variant on the end for sprites with colour variants and _shadow on
+    # the end of separate shadow images (see AnimationAtlas.build_table). Images with fewer than two numbers on the end
+    # (e.g. portal_idle_0) don't have a facing
+    base = stem.removesuffix("_shadow")
+    parts = base.split("_")
+    numbers = 0
+    while numbers < len(parts) - 1 and parts[-1 - numbers].isdigit():
+        numbers += 1
+    if numbers < 2:
+        return None
+    facing_index = -3 if numbers >= 3 else -2
+    if parts[facing_index] != "1":
+        return None
+    sprite, anim = parts[0], "_".join(parts[1:facing_index])
+    if sprite in ASYMMETRIC_ANIMATIONS:
+        asymmetric = ASYMMETRIC_ANIMATIONS[sprite]
+        if asymmetric is None or anim in asymmetric:
+            return None
+    parts[facing_index] = "0"
+    return "_".join(parts) + stem[len(base):]
+
+
+def is_mirror_image(surface, source):
+    # Whether surface looks exactly the same as source flipped horizontally. Only pixels which are visible in either
+    # image are compared, as the colour of fully transparent pixels makes no difference
+    if surface.get_size() != source.get_size():
+        return False
+    mirrored = pygame.transform.flip(source, True, False)
+    pixels = [numpy.dstack((pygame.surfarray.pixels3d(image), pygame.surfarray.pixels_alpha(image)))
+              for image in (surface, mirrored)]
+    visible = (pixels[0][..., 3] > 0) | (pixels[1][..., 3] > 0)
+    return numpy.array_equal(pixels[0][visible], pixels[1][visible])
+
+
+def get_variant_base(stem):
+    # For a colour variant other than variant 0, (the name of the same image in variant 0, recolour table key),
+    # otherwise None. Filenames of sprites with colour variants are sprite_anim_facing_frame_variant
+    base = stem.removesuffix("_shadow")
+    parts = base.split("_")
+    if len(parts) < 5 or not all(part.isdigit() for part in parts[-3:]) or parts[-1] == "0":
+        return None
+    table_key = f"{parts[0]}_{parts[-1]}"
+    parts[-1] = "0"
+    return "_".join(parts) + stem[len(base):], table_key
+
+
+def add_recolour_tables(group, stems, surfaces, index):
+    # Fits a recolour table for each colour variant in the group, and returns the indices of the images which can be
+    # made with one, which are added to the index. Images the table doesn't reproduce exactly are packed as usual
+    variants = {}
+    for i, stem in enumerate(stems):
+        variant = get_variant_base(stem)
+        if variant is not None and variant[0] in stems:
+            base = stems.index(variant[0])
+            if surfaces[base].get_size() == surfaces[i].get_size():
+                variants.setdefault(variant[1], []).append((base, i))
+
+    recoloured = set()
+    for table_key, images in variants.items():
+        table = recolour.fit_table([(surfaces[base], surfaces[i]) for base, i in images])
+        lookup = recolour.get_lookup(table)
+        matched = [(base, i) for base, i in images
+                   if recolour.get_error(surfaces[base], surfaces[i], lookup) == 0]
+        print(f"{table_key}: {len(matched)} of {len(images)} images recoloured from variant 0")
+        if not matched:
+            continue
+        index["recolour_tables"][table_key] = [table[0].tolist(), table[1].tolist()]
+        for base, i in matched:
+            index["images"][f"{group}/{stems[i]}"] = {"recolour": f"{group}/{stems[base]}", "table": table_key}
+            recoloured.add(i)
+    return recoloured
+
+
+def pack_rects(sizes):
+    # Shelf packing - images are sorted tallest first, and placed left to right in rows, starting a new row when the
+    # current one is full and a new sheet when the current one is. Images of the same size keep their order, so frames
+    # of the same animation end up next to each other.
+    # Returns a list of sheets, each a list of (index in sizes, x, y)
+    sheets = []
+    placed = []
+    x = y = row_height = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        width, height = sizes[i]
+        if x + width > SHEET_SIZE:
+            x, y, row_height = 0, y + row_height, 0
+        if y + height > SHEET_SIZE:
+            sheets.append(placed)
+            placed = []
+            x = y = row_height = 0
+        placed.append((i, x, y))
+        x += width
+        row_height = max(row_height, height)
+    if placed:
+        sheets.append(placed)
+    return sheets
+
+
+def get_trimmed_rect(surface):
+    # The smallest rectangle containing every pixel which isn't fully transparent. An image with none is kept as a
+    # single pixel, as a subsurface can't be empty
+    rect = surface.get_bounding_rect()
+    if rect.width == 0 or rect.height == 0:
+        return pygame.Rect(0, 0, 1, 1)
+    return rect
+
+
+def pack_group(group, stems, output_dir, index):
+    # Returns the total area of the packed images before and after trimming
+    names = [f"{group}/{stem}" for stem in stems]
+    surfaces = [pygame.image.load(IMAGES_DIR / f"{name}.png") for name in names]
+    recoloured = add_recolour_tables(group, stems, surfaces, index) if RECOLOUR_VARIANTS else set()
+    packed = []
+    for i, surface in enumerate(surfaces):
+        if max(surface.get_size()) > MAX_IMAGE_SIZE or i in recoloured:
+            continue
+        source = get_mirror_source(stems[i]) if MIRROR_FACINGS else None
+        if source is not None and source in stems:
+            if is_mirror_image(surface, surfaces[stems.index(source)]):
+                index["images"][names[i]] = {"mirror": f"{group}/{source}"}
+                continue
+            print(f"Warning: {names[i]} isn't a mirror image of {source}, so both are packed. If the animation is "
+                  f"meant to be asymmetric, add it to ASYMMETRIC_ANIMATIONS")
+        packed.append(i)
+    trimmed = [get_trimmed_rect(surfaces[i]) for i in packed]
+    sizes = [rect.size for rect in trimmed]
+
+    for sheet_number, placed in enumerate(pack_rects(sizes)):
+        sheet_name = f"{group.replace('/', '_')}_{sheet_number}"
+        width = max(x + sizes[i][0] for i, x, y in placed)
+        height = max(y + sizes[i][1] for i, x, y in placed)
+        sheet = pygame.Surface((width, height), pygame.SRCALPHA)
+        for i, x, y in placed:
+            surface = surfaces[packed[i]]
+            rect = trimmed[i]
+            # The sheet starts out fully transparent, so taking the maximum of each channel copies the image exactly,
+            # whereas a normal blit would blend semi-transparent pixels with the transparent black beneath
+            sheet.blit(surface, (x, y), rect, special_flags=pygame.BLEND_RGBA_MAX)
+            index["images"][names[packed[i]]] = {
+                "sheet": len(index["sheets"]),
+                "rect": [x, y, rect.width, rect.height],
+                "size": list(surface.get_size()),
+                "offset": [rect.x, rect.y],
+            }
+        pygame.image.save(sheet, str(output_dir / f"{sheet_name}.png"))
+        index["sheets"].append(sheet_name)
+        print(f"{sheet_name}: {len(placed)} images, {width}x{height}")
+    return sum(surfaces[i].get_width() * surfaces[i].get_height() for i in packed), sum(w * h for w, h in sizes)
+
+
+def pack_all(output_dir=IMAGES_DIR / SPRITE_SHEETS_DIR):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Remove sheets from a previous run, as there may now be fewer of them
+    for path in output_dir.glob("*.png"):
+        path.unlink()
+    index = {"version": INDEX_VERSION, "sheets": [], "images": {}, "recolour_tables": {}}
+    original_pixels = trimmed_pixels = 0
+    for group, stems in get_groups().items():
+        original, trimmed = pack_group(group, stems, output_dir, index)
+        original_pixels += original
+        trimmed_pixels += trimmed
+    with open(output_dir / INDEX_FILE, "w", encoding="utf-8") as file:
+        json.dump(index, file, separators=(",", ":"))
+    mirrored = sum("mirror" in entry for entry in index["images"].values())
+    recoloured = sum("recolour" in entry for entry in index["images"].values())
+    print(f"Packed {len(index['images']) - mirrored - recoloured} images into {len(index['sheets'])} sheets, trimming "
+          f"them to {trimmed_pixels / original_pixels:.0%} of their original area. {mirrored} more are mirrored and "
+          f"{recoloured} recoloured")
+
+
+if __name__ == "__main__":
+    # Usage: python -m game.assets.sheet_packer
+    pack_all()
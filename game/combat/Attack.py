@@ -1,4 +1,18 @@
+from game.assets.AnimationAtlas import anim_id
+
+
 class Attack:
+    # Attacks are loaded from attacks.json (see attacks_data), and each is given an integer id, its index in
+    # attacks_data.ATTACK_LIST.
+    # While a fighter is attacking, what happens on each game frame of the attack (the animation frame to show, and
+    # whether opponents can be hit) is looked up in tables calculated here, indexed by the number of game frames since
+    # the attack started (Fighter.frame), up to last_frame_index - see Fighter.get_attack_frame_index
+
+    __slots__ = ("name", "id", "sprite", "anim_id", "strength", "recovery_time", "anim_time", "frame_time", "frames",
+                 "hit_frames", "reach", "throw", "grab", "combo_next", "flying_kick", "stamina_cost", "rear_attack",
+                 "stamina_damage_multiplier", "stun_time_multiplier", "initial_sound", "hit_sound", "anim_frames",
+                 "is_hit_frame", "last_frame_index")
+
     def __init__(self, sprite=None, strength=None, anim_time=None, frame_time=5, frames=0, hit_frames=(),
                  recovery_time=0, reach=80, throw=False, grab=False, combo_next=None, flyingkick=False,
                  stamina_cost=10, rear_attack=False, stamina_damage_multiplier=1, stun_time_multiplier=1,
@@ -9,13 +23,18 @@ class Attack:
         if combo_next is not None:
             combo_next = {int(key): value for (key, value) in combo_next.items()}
 
+        # Set by attacks_data when the attack is added to the table
+        self.name = None
+        self.id = None
+
         self.sprite = sprite
+        self.anim_id = anim_id(sprite) if sprite is not None else None     # See AnimationAtlas
         self.strength = strength
         self.recovery_time = recovery_time  # Can't attack for this many frames after attack animation finishes
         self.anim_time = anim_time      # Frames for which animation plays, this allows us to stay on the last frame longer than previous frames
         self.frame_time = frame_time    # Frames for which each animation frame plays
         self.frames = frames            # Number of frames in animation
-        self.hit_frames = hit_frames    # frames on which an opponent can be hit by this attack
+        self.hit_frames = frozenset(hit_frames)    # frames on which an opponent can be hit by this attack
         self.reach = reach              # Opponent must be closer than this for attack to hit
         self.throw = throw              # Is this an attack where we throw something, such as a barrel or the player?
         self.grab = grab                # Is this the attack where the boss grabs the player and throws him?
@@ -27,3 +46,31 @@ class Attack:
         self.stun_time_multiplier = stun_time_multiplier
         self.initial_sound = initial_sound
         self.hit_sound = hit_sound
+
+        self.build_frame_tables()
+
+    def build_frame_tables(self):
+        # anim_frames - animation frame for each game frame of the attack. Each animation frame lasts frame_time game
+        # frames, and the animation stays on the last frame until the end
+        # is_hit_frame - whether an opponent can be hit on each game frame
+        # The tables continue until the last animation frame is reached and the attack is over, so every game frame
+        # after last_frame_index is the same as last_frame_index
+        if self.sprite is None:
+            # Only used for being hit by (e.g. by a scooter), never performed
+            self.anim_frames = self.is_hit_frame = ()
+            self.last_frame_index = -1
+            return
+        length = max(self.anim_time, self.frames * self.frame_time) + 1
+        self.anim_frames = tuple(min(frame // self.frame_time, self.frames - 1) for frame in range(length))
+        self.is_hit_frame = tuple(frame in self.hit_frames for frame in self.anim_frames)
+        self.last_frame_index = length - 1
+
+    def __getstate__(self):
+        # For the cached attack table (see attacks_data). Animation type ids depend on the order in which animation
+        # types are first used, so can differ between runs - anim_id is looked up again when unpickling
+        return {name: getattr(self, name) for name in Attack.__slots__ if name != "anim_id"}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.anim_id = anim_id(self.sprite) if self.sprite is not None else None
@@ -1,19 +1,115 @@
+import inspect
 import json
 from pathlib import Path
 
+from game.assets.compiled_cache import load_compiled, save_compiled
 from game.combat.Attack import Attack
+from game.config import DATA_CACHE_ENABLED
 
 
 # Load attack data from file
+# The data is checked when loaded, so that a mistake in attacks.json is reported when the game starts, with the attack
+# it's in, rather than causing an error part way through a game. The checked attack table is cached (see
+# compiled_cache), so that this only happens when the file has changed
 
-def load_attacks():
-    attacks_path = Path(__file__).resolve().parents[2] / "attacks.json"
-    with attacks_path.open(encoding="utf-8") as attacks_file:
-        data = json.load(attacks_file)
-    for key, value in data.items():
+ATTACKS_PATH = Path(__file__).resolve().parents[2] / "attacks.json"
+
+# Changed whenever Attack changes, so that tables cached by an older version of the code are rebuilt
+COMPILED_VERSION = 1
+
+BOOL_SETTINGS = ("throw", "grab", "flyingkick", "rear_attack")
+NUMBER_SETTINGS = ("strength", "recovery_time", "reach", "stamina_cost", "stamina_damage_multiplier",
+                   "stun_time_multiplier")
+
+
+class AttackDataError(Exception):
+    pass
+
+
+def is_int(value, minimum):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= minimum
+
+
+def check_sound(value, where):
+    # Sounds are given as [name, number of variants]
+    if value is not None and not (isinstance(value, list) and len(value) == 2 and isinstance(value[0], str)
+                                  and is_int(value[1], 1)):
+        raise AttackDataError(f"{where}: expected [sound name, number of variants], got {value!r}")
+
+
+def check_attack(name, data, names):
+    where = f"attacks.json: {name}"
+    if not isinstance(data, dict):
+        raise AttackDataError(f"{where}: expected an object")
+    try:
+        inspect.signature(Attack).bind(**data)
+    except TypeError as ex:
+        raise AttackDataError(f"{where}: {ex}") from None
+
+    if not isinstance(data.get("strength"), (int, float)):
+        raise AttackDataError(f"{where}: strength must be a number")
+    for key in NUMBER_SETTINGS:
+        if key in data and (not isinstance(data[key], (int, float)) or isinstance(data[key], bool)):
+            raise AttackDataError(f"{where}: {key} must be a number, got {data[key]!r}")
+    for key in BOOL_SETTINGS:
+        if key in data and not isinstance(data[key], bool):
+            raise AttackDataError(f"{where}: {key} must be true or false, got {data[key]!r}")
+    check_sound(data.get("initial_sound"), f"{where}, initial_sound")
+    check_sound(data.get("hit_sound"), f"{where}, hit_sound")
+
+    # Attacks which are performed (rather than only used for being hit by something) have an animation
+    if data.get("sprite") is not None:
+        if not isinstance(data["sprite"], str):
+            raise AttackDataError(f"{where}: sprite must be a string")
+        if not is_int(data.get("anim_time"), 1):
+            raise AttackDataError(f"{where}: anim_time must be a whole number of frames, 1 or more")
+        if not is_int(data.get("frame_time", 5), 1):
+            raise AttackDataError(f"{where}: frame_time must be a whole number of frames, 1 or more")
+        frames = data.get("frames", 0)
+        if not is_int(frames, 1):
+            raise AttackDataError(f"{where}: frames must be a whole number, 1 or more")
+        hit_frames = data.get("hit_frames", [])
+        if not isinstance(hit_frames, list) or not all(is_int(frame, 0) and frame < frames for frame in hit_frames):
+            raise AttackDataError(f"{where}: hit_frames must be a list of animation frames, 0 to {frames - 1}")
+
+    combo_next = data.get("combo_next")
+    if combo_next is not None:
+        if not isinstance(combo_next, dict):
+            raise AttackDataError(f"{where}: combo_next must be an object")
+        for key, next_attack in combo_next.items():
+            if not key.isdigit() or next_attack not in names:
+                raise AttackDataError(f"{where}: invalid combo_next entry {key!r}: {next_attack!r}")
+
+
+def build_attacks(data):
+    # Returns a list of attacks, in which each attack's id is its index
+    if not isinstance(data, dict):
+        raise AttackDataError("attacks.json: expected an object")
+    attack_list = []
+    for name, value in data.items():
+        check_attack(name, value, data)
         # Turn values in the dictionary into constructor parameters of the Attack class
-        data[key] = Attack(**value)
-    return data
+        attack = Attack(**value)
+        attack.name = name
+        attack.id = len(attack_list)
+        attack_list.append(attack)
+    return attack_list
+
+
+def load_attacks(use_cache=DATA_CACHE_ENABLED):
+    contents = ATTACKS_PATH.read_bytes()
+    attack_list = load_compiled("attacks", contents, COMPILED_VERSION) if use_cache else None
+    if attack_list is None:
+        try:
+            data = json.loads(contents)
+        except json.JSONDecodeError as ex:
+            raise AttackDataError(f"attacks.json: {ex}") from None
+        attack_list = build_attacks(data)
+        if use_cache:
+            save_compiled("attacks", contents, COMPILED_VERSION, attack_list)
+    return attack_list
 
 
-ATTACKS = load_attacks()
+# Attacks indexed by id, and by name
+ATTACK_LIST = load_attacks()
+ATTACKS = {attack.name: attack for attack in ATTACK_LIST}
@@ -9,6 +9,13 @@ BOSS_HEALTH_STAMINA_BAR_HEIGHT = 26
 
 INTRO_ENABLED = True
 
+# The stage file the game's stages are loaded from (relative to the game's directory), see stage_data
+STAGES_FILE = "stages/final.json"
+
+# Save the checked and converted contents of stage files and attacks.json in the cache directory, so that they load
+# more quickly next time, see compiled_cache
+DATA_CACHE_ENABLED = True
+
 FLYING_KICK_VEL_X = 3
 FLYING_KICK_VEL_Y = -8
 
@@ -40,7 +47,11 @@ DEBUG_SHOW_ANCHOR_POINTS = False
 DEBUG_SHOW_HIT_AREA_WIDTH = False
 DEBUG_SHOW_LOGS = False
 DEBUG_SHOW_HEALTH_AND_STAMINA = False
+# Show the frame time overlay from the start (F9 toggles it in game), and print asset and text cache statistics when
+# a game ends. F8 starts recording a trace of frame timings, and pressing it again saves it to PROFILE_TRACE_PATH, in
+# Chrome's trace format - see Instrumentation
 DEBUG_PROFILING = False
+PROFILE_TRACE_PATH = "trace.json"
 
 # These symbols substitute for the controller button images when displaying text.
 # The symbols representing these images must be ones that aren't actually used themselves, e.g. we don't use the
@@ -56,6 +67,13 @@ HEIGHT = 480
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
 
+# How the game screen is scaled up to the window or display - "integer", "scale" or "smoothscale", see Presenter.
+# Press F10 in game to switch between them
+DISPLAY_SCALE_MODE = "smoothscale"
+
+# Use the NumPy particle engine for weather effects, if NumPy is installed, see WeatherParticles.py
+WEATHER_USE_NUMPY = True
+
 TITLE = "Masuku no Monogatari"
 
 MIN_WALK_Y = 310
@@ -77,6 +95,8 @@ ANCHOR_CENTRE = ("center", "center")
 ANCHOR_CENTRE_BOTTOM = ("center", "bottom")
 
 BACKGROUND_TILE_SPACING = 290
+# All background tiles are this wide, so they overlap the next tile, see BackgroundLayer
+BACKGROUND_TILE_WIDTH = 417
 
 BACKGROUND_TILES_RAW = [
     # 1st row of TILE_DEMO+_3.png
@@ -103,6 +123,43 @@ BLANK_IMAGE = "misc/blank"
 ITEMS_DIR = "items"
 FONT_IMAGE_PREFIX = "ui/font/font0"
 
+# Sprite sheets made by sheet_packer, in this directory under images. When the directory has an index, actor images are
+# taken from the sheets (see SpriteSheets) rather than loaded from their own files
+SPRITE_SHEETS_DIR = "packed"
+SPRITE_SHEETS_ENABLED = True
+
+# Decoded pixels of the images loaded by name (including the sprite sheets), made by asset_packer, in
+# SPRITE_SHEETS_DIR. When it exists, images are loaded from it (see AssetPack) rather than by decoding their files
+ASSET_PACK_FILE = "images.pack"
+ASSET_PACK_ENABLED = True
+
+# When True, sheet_packer doesn't pack right facing images which are mirror images of the left facing ones, and they're
+# made by flipping the left facing images when loaded
+MIRROR_FACINGS = True
+
+# Animations whose right facing images aren't mirror images of the left facing ones, so both are packed, keyed on
+# sprite. None means all of the sprite's animations
+ASYMMETRIC_ANIMATIONS = {
+    "hero": ("die", "elbow", "flying_kick", "getup", "highkick", "hit", "knockdown", "lowkick", "lpunch", "rpunch",
+             "uppercut"),
+    "boss": ("getup",),
+    "scooterboy": ("die",),
+    "kasaobake": None,
+    "onna": None,
+    "kappa": None,
+    "tanuki": None,
+    "inari": None,
+    "tengu": None,
+}
+
+# When True, sheet_packer doesn't pack images of colour variants which recolouring variant 0 with a small table of
+# colour changes reproduces exactly, and they're made when first used instead. The current artwork wasn't drawn as
+# palette swaps, and none of its variant images can be reproduced exactly, so this is off
+RECOLOUR_VARIANTS = False
+
+# Maximum number of recoloured images kept, see SpriteSheets
+RECOLOUR_CACHE_SIZE = 512
+
 SPRITE_DIRS = {
     "hero": "characters/hero",
     "vax": "characters/vax",
@@ -117,3 +174,11 @@ SPRITE_DIRS = {
     "inari": "characters/inari",
     "tengu": "characters/tengu",
 }
+
+# Images loaded by name are discarded, least recently used first, when together they take up more than this many bytes,
+# apart from the HUD and the player's and weapons' images, whose names start with one of SURFACE_CACHE_PINNED. Images
+# only needed by earlier stages are discarded when a stage starts. See SurfaceCache
+SURFACE_CACHE_BUDGET = 192 * 1024 * 1024
+SURFACE_CACHE_PINNED = ("ui/", "misc/", "backgrounds/road", f"{SPRITE_DIRS['hero']}/", f"{ITEMS_DIR}/",
+                        f"{SPRITE_SHEETS_DIR}/{SPRITE_DIRS['hero'].replace('/', '_')}_",
+                        f"{SPRITE_SHEETS_DIR}/{ITEMS_DIR}_")
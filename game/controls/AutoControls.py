@@ -0,0 +1,62 @@
+from game.config import WIDTH
+from game.controls.Controls import Controls
+from game.utils import sign
+import game.runtime as runtime
+
+
+class AutoControls(Controls):
+    # Very simple computer player, used when running the game headless. Walks right through the level, lines up with
+    # the nearest enemy and punches it. It's not clever, but it's enough to get through stages without a human at the
+    # keyboard.
+
+    # How close we try to get to an enemy on the X axis before attacking
+    ATTACK_DISTANCE_X = 70
+
+    def __init__(self, attack_interval=10):
+        super().__init__()
+        self.attack_interval = attack_interval
+        self.frame = 0
+
+    def update(self):
+        self.frame += 1
+        super().update()
+
+    def get_target_enemy(self):
+        game = runtime.game
+        if game is None:
+            return None
+        player = game.player
+        # Only consider enemies which are on the screen, or close to it
+        candidates = [enemy for enemy in game.enemies
+                      if enemy.lives > 0 and -100 < enemy.vpos.x - game.scroll_offset.x < WIDTH + 100]
+        if len(candidates) == 0:
+            return None
+        return min(candidates, key=lambda enemy: abs(enemy.vpos.x - player.vpos.x))
+
+    def get_x(self):
+        game = runtime.game
+        if game is None:
+            return 0
+        enemy = self.get_target_enemy()
+        if enemy is None:
+            # Nobody to fight, keep walking right so that the level scrolls
+            return 1
+        dx = enemy.vpos.x - game.player.vpos.x
+        if abs(dx) > AutoControls.ATTACK_DISTANCE_X:
+            return sign(dx)
+        return 0
+
+    def get_y(self):
+        game = runtime.game
+        if game is None:
+            return 0
+        enemy = self.get_target_enemy()
+        if enemy is None:
+            return 0
+        dy = enemy.vpos.y - game.player.vpos.y
+        return sign(dy) if abs(dy) > 2 else 0
+
+    def button_down(self, button):
+        # Only ever punch (which also skips the intro and outro text). The button must be released in between presses
+        # for each press to register, so hold it down for a single frame at a time
+        return button == 0 and self.frame % self.attack_interval == 0
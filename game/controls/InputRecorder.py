@@ -0,0 +1,81 @@
+import struct
+
+from game.controls.Controls import Controls
+
+
+# Binary format for recorded input:
+# Header: 4 byte identifier, 1 byte format version, 4 byte game seed, 4 byte frame count (all little-endian)
+# Then one byte per frame:
+#   bits 0-1: X axis + 1 (0 = left, 1 = none, 2 = right)
+#   bits 2-3: Y axis + 1 (0 = up, 1 = none, 2 = down)
+#   bits 4-7: buttons 0-3 held down
+# So a ten minute session at 60 frames per second takes up around 36KB
+RECORDING_MAGIC = b"MSKI"
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct("<4sBII")
+
+
+def encode_input(x, y, buttons_down):
+    value = (x + 1) | ((y + 1) << 2)
+    for button, down in enumerate(buttons_down):
+        if down:
+            value |= 1 << (4 + button)
+    return value
+
+
+def decode_input(value):
+    # Returns x, y, and a list of whether each button is down
+    x = (value & 3) - 1
+    y = ((value >> 2) & 3) - 1
+    buttons_down = [(value >> (4 + button)) & 1 == 1 for button in range(Controls.NUM_BUTTONS)]
+    return x, y, buttons_down
+
+
+class InputRecorder(Controls):
+    # Wraps another Controls object, recording its state each frame so the game can later be replayed exactly using
+    # ReplayControls. The game should be given the recorder as its controls object, so that it sees exactly the same
+    # (digital) inputs as the replay will.
+    # If update_source is False, the wrapped controls must be updated separately before this object is updated (e.g.
+    # by the main loop, which updates keyboard and joystick controls every frame regardless of game state)
+
+    def __init__(self, source, update_source=True):
+        super().__init__()
+        self.source = source
+        self.update_source = update_source
+        self.data = bytearray()
+        self.x = 0
+        self.y = 0
+        self.buttons_down = [False for _ in range(Controls.NUM_BUTTONS)]
+
+    def update(self):
+        if self.update_source:
+            self.source.update()
+
+        # Sample the current state of the wrapped controls, and store it
+        value = encode_input(self.source.get_x(), self.source.get_y(),
+                             [self.source.button_down(button) for button in range(Controls.NUM_BUTTONS)])
+        self.data.append(value)
+
+        # Use the decoded value, so that the game sees exactly what will be replayed
+        self.x, self.y, self.buttons_down = decode_input(value)
+        super().update()
+
+    def get_x(self):
+        return self.x
+
+    def get_y(self):
+        return self.y
+
+    def button_down(self, button):
+        return self.buttons_down[button]
+
+    def get_frame_count(self):
+        return len(self.data)
+
+    def to_bytes(self, seed):
+        return RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, seed, len(self.data)) + bytes(self.data)
+
+    def save(self, path, seed):
+        # seed should be the seed of the game that was being played, see Game.seed
+        with open(path, "wb") as file:
+            file.write(self.to_bytes(seed))
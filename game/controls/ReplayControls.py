@@ -0,0 +1,59 @@
+from game.controls.Controls import Controls
+from game.controls.InputRecorder import RECORDING_HEADER, RECORDING_MAGIC, RECORDING_VERSION, decode_input
+
+
+class ReplayControls(Controls):
+    # Plays back input recorded by InputRecorder, one frame per call to update. Together with the seed stored in the
+    # recording (pass it to Game), this reproduces the recorded game exactly. Once the recording runs out, no input is
+    # given and finished becomes True
+
+    def __init__(self, data, seed=0):
+        super().__init__()
+        self.data = data
+        self.seed = seed
+        self.frame = 0
+        self.x = 0
+        self.y = 0
+        self.buttons_down = [False for _ in range(Controls.NUM_BUTTONS)]
+        self.finished = len(data) == 0
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < RECORDING_HEADER.size:
+            raise ValueError("Input recording is too short to contain a header")
+        magic, version, seed, frame_count = RECORDING_HEADER.unpack_from(data)
+        if magic != RECORDING_MAGIC:
+            raise ValueError("Not an input recording")
+        if version != RECORDING_VERSION:
+            raise ValueError(f"Unsupported input recording version {version}")
+        frames = data[RECORDING_HEADER.size:RECORDING_HEADER.size + frame_count]
+        if len(frames) != frame_count:
+            raise ValueError(f"Input recording is truncated, expected {frame_count} frames but found {len(frames)}")
+        return cls(frames, seed)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    def update(self):
+        if self.frame < len(self.data):
+            self.x, self.y, self.buttons_down = decode_input(self.data[self.frame])
+            self.frame += 1
+        else:
+            self.x, self.y = 0, 0
+            self.buttons_down = [False for _ in range(Controls.NUM_BUTTONS)]
+            self.finished = True
+        super().update()
+
+    def get_x(self):
+        return self.x
+
+    def get_y(self):
+        return self.y
+
+    def button_down(self, button):
+        return self.buttons_down[button]
+
+    def get_frame_count(self):
+        return len(self.data)
@@ -13,6 +13,10 @@ class Barrel(Weapon):
         self.last_thrower = None
         self.frame = 0
 
+        # Image handles for the rolling animation, indexed by [facing_id][frame]
+        self.roll_handles = [[runtime.atlas.get_handle(f"{ITEMS_DIR}/barrel_roll_{facing_id}_{frame}") for frame in range(4)]
+                             for facing_id in range(2)]
+
     def update(self):
         # Call parent update
         super().update()
@@ -20,7 +24,7 @@ class Barrel(Weapon):
         # If moving, look for people to bash into
         # Won't collide if it can be picked up (if it is moving slowly enough)
         if not self.held and not self.can_be_picked_up() and self.vel.x != 0:
-            for fighter in [runtime.game.player] + runtime.game.enemies:
+            for fighter in runtime.game.spatial_index.get_fighters_near(self.vpos, 30):
                 # Won't collide with the person who threw it
                 # Won't collide with a fighter who is falling (incl. lying on the ground)
                 # Must be within 30 pixels on X axis
@@ -46,7 +50,7 @@ class Barrel(Weapon):
             # Update rolling animation
             facing_id = 1 if self.vel.x > 0 else 0
             self.frame += 1
-            self.image = f"{ITEMS_DIR}/barrel_roll_{facing_id}_{(self.frame // 14) % 4}"
+            self.set_image_handle(self.roll_handles[facing_id][(self.frame // 14) % 4])
 
     def throw(self, dir_x, thrower):
         self.dropped()
@@ -60,7 +64,7 @@ class Barrel(Weapon):
 
     def dropped(self):
         super().dropped()
-        self.image = f"{ITEMS_DIR}/barrel_roll_0_0"
+        self.set_image_handle(self.roll_handles[0][0])
 
     def can_be_picked_up(self):
         return super().can_be_picked_up() and self.vel.length() < 1
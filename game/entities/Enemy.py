@@ -1,6 +1,5 @@
 from abc import ABC
 from enum import Enum
-from random import choice, randint
 
 from pygame import Vector2
 
@@ -13,6 +12,9 @@ import game.runtime as runtime
 
 
 class Enemy(Fighter, ABC):
+    __slots__ = ("target", "target_weapon", "state", "enemy_type", "title_name", "state_timer", "attacks",
+                 "approach_player_distance", "score")
+
     # State is an inner class - a class within a class, so its name doesn't clash with the global class State
     class State(Enum):
         APPROACH_PLAYER = 0
@@ -75,7 +77,7 @@ class Enemy(Fighter, ABC):
             if player.attack_timer > 0 \
               and abs(self.vpos.y - player.vpos.y) < 20 \
               and abs(self.vpos.x - player.vpos.x) < 200 \
-              and randint(0, 500) == 0:
+              and runtime.rng.randint(0, 500) == 0:
                 self.log("Back away from attack")
                 self.target.x = self.vpos.x - self.facing_x * 90
                 self.state = Enemy.State.GO_TO_POS
@@ -138,8 +140,8 @@ class Enemy(Fighter, ABC):
 
             # Check to see if another enemy is already heading for the new target pos, or one very close to it.
             # If so, make a new decision
-            other_enemies_same_target = [enemy for enemy in runtime.game.enemies if enemy is not self and
-                                         (enemy.target - self.target).length() < 20]
+            other_enemies_same_target = [enemy for enemy in runtime.game.spatial_index.get_enemies_with_target_near(self.target, 20)
+                                         if enemy is not self and (enemy.target - self.target).length() < 20]
             if len(other_enemies_same_target) > 0:
                 self.log("Same target")
                 self.make_decision()
@@ -147,8 +149,11 @@ class Enemy(Fighter, ABC):
         # Call through to Fighter class update
         super().update()
 
-    def draw(self, offset):
-        super().draw(offset)
+        # Our target may have changed, let the spatial index know so that enemies updated after us see the new target
+        runtime.game.spatial_index.enemy_target_moved(self)
+
+    def draw_debug(self, offset):
+        super().draw_debug(offset)
 
         if DEBUG_SHOW_TARGET_POS:
             screen.draw.line(self.vpos - offset, self.target - offset, (255,255,255))
@@ -169,11 +174,11 @@ class Enemy(Fighter, ABC):
                and self.vpos.y == py \
                and (self.approach_player_distance * 0.9 < abs(self.vpos.x - px) <= self.approach_player_distance * 1.1 or
                     holding_barrel) \
-               and randint(0,19) == 0:
+               and runtime.rng.randint(0,19) == 0:
             if self.weapon is not None:
                 return ATTACKS[self.weapon.name]
             else:
-                chosen_attack = ATTACKS[choice(self.attacks)]
+                chosen_attack = ATTACKS[runtime.rng.choice(self.attacks)]
 
                 # If the chosen attack is a grab, don't allow it if the player is currently doing a flying kick
                 if chosen_attack.grab and runtime.game.player.last_attack is not None and runtime.game.player.last_attack.flying_kick:
@@ -187,9 +192,6 @@ class Enemy(Fighter, ABC):
     def determine_drop_weapon(self):
         return False
 
-    def enemy_type(self):
-        return Enemy.Type.NORMAL
-
     def get_opponents(self):
         return [runtime.game.player]
 
@@ -251,7 +253,7 @@ class Enemy(Fighter, ABC):
             # 3/10 chance of going to a random point slightly further from the player
             # 1/10 chance of pausing for a short time
 
-            r = randint(0, 9)
+            r = runtime.rng.randint(0, 9)
             if r < 7:
                 # Check to see if another enemy on the same X side of the player is already heading to attack them
                 # If so, flank instead
@@ -266,7 +268,7 @@ class Enemy(Fighter, ABC):
                     self.target.x = player.vpos.x - sign(self.vpos.x - player.vpos.x) * 50
                     self.target.y = player.vpos.y + sign(self.vpos.y - player.vpos.y) * 50
                     if self.target.y == player.vpos.y:
-                        self.target.y = player.vpos.y + choice((-1,1)) * 50
+                        self.target.y = player.vpos.y + runtime.rng.choice((-1,1)) * 50
                 else:
                     # Go to player
                     self.log("Go to player")
@@ -278,18 +280,18 @@ class Enemy(Fighter, ABC):
                 self.log("Go to distance from player")
                 x_side = sign(self.vpos.x - player.vpos.x)
                 if x_side == 0:
-                    x_side = choice((1,-1))
+                    x_side = runtime.rng.choice((1,-1))
                 x1 = int(player.vpos.x + (150 * x_side))
                 x2 = int(player.vpos.x + (400 * x_side))
-                x = randint(min(x1,x2), max(x1,x2))
-                y = randint(runtime.game.boundary.top, runtime.game.boundary.bottom)
+                x = runtime.rng.randint(min(x1,x2), max(x1,x2))
+                y = runtime.rng.randint(runtime.game.boundary.top, runtime.game.boundary.bottom)
                 self.target = Vector2(x, y)
                 self.state = Enemy.State.GO_TO_POS
 
             else:
                 # Pause
                 self.log("Pause")
-                self.state_timer = randint(50, 100)
+                self.state_timer = runtime.rng.randint(50, 100)
                 self.state = Enemy.State.PAUSE
 
     def should_remove(self):
@@ -1,4 +1,3 @@
-from random import randint
 from pygame import Vector2
 
 from game.config import *
@@ -9,10 +8,12 @@ import game.runtime as runtime
 
 
 class EnemyBoss(Enemy):
+    SPRITE = "boss"
+
     def __init__(self, pos, start_timer=20):
-        super().__init__(pos, "boss", ("boss_lpunch", "boss_rpunch", "boss_kick", "boss_grab_player",),
+        super().__init__(pos, EnemyBoss.SPRITE, ("boss_lpunch", "boss_rpunch", "boss_kick", "boss_grab_player",),
                          speed=Vector2(0.9,0.8), health=25, stamina=1000, start_timer=start_timer, anchor_y=280,
-                         half_hit_area=Vector2(30, 20), colour_variant=randint(0,2), score=75)
+                         half_hit_area=Vector2(30, 20), colour_variant=runtime.rng.randint(0,2), score=75)
         self.stand_frames = 2
 
     def make_decision(self):
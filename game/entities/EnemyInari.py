@@ -9,12 +9,15 @@ import game.runtime as runtime
 
 
 class EnemyInari(Enemy):
+    SPRITE = "inari"
+    BOSS_INTRO_IMAGE = "inari_boss_intro"
+
     def __init__(self, pos, start_timer=20):
-        super().__init__(pos, "inari", ("inari_fight", "inari_fight"),
+        super().__init__(pos, EnemyInari.SPRITE, ("inari_fight", "inari_fight"),
             speed=Vector2(0.5, 0.5), health=10, stamina=1000, start_timer=start_timer,anchor_y=280,
             score=100, enemy_type=Enemy.EnemyType.MID_BOSS)
         self.title_name = "稲荷 (Inari)"
-        self.boss_intro_image = "inari_boss_intro"
+        self.boss_intro_image = EnemyInari.BOSS_INTRO_IMAGE
 
     def died(self):
         super().died()
@@ -12,7 +12,9 @@ import game.runtime as runtime
 
 
 class EnemyKappa(Enemy):
+    SPRITE = "kappa"
+
     def __init__(self, pos, start_timer=20):
-        super().__init__(pos, "kappa", ("kappa_fight", "kappa_kick"),
+        super().__init__(pos, EnemyKappa.SPRITE, ("kappa_fight", "kappa_kick"),
                          speed=Vector2(0.5, 0.5), health=5, stamina=500, start_timer=start_timer,
                          score=20, enemy_type=Enemy.EnemyType.NORMAL)
@@ -9,12 +9,15 @@ import game.runtime as runtime
 
 
 class EnemyKasaobake(Enemy):
+    SPRITE = "kasaobake"
+    BOSS_INTRO_IMAGE = "kasaobake_boss_intro"
+
     def __init__(self, pos, start_timer=20):
-        super().__init__(pos, "kasaobake", ("kasaobake_kick", "kasaobake_attack"),
+        super().__init__(pos, EnemyKasaobake.SPRITE, ("kasaobake_kick", "kasaobake_attack"),
                          speed=Vector2(0.5,0.5), health=10, stamina=1000, start_timer=start_timer, anchor_y=310,
                          score=100, enemy_type=Enemy.EnemyType.MID_BOSS)
         self.title_name = "傘おばけ (Kasa-obake)"
-        self.boss_intro_image = "kasaobake_boss_intro"
+        self.boss_intro_image = EnemyKasaobake.BOSS_INTRO_IMAGE
     
     def died(self):
         super().died()
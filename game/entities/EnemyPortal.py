@@ -1,19 +1,21 @@
-from random import randint, choice
 from pygame import Vector2
 
 from game.config import *
 from game.entities.Enemy import Enemy
+from game.systems.SoundBank import SOUND_PRIORITY_HIGH
 import game.runtime as runtime
 
 
 class EnemyPortal(Enemy):
+    SPRITE = "portal"
+
     GENERATE_ANIMATION_FRAMES = 6
     GENERATE_ANIMATION_DIVISOR = 16
     GENERATE_ANIMATION_TIME = GENERATE_ANIMATION_FRAMES * GENERATE_ANIMATION_DIVISOR
 
     def __init__(self, pos, enemies, spawn_interval, spawn_interval_change=0, max_spawn_interval=600, max_enemies=5, start_timer=90):
         # Hittable area is larger for portals
-        super().__init__(pos, "portal", (), start_timer=start_timer, anchor_y=340, half_hit_area=Vector2(50, 50), hit_sound="sfx/portal/portal_hit")
+        super().__init__(pos, EnemyPortal.SPRITE, (), start_timer=start_timer, anchor_y=340, half_hit_area=Vector2(50, 50), hit_sound="sfx/portal/portal_hit")
         self.enemies = enemies
         self.spawn_interval = spawn_interval
         self.spawn_timer = spawn_interval
@@ -23,33 +25,61 @@ class EnemyPortal(Enemy):
         self.spawning_enemy = None
         self.spawn_facing = 0
 
+        # Image handles for each portal animation, created by load_animations
+        self.portal_anims = None
+
+        # Image handles for the animations of the enemy currently being spawned, created the first time they're needed
+        self.spawning_handles = None
+
+    def load_animations(self):
+        # Portal sprite names don't follow the sprite_anim_facing_frame format used by other fighters, so we look up
+        # the handles for each animation here instead of using an animation table
+        if self.portal_anims is not None:
+            return
+        prefix = f"{SPRITE_DIRS['portal']}/portal"
+        self.portal_anims = {
+            "grow": [runtime.atlas.get_handle(f"{prefix}_grow_{frame}") for frame in range(4)],
+            "destroyed": [runtime.atlas.get_handle(f"{prefix}_destroyed_{frame}") for frame in range(8)],
+            "generate": [runtime.atlas.get_handle(f"{prefix}_generate_{frame}") for frame in range(3)],
+            "hit": [runtime.atlas.get_handle(f"{prefix}_hit_0")],
+            "idle": [runtime.atlas.get_handle(f"{prefix}_idle_{frame}") for frame in range(8)],
+        }
+        if runtime.atlas.preload:
+            for handles in self.portal_anims.values():
+                for handle in handles:
+                    runtime.atlas.get_surface(handle)
+
     def spawned(self):
         super().spawned()
-        runtime.game.play_sound("sfx/portal/portal_appear")
+        runtime.game.play_sound("sfx/portal/portal_appear", priority=SOUND_PRIORITY_HIGH)
 
     def make_decision(self):
         # Like all enemies, portals start in the PAUSE state until their start_timer expires
         self.state = Enemy.State.PORTAL
 
     def determine_sprite(self):
+        if self.portal_anims is None:
+            self.load_animations()
+
         if self.state == Enemy.State.PAUSE and self.frame // 8 < 4:
-            image = "portal_grow_" + str(min(self.frame // 8, 3))
+            return self.portal_anims["grow"][min(self.frame // 8, 3)]
         elif self.state == Enemy.State.PORTAL_EXPLODE:
-            image = "portal_destroyed_" + str(min(self.frame // 6, 7))
+            return self.portal_anims["destroyed"][min(self.frame // 6, 7)]
         elif self.spawning_enemy is not None:
             # 3 frames of neutral generate animation, then 3 frames of animation for generating specific enemy
             frame = self.frame // EnemyPortal.GENERATE_ANIMATION_DIVISOR
             if frame < 3:
-                image = "portal_generate_" + str(frame)
+                return self.portal_anims["generate"][frame]
             else:
-                frame = min(frame - 3, 2)
-                image = f"portal_generate_{self.spawning_enemy.sprite}_{self.spawn_facing}_{frame}_{self.spawning_enemy.colour_variant}"
+                if self.spawning_handles is None:
+                    enemy = self.spawning_enemy
+                    self.spawning_handles = [runtime.atlas.get_handle(f"{SPRITE_DIRS['portal']}/portal_generate_{enemy.sprite}_{self.spawn_facing}_{frame}_{enemy.colour_variant}")
+                                             for frame in range(3)]
+                return self.spawning_handles[min(frame - 3, 2)]
         elif self.hit_timer > 0:
-            image = "portal_hit_0"
+            return self.portal_anims["hit"][0]
         else:
-            image = "portal_idle_" + str((self.frame // 8) % 8)
-
-        return f"{SPRITE_DIRS['portal']}/{image}"
+            return self.portal_anims["idle"][(self.frame // 8) % 8]
 
     def update(self):
         self.frame += 1
@@ -58,7 +88,7 @@ class EnemyPortal(Enemy):
             if self.health <= 0:
                 self.state = Enemy.State.PORTAL_EXPLODE
                 self.frame = 0
-                runtime.game.play_sound("sfx/portal/portal_destroyed")
+                runtime.game.play_sound("sfx/portal/portal_destroyed", priority=SOUND_PRIORITY_HIGH)
 
             else:
                 self.spawn_timer -= 1
@@ -79,18 +109,19 @@ class EnemyPortal(Enemy):
                         self.spawn_timer = 60
                     else:
                         # Randomly choose an enemy to spawn from our enemies list
-                        chosen_enemy = choice(self.enemies)
+                        chosen_enemy = runtime.rng.choice(self.enemies)
 
                         # Choose direction for spawned enemy to face (0/1 = left/right)
                         self.spawn_facing = 0 if self.vpos.x > runtime.game.player.vpos.x else 1
 
                         # Instantiate the enemy, but it won't appear in the level until the animation is complete
                         self.spawning_enemy = chosen_enemy(self.vpos)
+                        self.spawning_handles = None
 
                         # Reset frame for spawning animation
                         self.frame = 0
 
-                        runtime.game.play_sound("sfx/portal/portal_enemy_spawn")
+                        runtime.game.play_sound("sfx/portal/portal_enemy_spawn", priority=SOUND_PRIORITY_HIGH)
 
         elif self.state == Enemy.State.PORTAL_EXPLODE:
             if self.frame > 50:
@@ -1,5 +1,3 @@
-import pygame
-from random import randint
 from pygame import Vector2
 
 from game.config import *
@@ -7,17 +5,23 @@ from game.utils import *
 from game.entities.Enemy import Enemy
 from game.actors.Fighter import Fighter
 from game.entities.Chain import Chain
+from game.assets.AnimationAtlas import anim_id
 from game.combat.attacks_data import ATTACKS
 import game.runtime as runtime
 
 
+ANIM_RIDE = anim_id("ride")
+
+
 class EnemyScooterboy(Enemy):
+    SPRITE = "scooterboy"
+
     SCOOTER_SPEED_SLOW = 4
     SCOOTER_SPEED_FAST = 12
     SCOOTER_ACCELERATION = 0.2
 
     def __init__(self, pos, start_timer=20):
-        super().__init__(pos, "scooterboy", ("scooterboy_attack1",), start_timer=start_timer, approach_player_distance=ENEMY_APPROACH_PLAYER_DISTANCE_SCOOTERBOY, colour_variant=randint(0,2), score=30)
+        super().__init__(pos, EnemyScooterboy.SPRITE, ("scooterboy_attack1",), start_timer=start_timer, approach_player_distance=ENEMY_APPROACH_PLAYER_DISTANCE_SCOOTERBOY, colour_variant=runtime.rng.randint(0,2), score=30)
         self.state = Enemy.State.RIDING_SCOOTER
         self.scooter_speed = EnemyScooterboy.SCOOTER_SPEED_SLOW
         self.scooter_target_speed = self.scooter_speed
@@ -26,8 +30,11 @@ class EnemyScooterboy(Enemy):
 
     def spawned(self):
         super().spawned()
+        if not runtime.audio_enabled:
+            return
         try:
-            self.scooter_sound_channel = pygame.mixer.find_channel()
+            # Channel is held until we're knocked off the scooter or die, see SoundBank
+            self.scooter_sound_channel = runtime.sound_bank.hold_channel(self)
             if self.scooter_sound_channel is not None:
                 self.scooter_sound_channel.play(runtime.game.get_sound("sfx/scooter/scooter_slow"), loops=-1, fade_ms=200)
         except Exception as e:
@@ -47,7 +54,9 @@ class EnemyScooterboy(Enemy):
             if self.scooter_speed < self.scooter_target_speed:
                 # Currently speeding up
                 frame = min(self.frame // 5, 2)
-            return f"characters/scooterboy/{self.sprite}_ride_{facing_id}_{frame}_{self.colour_variant}"
+            if self.anim_table is None:
+                self.load_animations()
+            return self.anim_table.lookup(ANIM_RIDE, facing_id, frame)
         else:
             return super().determine_sprite()
 
@@ -65,7 +74,7 @@ class EnemyScooterboy(Enemy):
             if self.scooter_speed != self.scooter_target_speed:
                 self.scooter_speed, _ = move_towards(self.scooter_speed, self.scooter_target_speed, EnemyScooterboy.SCOOTER_ACCELERATION)
                 self.frame += 1
-            elif self.on_screen() and randint(0,30) == 0:
+            elif self.on_screen() and runtime.rng.randint(0,30) == 0:
                 # If on screen, random chance of accelerating
                 self.scooter_target_speed = EnemyScooterboy.SCOOTER_SPEED_FAST
                 if self.scooter_sound_channel is not None:
@@ -88,7 +97,7 @@ class EnemyScooterboy(Enemy):
                     self.vpos.y = self.target.y
                 else:
                     while abs(self.vpos.y - self.target.y) < 40:
-                        self.vpos.y = randint(MIN_WALK_Y, HEIGHT-1)
+                        self.vpos.y = runtime.rng.randint(MIN_WALK_Y, HEIGHT-1)
 
                 # Also slow down if at high speed
                 self.scooter_target_speed = EnemyScooterboy.SCOOTER_SPEED_SLOW
@@ -105,8 +114,9 @@ class EnemyScooterboy(Enemy):
               and player.height_above_ground < 20:
                 player.hit(self, ATTACKS["scooter_hit"])
 
-        elif self.just_knocked_off_scooter and self.scooter_sound_channel is not None and self.scooter_sound_channel.get_busy():
-            self.scooter_sound_channel.stop()
+        elif self.just_knocked_off_scooter and self.scooter_sound_channel is not None:
+            runtime.sound_bank.release_channel(self.scooter_sound_channel)
+            self.scooter_sound_channel = None
 
         super().update()
 
@@ -117,9 +127,10 @@ class EnemyScooterboy(Enemy):
         super().died()
 
         # Low chance of dropping a chain
-        if randint(0, 19) == 0:
+        if runtime.rng.randint(0, 19) == 0:
             runtime.game.weapons.append(Chain(self.vpos))
 
         # Stop scooter sound - only needed for when we're skipping stages in debug mode
-        if self.scooter_sound_channel is not None and self.scooter_sound_channel.get_busy():
-            self.scooter_sound_channel.stop()
+        if self.scooter_sound_channel is not None:
+            runtime.sound_bank.release_channel(self.scooter_sound_channel)
+            self.scooter_sound_channel = None
@@ -9,12 +9,15 @@ import game.runtime as runtime
 
 
 class EnemyTanuki(Enemy):
+    SPRITE = "tanuki"
+    BOSS_INTRO_IMAGE = "tanuki_boss_intro"
+
     def __init__(self, pos, start_timer=20):
-        super().__init__(pos, "tanuki", ("tanuki_attack", "tanuki_attack"),
+        super().__init__(pos, EnemyTanuki.SPRITE, ("tanuki_attack", "tanuki_attack"),
                          speed=Vector2(0.5, 0.5), health=10, stamina=1000, start_timer=start_timer,anchor_y=280,
                          score=100, enemy_type=Enemy.EnemyType.MID_BOSS)
         self.title_name = "狸 (Tanuki)"
-        self.boss_intro_image = "tanuki_boss_intro"
+        self.boss_intro_image = EnemyTanuki.BOSS_INTRO_IMAGE
 
     def died(self):
         super().died()
@@ -9,12 +9,15 @@ import game.runtime as runtime
 
 
 class EnemyTengu(Enemy):
+    SPRITE = "tengu"
+    BOSS_INTRO_IMAGE = "tengu_boss_intro"
+
     def __init__(self, pos, start_timer=20):
-        super().__init__(pos, "tengu", ("tengu_fight", "tengu_fight"),
+        super().__init__(pos, EnemyTengu.SPRITE, ("tengu_fight", "tengu_fight"),
                          speed=Vector2(0.5, 0.5), health=10, stamina=1000, start_timer=start_timer,
                          score=100, enemy_type=Enemy.EnemyType.MID_BOSS)
         self.title_name = "天狗 (Tengu)"
-        self.boss_intro_image = "tengu_boss_intro"
+        self.boss_intro_image = EnemyTengu.BOSS_INTRO_IMAGE
 
     def died(self):
         super().died()
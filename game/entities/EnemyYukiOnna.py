@@ -9,12 +9,15 @@ import game.runtime as runtime
 
 
 class EnemyYukiOnna(Enemy):
+    SPRITE = "onna"
+    BOSS_INTRO_IMAGE = "onna_boss_intro"
+
     def __init__(self, pos, start_timer=20):
-        super().__init__(pos, "onna", ("onna_fight", "onna_fight"),
+        super().__init__(pos, EnemyYukiOnna.SPRITE, ("onna_fight", "onna_fight"),
                          speed=Vector2(0.5, 0.5), health=10, stamina=500, start_timer=start_timer,anchor_y=280,
                          score=200, enemy_type=Enemy.EnemyType.MID_BOSS)
         self.title_name = "雪女 (Yuki-onna)"
-        self.boss_intro_image = "onna_boss_intro"
+        self.boss_intro_image = EnemyYukiOnna.BOSS_INTRO_IMAGE
 
     def died(self):
         super().died()
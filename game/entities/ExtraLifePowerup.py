@@ -1,5 +1,6 @@
 from game.config import *
 from game.entities.Powerup import Powerup
+from game.systems.SoundBank import SOUND_PRIORITY_HIGH
 import game.runtime as runtime
 
 
@@ -18,4 +19,4 @@ class ExtraLifePowerup(Powerup):
 
         collector.gain_extra_life()
 
-        runtime.game.play_sound("sfx/ui/health", 1)
+        runtime.game.play_sound("sfx/ui/health", 1, SOUND_PRIORITY_HIGH)
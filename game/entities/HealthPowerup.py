@@ -1,5 +1,6 @@
 from game.config import *
 from game.entities.Powerup import Powerup
+from game.systems.SoundBank import SOUND_PRIORITY_HIGH
 import game.runtime as runtime
 
 
@@ -13,4 +14,4 @@ class HealthPowerup(Powerup):
         # Add 20 health to the player who collected us, but don't go over their max health
         collector.health = min(collector.health + 20, collector.start_health)
 
-        runtime.game.play_sound("sfx/ui/health", 1)
+        runtime.game.play_sound("sfx/ui/health", 1, SOUND_PRIORITY_HIGH)
@@ -6,7 +6,6 @@ import game.runtime as runtime
 
 from game.utils import sign
 from game.combat.attacks_data import ATTACKS
-from random import choice
 
 
 class Player(Fighter):
@@ -23,12 +22,12 @@ class Player(Fighter):
         self.extra_life_timer -= 1
 
         # Check for collecting powerups
-        for powerup in runtime.game.powerups:
+        for powerup in runtime.game.spatial_index.get_powerups_near(self.vpos, 30):
             if (powerup.vpos - self.vpos).length() < 30:
                 powerup.collect(self)
 
-    def draw(self, offset):
-        super().draw(offset)
+    def draw_debug(self, offset):
+        super().draw_debug(offset)
         # screen.draw.text(f"{self.vpos}", (0,0))
         # screen.draw.text(f"{self.vpos}", self.pos)
 
@@ -53,7 +52,7 @@ class Player(Fighter):
             return ATTACKS["punch"]
 
         elif self.controls.button_pressed(1):
-            return choice((ATTACKS["kick"], ATTACKS["highkick"]))
+            return runtime.rng.choice((ATTACKS["kick"], ATTACKS["highkick"]))
 
         elif self.controls.button_pressed(2):
             return ATTACKS["elbow"]
@@ -2,13 +2,20 @@ from pygame import Vector2
 
 from game.config import *
 from game.actors.ScrollHeightActor import ScrollHeightActor
+from game.assets.AnimationAtlas import anim_id
 import game.runtime as runtime
 
 
 class Weapon(ScrollHeightActor):
+    __slots__ = ("name", "pickup_anim_id", "walk_anim_id", "end_pickup_frame", "held", "vel", "bounciness",
+                 "ground_friction", "air_friction")
+
     def __init__(self, name, sprite, pos, end_pickup_frame, anchor=ANCHOR_CENTRE, bounciness=0, ground_friction=0.5, air_friction=0.996, separate_shadow=False):
         super().__init__(sprite, pos, anchor=anchor, separate_shadow=separate_shadow)
         self.name = name
+        # Animation types used by fighters picking up and holding this weapon, see Fighter.determine_sprite
+        self.pickup_anim_id = anim_id(f"pickup_{name}")
+        self.walk_anim_id = anim_id(f"walk_{name}")
         self.end_pickup_frame = end_pickup_frame
         self.held = False
         self.vel = Vector2(0,0)
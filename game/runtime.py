@@ -1,3 +1,15 @@
+import random
+
+import pgzero.loaders
+
+from game.assets.AnimationAtlas import AnimationAtlas
+from game.assets.AssetPack import AssetPack
+from game.assets.AssetPreloader import AssetPreloader
+from game.assets.SpriteSheets import SpriteSheets
+from game.assets.SurfaceCache import SurfaceCache
+from game.config import SURFACE_CACHE_BUDGET, SURFACE_CACHE_PINNED
+from game.systems.SoundBank import SoundBank
+from game.systems.Instrumentation import Instrumentation
 from game.systems.Weather import WeatherSystem
 
 # Global runtime references shared across modules.
@@ -6,8 +18,38 @@ game = None
 screen = None
 weather = WeatherSystem()
 
+# Loads images from the asset pack, through Pygame Zero's image loader, so that images.load uses it
+asset_pack = AssetPack()
+asset_pack.install(pgzero.loaders.images)
+
+# Limits how much memory the images loaded through Pygame Zero's image loader take up
+surface_cache = SurfaceCache(SURFACE_CACHE_BUDGET, SURFACE_CACHE_PINNED)
+surface_cache.install(pgzero.loaders.images)
+
+# Loads actor images from packed sprite sheets
+sprite_sheets = SpriteSheets()
+
+# Image handles and animation tables shared by all actors
+atlas = AnimationAtlas(sprite_sheets)
+
+# Loads upcoming stages' images in the background
+preloader = AssetPreloader(sprite_sheets, surface_cache)
+
+# Random number generator for everything which affects the game simulation. Each Game creates its own seeded
+# generator and installs it here, so that a game can be replayed exactly given the same seed and inputs
+rng = random.Random()
+
 debug_drawcalls = []
 
+# Loads and plays sound effects
+sound_bank = SoundBank()
+
+# Measures how long each part of the frame takes
+instrumentation = Instrumentation()
+
+# When False, no sounds or music are loaded or played (e.g. when running headless)
+audio_enabled = True
+
 
 def set_game(value):
     global game
@@ -35,3 +77,20 @@ def set_weather(value):
 def get_weather():
     return weather
 
+
+def set_audio_enabled(value):
+    global audio_enabled
+    audio_enabled = value
+
+
+def get_audio_enabled():
+    return audio_enabled
+
+
+def set_rng(value):
+    global rng
+    rng = value
+
+
+def get_rng():
+    return rng
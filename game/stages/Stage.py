@@ -1,7 +1,20 @@
+class Spec:
+    # An object to be created when a stage starts - its class and the keyword arguments to create it with.
+    # Stages list their enemies, weapons and powerups as specs rather than as the objects themselves, so that objects
+    # are only created (and kept in memory) once their stage is reached, see Game.create_stage_objects
+    def __init__(self, cls, **kwargs):
+        self.cls = cls
+        self.kwargs = kwargs
+
+    def create(self):
+        return self.cls(**self.kwargs)
+
+
 class Stage:
     # A stage consists of a group of enemies and a level X boundary. When the enemies are
     # defeated, the next stage begins
     def __init__(self, enemies, max_scroll_x, weapons=None, powerups=None, weather=None, music_track=None, name=""):
+        # Lists of Spec objects
         self.enemies = enemies
         self.powerups = powerups or []
         self.max_scroll_x = max_scroll_x
@@ -14,6 +27,7 @@ class Stage:
 class BossStage(Stage):
     def __init__(self, boss, max_scroll_x, weapons=None, powerups=None, weather=None, music_track=None, name=""):
         super().__init__([boss], max_scroll_x, weapons=weapons, powerups=powerups, weather=weather, music_track=music_track)
+        # Spec for the boss, which is the stage's only enemy
         self.boss = boss
         self.intro_played = False
         # Fixed intro settings shared by all boss stages
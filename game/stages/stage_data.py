@@ -0,0 +1,260 @@
+import inspect
+import json
+from pathlib import Path
+
+from game.assets.compiled_cache import load_compiled, save_compiled
+from game.config import DATA_CACHE_ENABLED
+from game.entities.EnemyBoss import EnemyBoss
+from game.entities.EnemyHoodie import EnemyHoodie
+from game.entities.EnemyPortal import EnemyPortal
+from game.entities.EnemyScooterboy import EnemyScooterboy
+from game.entities.EnemyVax import EnemyVax
+from game.entities.EnemyTanuki import EnemyTanuki
+from game.entities.EnemyKasaobake import EnemyKasaobake
+from game.entities.EnemyYukiOnna import EnemyYukiOnna
+from game.entities.EnemyTengu import EnemyTengu
+from game.entities.EnemyInari import EnemyInari
+from game.entities.EnemyKappa import EnemyKappa
+from game.entities.ExtraLifePowerup import ExtraLifePowerup
+from game.entities.HealthPowerup import HealthPowerup
+from game.entities.Barrel import Barrel
+from game.entities.Chain import Chain
+from game.entities.Stick import Stick
+from game.stages.Stage import Spec, Stage, BossStage
+from game.systems.Weather import WEATHER_TYPES, WEATHER_SETTINGS
+
+# Loads stages from JSON stage files, such as those in the stages directory.
+# A stage file is an object with a list of "stages", played in order. Each stage is an object with:
+#   "max_scroll_x" - required, the level X position the screen scrolls to during the stage
+#   "name" - optional
+#   "enemies" - list of enemies, or for a boss stage, "boss" - a single enemy, with optional "boss_intro" settings (see
+#       BOSS_INTRO_SETTINGS)
+#   "weapons", "powerups" - optional lists of weapons and powerups
+#   "weather" - optional, either a type of weather such as "rain", or an object with a "type" and any of the settings
+#       in WEATHER_SETTINGS, e.g. {"type": "snow", "intensity": 200}
+#   "music_track" - optional, the music to start playing when the stage begins
+# Enemies, weapons and powerups are objects with the class name under "type" and keyword arguments for its constructor,
+# e.g. {"type": "EnemyKappa", "pos": [1400, 400], "start_timer": 50}. The enemy types a portal spawns are also given by
+# class name, e.g. "enemies": ["EnemyVax", "EnemyHoodie"]
+#
+# Files are checked when loaded, so that a mistake in a stage (e.g. a misspelt enemy type) is reported straight away,
+# with the file and stage it's in, rather than when that stage is reached.
+# Checking and converting a file is done once - the result is compiled to a compact form of nested tuples and cached
+# (see compiled_cache). Loading the same file again (until it's changed) just loads the compiled form, which is much
+# quicker for large files
+
+ENEMY_TYPES = {cls.__name__: cls for cls in (
+    EnemyBoss, EnemyHoodie, EnemyPortal, EnemyScooterboy, EnemyVax, EnemyTanuki, EnemyKasaobake, EnemyYukiOnna,
+    EnemyTengu, EnemyInari, EnemyKappa)}
+WEAPON_TYPES = {cls.__name__: cls for cls in (Barrel, Stick, Chain)}
+POWERUP_TYPES = {cls.__name__: cls for cls in (HealthPowerup, ExtraLifePowerup)}
+
+STAGE_KEYS = {"name", "max_scroll_x", "enemies", "boss", "boss_intro", "weapons", "powerups", "weather", "music_track"}
+
+# Settings which can be given in "boss_intro", and the BossStage attributes they set
+BOSS_INTRO_SETTINGS = {
+    "walk_speed": "intro_walk_speed",
+    "hold_frames": "intro_hold_frames",
+    "overlay_alpha": "intro_overlay_alpha",
+    "player_stop_offset": "intro_player_stop_offset",
+}
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+
+# Changed whenever the compiled form changes, so that files compiled by an older version of the code are recompiled
+COMPILED_VERSION = 1
+
+
+class StageDataError(Exception):
+    pass
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_object(data, types, where):
+    # Check an enemy, weapon or powerup, including that its arguments match its class's constructor
+    if not isinstance(data, dict):
+        raise StageDataError(f"{where}: expected an object, got {data!r}")
+    type_name = data.get("type")
+    if type_name not in types:
+        raise StageDataError(f"{where}: unknown type {type_name!r}, expected one of {', '.join(types)}")
+    kwargs = {key: value for key, value in data.items() if key != "type"}
+    try:
+        inspect.signature(types[type_name]).bind(**kwargs)
+    except TypeError as ex:
+        raise StageDataError(f"{where}: {type_name} {ex}") from None
+    pos = kwargs.get("pos")
+    if not (isinstance(pos, list) and len(pos) == 2 and all(is_number(value) for value in pos)):
+        raise StageDataError(f"{where}: pos must be a list of two numbers, got {pos!r}")
+    if type_name == "EnemyPortal":
+        enemies = kwargs["enemies"]
+        if not isinstance(enemies, list) or not enemies:
+            raise StageDataError(f"{where}: a portal's enemies must be a list of enemy types")
+        for enemy in enemies:
+            if enemy not in ENEMY_TYPES or enemy == "EnemyPortal":
+                raise StageDataError(f"{where}: a portal can't spawn {enemy!r}")
+
+
+def check_object_list(data, key, types, where):
+    objects = data.get(key, [])
+    if not isinstance(objects, list):
+        raise StageDataError(f"{where}: {key} must be a list")
+    for i, obj in enumerate(objects):
+        check_object(obj, types, f"{where}, {key}[{i}]")
+
+
+def check_weather(weather, where):
+    if weather is None or weather in WEATHER_TYPES:
+        return
+    if not isinstance(weather, dict):
+        raise StageDataError(f"{where}: weather must be one of {', '.join(WEATHER_TYPES)} or an object, got {weather!r}")
+    if weather.get("type") not in WEATHER_TYPES:
+        raise StageDataError(f"{where}: weather type must be one of {', '.join(WEATHER_TYPES)}")
+    for key, value in weather.items():
+        if key != "type" and (key not in WEATHER_SETTINGS or not is_number(value)):
+            raise StageDataError(f"{where}: invalid weather setting {key!r}: {value!r}")
+
+
+def check_stage(data, where):
+    if not isinstance(data, dict):
+        raise StageDataError(f"{where}: expected an object")
+    if "name" in data:
+        if not isinstance(data["name"], str):
+            raise StageDataError(f"{where}: name must be a string")
+        where += f" ({data['name']})"
+    unknown = set(data) - STAGE_KEYS
+    if unknown:
+        raise StageDataError(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+    if not is_number(data.get("max_scroll_x")) or data["max_scroll_x"] < 0:
+        raise StageDataError(f"{where}: max_scroll_x must be a number, zero or above")
+
+    if "boss" in data:
+        if "enemies" in data:
+            raise StageDataError(f"{where}: a boss stage can't also have enemies")
+        check_object(data["boss"], ENEMY_TYPES, f"{where}, boss")
+        boss_intro = data.get("boss_intro", {})
+        if not isinstance(boss_intro, dict):
+            raise StageDataError(f"{where}: boss_intro must be an object")
+        for key, value in boss_intro.items():
+            if key not in BOSS_INTRO_SETTINGS or not is_number(value):
+                raise StageDataError(f"{where}: invalid boss_intro setting {key!r}: {value!r}")
+    elif "boss_intro" in data:
+        raise StageDataError(f"{where}: boss_intro is only for boss stages")
+    else:
+        check_object_list(data, "enemies", ENEMY_TYPES, where)
+
+    check_object_list(data, "weapons", WEAPON_TYPES, where)
+    check_object_list(data, "powerups", POWERUP_TYPES, where)
+    check_weather(data.get("weather"), where)
+    if not isinstance(data.get("music_track"), (str, type(None))):
+        raise StageDataError(f"{where}: music_track must be a string")
+
+
+def check_stage_file(data, source):
+    if not isinstance(data, dict) or not isinstance(data.get("stages"), list):
+        raise StageDataError(f"{source}: expected an object with a list of stages")
+    if not data["stages"]:
+        raise StageDataError(f"{source}: there are no stages")
+    for i, stage in enumerate(data["stages"]):
+        check_stage(stage, f"{source}: stage {i}")
+
+
+def compile_object(data):
+    # (type name, ((argument name, value), ...)), with lists turned into tuples
+    return (data["type"], tuple((key, tuple(value) if isinstance(value, list) else value)
+                                for key, value in data.items() if key != "type"))
+
+
+def compile_stage(data):
+    # (name, max_scroll_x, boss or None, enemies, weapons, powerups, weather, music_track, boss intro settings)
+    weather = data.get("weather")
+    if isinstance(weather, dict):
+        weather = tuple(weather.items())
+    boss = compile_object(data["boss"]) if "boss" in data else None
+    return (data.get("name", ""),
+            data["max_scroll_x"],
+            boss,
+            tuple(compile_object(enemy) for enemy in data.get("enemies", [])),
+            tuple(compile_object(weapon) for weapon in data.get("weapons", [])),
+            tuple(compile_object(powerup) for powerup in data.get("powerups", [])),
+            weather,
+            data.get("music_track"),
+            tuple(data.get("boss_intro", {}).items()))
+
+
+def compile_stage_file(data):
+    return tuple(compile_stage(stage) for stage in data["stages"])
+
+
+def create_spec(compiled, types):
+    type_name, args = compiled
+    cls = types[type_name]
+    kwargs = dict(args)
+    if cls is EnemyPortal:
+        kwargs["enemies"] = tuple(ENEMY_TYPES[name] for name in kwargs["enemies"])
+    return Spec(cls, **kwargs)
+
+
+def create_stages(compiled_stages):
+    # Create Stage objects from the compiled form. They're created each time a game starts, as boss stages record
+    # whether their intro has been played
+    stages = []
+    for name, max_scroll_x, boss, enemies, weapons, powerups, weather, music_track, boss_intro in compiled_stages:
+        kwargs = {
+            "max_scroll_x": max_scroll_x,
+            "weapons": [create_spec(weapon, WEAPON_TYPES) for weapon in weapons],
+            "powerups": [create_spec(powerup, POWERUP_TYPES) for powerup in powerups],
+            "weather": dict(weather) if isinstance(weather, tuple) else weather,
+            "music_track": music_track,
+            "name": name,
+        }
+        if boss is not None:
+            stage = BossStage(boss=create_spec(boss, ENEMY_TYPES), **kwargs)
+            for key, value in boss_intro:
+                setattr(stage, BOSS_INTRO_SETTINGS[key], value)
+        else:
+            stage = Stage(enemies=[create_spec(enemy, ENEMY_TYPES) for enemy in enemies], **kwargs)
+        stages.append(stage)
+    return tuple(stages)
+
+
+def compile_stage_file_cached(path, use_cache=DATA_CACHE_ENABLED):
+    # Returns the compiled form of the stage file, from the cache if it has been compiled before
+    path = ROOT_DIR / path
+    contents = path.read_bytes()
+    if use_cache:
+        compiled = load_compiled("stages", contents, COMPILED_VERSION)
+        if compiled is not None:
+            return compiled
+
+    try:
+        data = json.loads(contents)
+    except json.JSONDecodeError as ex:
+        raise StageDataError(f"{path}: {ex}") from None
+    check_stage_file(data, path.name)
+    compiled = compile_stage_file(data)
+
+    if use_cache:
+        save_compiled("stages", contents, COMPILED_VERSION, compiled)
+    return compiled
+
+
+def load_stage_file(path, use_cache=DATA_CACHE_ENABLED):
+    return create_stages(compile_stage_file_cached(path, use_cache))
+
+
+if __name__ == "__main__":
+    # Usage: python -m game.stages.stage_data FILE...
+    # Checks each stage file, reporting any errors
+    import sys
+    failed = False
+    for path in sys.argv[1:]:
+        try:
+            stages = load_stage_file(path, use_cache=False)
+            print(f"{path}: {len(stages)} stages OK")
+        except (OSError, StageDataError) as ex:
+            print(ex)
+            failed = True
+    sys.exit(1 if failed else 0)
@@ -1,17 +1,24 @@
-from random import choice, randint
+from random import choice, randrange, Random
 
 from pygame import Vector2, Rect
 import pygame
 
-from pgzero.builtins import images, sounds, music
+from pgzero.builtins import images, music
 
 from game.config import *
-from game.utils import Profiler, move_towards
+from game.utils import move_towards
 import game.stages.setup_stages as stage_setup
-from game.ui.text import draw_text, draw_text_otf, font_mikachan, font_mikachan_big, font_credits
+from game.ui.text import draw_text, draw_text_otf, font_mikachan, font_mikachan_big, font_credits, get_text_cache_stats
 import game.runtime as runtime
 from game.entities.Player import Player
 from game.stages.Stage import BossStage
+from game.systems.SpatialIndex import SpatialIndex
+from game.systems.SoundBank import SOUND_PRIORITY_NORMAL, SOUND_PRIORITY_HIGH
+from game.combat.attacks_data import ATTACKS
+from game.ui.BackgroundLayer import BackgroundLayer
+from game.ui.RenderQueue import RenderQueue
+from game.ui.CreditsRenderer import CreditsRenderer
+from game.ui.Hud import Hud
 
 from game.entities.Enemy import Enemy
 
@@ -20,14 +27,41 @@ fullscreen_black_bmp.fill((0, 0, 0))
 
 
 class Game:
-    def __init__(self, controls=None):
+    def __init__(self, controls=None, seed=None):
+        # All random decisions which affect the game (enemy AI, colour variants, etc) use this generator rather than
+        # the random module's global one, so a game can be replayed exactly from its seed and recorded inputs.
+        # This must be set up before anything else, as creating enemies uses it
+        self.seed = seed if seed is not None else randrange(2**32)
+        self.rng = Random(self.seed)
+        runtime.set_rng(self.rng)
+        weather = runtime.get_weather()
+        if weather is not None:
+            weather.reseed(self.seed)
+
+        # Load all sound effects up front, rather than the first time each one is played
+        if runtime.audio_enabled:
+            runtime.sound_bank.preload(ATTACKS)
+
         self.player = Player(controls)
+        self.player.load_animations()
 
         self.enemies = []
         self.weapons = []
         self.scooters = []
         self.powerups = []
 
+        # Used to find weapons, powerups and fighters near a position without checking every one of them
+        self.spatial_index = SpatialIndex(self)
+
+        # Status bar at the top of the screen
+        self.hud = Hud()
+
+        # Road and background tiles
+        self.background = BackgroundLayer()
+
+        # Draws fighters, weapons, scooters and powerups in draw order
+        self.render_queue = RenderQueue()
+
         self.stage_index = -1
         self.timer = 0
         self.score = 0
@@ -38,8 +72,10 @@ class Game:
 
         self.boundary = Rect(0, MIN_WALK_Y, WIDTH-1, HEIGHT-MIN_WALK_Y)
 
-        #stage_setup.setup_stages()
-        stage_setup.setup_stage_final()
+        stage_setup.load_stages(STAGES_FILE)
+
+        # Start loading the images for the first stages in the background, see AssetPreloader
+        runtime.preloader.start_game(runtime.atlas, stage_setup.STAGES)
 
         self.text_active = INTRO_ENABLED
         self.intro_text = "\nIt took me ages to build this mask.\n" \
@@ -62,7 +98,7 @@ class Game:
         self.credits_active = False
         self.credits_scroll_y = 0
         self.credits_scroll_speed = 1.0
-        self.credits_layout = []
+        self.credits_renderer = None
         self.credits_items = [
             {"type": "center", "text": ""},
             {"type": "center", "text": "THANK YOU FOR PLAYING"},
@@ -128,15 +164,21 @@ class Game:
         self.boss_intro_boss_start_x = None
         self.boss_intro_boss_target_x = None
         self.current_stage_weather = None
+        # The boss of the current stage, if it's a boss stage and its objects have been created
+        self.stage_boss = None
 
     def next_stage(self):
         # A stage is over when we've scrolled to its max_scroll_x and there are no enemies left
         # Enemies are created when we start scrolling (or here, if no scrolling is to take place or is already taking place)
         
         self.stage_index += 1
+        self.stage_boss = None
         if self.stage_index < len(stage_setup.STAGES):
             stage = stage_setup.STAGES[self.stage_index]
-            if stage.music_track is not None:
+            # Load the following stage's images while this one is played, and discard those only earlier stages needed
+            runtime.preloader.release_stages_before(self.stage_index)
+            runtime.preloader.preload_stage(self.stage_index + 1)
+            if stage.music_track is not None and runtime.audio_enabled:
                 music.play(stage.music_track)
             self.max_scroll_offset_x = stage.max_scroll_x
             self.current_stage_weather = stage.weather
@@ -164,18 +206,19 @@ class Game:
 
     def create_stage_objects(self, stage):
         print(stage.name)
-        # Copy the enemies list from the stage, and tell them that they've been spawned
-        self.enemies = stage.enemies.copy()
+        # Create the stage's enemies, and tell them that they've been spawned
+        self.enemies = [spec.create() for spec in stage.enemies]
         for enemy in self.enemies:
+            enemy.load_animations()
             enemy.spawned()
 
-        # Add the weapons and powerups from the stage to the game
-        self.weapons.extend(stage.weapons)
-        self.powerups.extend(stage.powerups)
+        # Create the weapons and powerups for the stage and add them to the game
+        self.weapons.extend(spec.create() for spec in stage.weapons)
+        self.powerups.extend(spec.create() for spec in stage.powerups)
 
         if isinstance(stage, BossStage):
-            # Keep boss offscreen and paused until intro starts
-            boss = stage.boss
+            # The boss is the stage's only enemy. Keep it offscreen and paused until intro starts
+            boss = self.stage_boss = self.enemies[0]
             boss.state = Enemy.State.IDLE
             boss.state_timer = 0
             boss.vpos.x = stage.max_scroll_x + WIDTH + 200
@@ -185,17 +228,21 @@ class Game:
 
     def spawn_enemy(self, enemy):
         # Called by Portal
+        enemy.load_animations()
         self.enemies.append(enemy)
         enemy.spawned()
 
     def update(self):
-        if DEBUG_PROFILING:
-            p = Profiler()
+        # Time taken by parts of the update is measured by runtime.instrumentation, see Instrumentation
+        instrumentation = runtime.instrumentation
 
         self.timer += 1
+        runtime.sound_bank.new_frame()
         weather = runtime.get_weather()
         if weather is not None:
+            start = instrumentation.begin()
             weather.update()
+            instrumentation.end("update.weather", start)
 
         if self.credits_active:
             self.update_credits()
@@ -208,7 +255,7 @@ class Game:
                 length_to_display = min(self.timer // 6, len(self.current_text))
                 self.displayed_text = self.current_text[:length_to_display]
                 if not self.displayed_text[-1].isspace():
-                    self.play_sound("sfx/ui/teletype")
+                    self.play_sound("sfx/ui/teletype", priority=SOUND_PRIORITY_HIGH)
 
             # Allow player to skip/leave text
             for button in range(4):
@@ -225,9 +272,14 @@ class Game:
         if DEBUG_SHOW_ATTACKS:
             runtime.debug_drawcalls.clear()
 
+        # Positions will have changed since the last frame
+        self.spatial_index.new_frame()
+
         # Update all objects
         for obj in [self.player] + self.enemies + self.weapons + self.scooters + self.powerups:
+            start = instrumentation.begin()
             obj.update()
+            instrumentation.end(instrumentation.get_class_span("update", obj), start)
 
         if self.scrolling:
             if self.scroll_offset.x < self.max_scroll_offset_x:
@@ -296,32 +348,30 @@ class Game:
         if len(self.enemies) == 0 and self.scroll_offset.x == self.max_scroll_offset_x:
             self.next_stage()
 
-        if DEBUG_PROFILING:
-            print(f"update: {p.get_ms()}")
-
     def draw(self, screen):
         if self.credits_active:
             self.draw_credits(screen)
             return
+        instrumentation = runtime.instrumentation
+
         # Draw background
+        start = instrumentation.begin()
         self.draw_background(screen)
+        instrumentation.end("draw.background", start)
 
-        # Draw all objects, lowest on screen first
-        # Y pos used is modified by result of get_draw_order_offset, for certain cases where we need more nuance than
-        # just "lowest on screen first"
-        p = Profiler()
-        all_objs = [self.player] + self.enemies + self.weapons + self.scooters + self.powerups
-        all_objs.sort(key=lambda obj: obj.vpos.y + obj.get_draw_order_offset())
-        for obj in all_objs:
-            if obj:
-                obj.draw(self.scroll_offset)
-        if DEBUG_PROFILING:
-            print("objs: {0}".format(p.get_ms()))
+        # Draw all objects, lowest on screen first, see RenderQueue
+        start = instrumentation.begin()
+        self.render_queue.draw(screen, [self.player] + self.enemies + self.weapons + self.scooters + self.powerups,
+                               self.scroll_offset)
+        instrumentation.end("draw.objects", start)
 
-        p = Profiler()
+        start = instrumentation.begin()
         weather = runtime.get_weather()
         if weather is not None:
             weather.draw(screen)
+        instrumentation.end("draw.weather", start)
+
+        start = instrumentation.begin()
 
         # If player can scroll the level, show flashing arrow
         if self.scroll_offset.x < self.max_scroll_offset_x and (self.timer // 30) % 2 == 0:
@@ -331,9 +381,8 @@ class Game:
 
         self.draw_ui_boss(screen)
 
-        if DEBUG_PROFILING:
-            print("icons: {0}".format(p.get_ms()))
-            p = Profiler()
+        instrumentation.end("draw.ui", start)
+        start = instrumentation.begin()
 
         # During the intro we show a black background, immediately after the intro we fade it away
         # Draw a black image with gradually decreasing opacity
@@ -348,7 +397,7 @@ class Game:
 
         # Show intro text
         if self.text_active:
-            draw_text(screen, self.displayed_text, 50, 0)
+            draw_text(screen, self.displayed_text, 50, 0, per_glyph=True)
 
         if self.boss_intro_active and self.boss_intro_phase == "title":
             self.draw_boss_intro(screen)
@@ -365,34 +414,12 @@ class Game:
         for func in runtime.debug_drawcalls:
             func()
 
-        if DEBUG_PROFILING:
-            # Show profiler timing for everything not in another category
-            print("rest: {0}".format(p.get_ms()))
+        # Everything not in another category
+        instrumentation.end("draw.rest", start)
 
     def draw_ui(self, screen):
-        # Show status bar and player health, stamina and lives
-        # Have to use the actual Pygame blit rather than Pygame Zero version so that we can specify which area of the
-        # source image to copy
-        health_bar_w = int((self.player.health / self.player.start_health) * HEALTH_STAMINA_BAR_WIDTH)
-        screen.surface.blit(images.load("ui/health"), (48, 11), Rect(0, 0, health_bar_w, HEALTH_STAMINA_BAR_HEIGHT))
-        stamina_bar_w = int((self.player.stamina / self.player.max_stamina) * HEALTH_STAMINA_BAR_WIDTH)
-        screen.surface.blit(images.load("ui/stamina"), (517, 11), Rect(0, 0, stamina_bar_w, HEALTH_STAMINA_BAR_HEIGHT))
-
-        screen.blit("ui/status", (0, 0))
-
-        for i in range(self.player.lives):
-            # if self.player.extra_life_timer <= 0 or i < self.player.lives - 1:
-            #      sprite_idx = 9
-            #  else:
-            #      sprite_idx = min(9, (30 - self.player.extra_life_timer) // 3)
-            sprite_idx = 9
-            img = images.load(f"ui/status_life{sprite_idx}")
-            img = pygame.transform.smoothscale(img, (img.get_width() * 0.20, img.get_height() * 0.20))
-            screen.blit(img, (i * 35 + 15, 35))
-
-        # Show score
-        draw_text(screen, f"{self.score:04}", WIDTH // 2, 18, True, color=(0,0,255))
-
+        # Show status bar and player health, stamina, lives and score
+        self.hud.draw(screen, self.player, self.score)
 
     def draw_ui_boss(self,screen):
         for enemy in self.enemies:
@@ -400,34 +427,14 @@ class Game:
                 draw_text_otf(screen, enemy.title_name, BOSS_NAME_X_POS + 1, BOSS_NAME_Y_POS + 1, font_mikachan, BOSS_COLOR_SHADOW, True)
                 draw_text_otf(screen, enemy.title_name, BOSS_NAME_X_POS, BOSS_NAME_Y_POS, font_mikachan, BOSS_COLOR_RED, True)
                 health_bar_w = int((enemy.health / enemy.start_health) * BOSS_HEALTH_STAMINA_BAR_WIDTH)
-                screen.surface.blit(images.load("ui/health_boss"), (BOSS_HEALTH_BAR_X_POS, BOSS_HEALTH_BAR_Y_POS), Rect(0, 0, health_bar_w, BOSS_HEALTH_STAMINA_BAR_HEIGHT))
+                screen.surface.blit(self.hud.boss_health_image, (BOSS_HEALTH_BAR_X_POS, BOSS_HEALTH_BAR_Y_POS), Rect(0, 0, health_bar_w, BOSS_HEALTH_STAMINA_BAR_HEIGHT))
 
     def start_credits(self):
         self.credits_active = True
         self.credits_scroll_y = HEIGHT + 40
-        self.credits_layout = self.build_credits_layout()
-
-    def build_credits_layout(self):
-        layout = []
-        line_height = font_credits.size("A")[1] + 4
-        spacing = 40
-        y = 0
-        for item in self.credits_items:
-            text = item.get("text", "")
-            lines = text.splitlines() if text else []
-            text_h = max(1, len(lines)) * line_height
-            image_h = 0
-            if item.get("type") in ["side","center"] and item.get("image"):
-                try:
-                    img = images.load(item["image"])
-                    img = pygame.transform.scale(img, (img.get_width() * 0.3 , img.get_height() * 0.3))
-                    image_h = img.get_height()
-                except Exception as e:
-                    image_h = 0
-            height = max(text_h, image_h) + spacing
-            layout.append({"item": item, "y": y, "height": height, "line_height": line_height})
-            y += height
-        return layout
+        # Images and text are prepared now, once, rather than as each item scrolls onto the screen
+        self.credits_renderer = CreditsRenderer(self.credits_items, font_credits)
+        self.credits_renderer.start()
 
     def update_credits(self):
         self.credits_scroll_y -= self.credits_scroll_speed
@@ -437,51 +444,13 @@ class Game:
         weather = runtime.get_weather()
         if weather is not None:
             weather.draw(screen)
-        if not self.credits_layout:
+        if self.credits_renderer is None:
             return
-        for entry in self.credits_layout:
-            item = entry["item"]
-            y = self.credits_scroll_y + entry["y"]
-            line_height = entry["line_height"]
-            if y > HEIGHT + 200 or y + entry["height"] < -200:
-                continue
-            if item.get("type") == "center" and item.get("image") is None:
-                lines = item.get("text", "").splitlines()
-                color = (255, 0, 0) if item.get("header") == "True" else (255, 255, 255)
-                for i, line in enumerate(lines):
-                    draw_text_otf(screen, line, WIDTH // 2, y + i * line_height, font_credits, color,align="center")
-            elif item.get("type") == "center" and item.get("image") is not None:
-                img_name = item.get("image")
-                img = None
-                if img_name:
-                    try:
-                        img = images.load(item["image"])
-                        img = pygame.transform.smoothscale(img, (img.get_width() * 0.3, img.get_height() * 0.3))
-                    except Exception as ex:
-                        img = None
-                if img is not None:
-                    img_x = WIDTH // 2 - img.get_width() // 2
-                    screen.blit(img, (img_x, y))
-            elif item.get("type") == "side":
-                side = item.get("side", "left")
-                text = item.get("text", "")
-                lines = text.splitlines()
-                img_name = item.get("image")
-                img = None
-                if img_name:
-                    try:
-                        img = images.load(item["image"])
-                        img = pygame.transform.smoothscale(img, (img.get_width() * 0.3 , img.get_height() * 0.3))
-                    except Exception as ex:
-                        img = None
-                if img is not None:
-                    img_x = 0 if side == "left" else WIDTH - img.get_width() - 60
-                    screen.blit(img, (img_x, y))
-                text_x = WIDTH // 2 - 100 if side == "left" else 30
-
-                for i, line in enumerate(lines):
-                    draw_text_otf(screen, line, text_x, y + i * line_height, font_credits, (255, 255, 255))
-            elif item.get("type") == "end":
+        self.credits_renderer.draw(screen, self.credits_scroll_y)
+
+        # Stop scrolling once the end marker comes into view
+        for entry in self.credits_renderer.layout:
+            if entry["item"].get("type") == "end" and self.credits_renderer.is_entry_visible(entry, self.credits_scroll_y):
                 self.credits_scroll_speed = 0
 
     def prepare_boss_intro(self, stage):
@@ -489,16 +458,16 @@ class Game:
         self.boss_intro_phase = "scroll"
         self.boss_intro_timer = 0
         self.boss_intro_stage = stage
-        self.boss_intro_boss = stage.boss
+        self.boss_intro_boss = self.stage_boss
         # Snapshot deterministic targets
         self.boss_intro_scroll_start_x = self.scroll_offset.x
         self.boss_intro_scroll_target_x = stage.max_scroll_x
         self.boss_intro_boss_target_x = self.scroll_offset.x + WIDTH - 220
         self.boss_intro_boss_start_x = self.scroll_offset.x + WIDTH + 220
-        stage.boss.vpos.x = self.boss_intro_boss_start_x
-        stage.boss.target = stage.boss.vpos.copy()
-        stage.boss.facing_x = -1
-        stage.boss.walking = True
+        self.stage_boss.vpos.x = self.boss_intro_boss_start_x
+        self.stage_boss.target = self.stage_boss.vpos.copy()
+        self.stage_boss.facing_x = -1
+        self.stage_boss.walking = True
 
     def update_boss_intro(self):
         if self.boss_intro_boss is None or self.boss_intro_stage is None:
@@ -562,35 +531,8 @@ class Game:
 
 
     def draw_background(self, screen):
-        # Draw two copies of road background
-        p = Profiler()
-        road1_x = -(self.scroll_offset.x % WIDTH)
-        road2_x = road1_x + WIDTH
-        screen.blit("backgrounds/road", (road1_x, 0))
-        screen.blit("backgrounds/road", (road2_x, 0))
-        if DEBUG_PROFILING:
-            print("road " + str(p.get_ms()))
-
-        # Set initial position for background tiles
-        # Due to isometric nature of background, each background tile includes a transparent part - the second line
-        # skips that part for the first tile
-        pos = -self.scroll_offset
-        pos.x -= BACKGROUND_TILE_SPACING
-
-        # Draw background tiles
-        p = Profiler()
-        for tile in BACKGROUND_TILES:
-            # Don't bother drawing tile if it's off the left of the screen
-            if pos.x + 417 >= 0:
-                screen.blit(tile, pos)
-                pos.x += BACKGROUND_TILE_SPACING
-                if pos.x >= WIDTH:
-                    # Stop once we've reached or gone past the right edge of the screen
-                    break
-            else:
-                pos.x += BACKGROUND_TILE_SPACING
-        if DEBUG_PROFILING:
-            print("bg " + str(p.get_ms()))
+        # Draw road and background tiles, see BackgroundLayer
+        self.background.draw(screen, self.scroll_offset)
 
     def shutdown(self):
         # When game is over, we need to tell enemies to die, since that's how the scooter engine sound effect gets
@@ -598,27 +540,24 @@ class Game:
         for enemy in self.enemies:
             enemy.died()
 
-    def get_sound(self, name, count=1):
-        if self.player:
-            return sounds.load(f"{name}{randint(0, count - 1)}")
+        if DEBUG_PROFILING:
+            runtime.preloader.print_stats()
+            runtime.surface_cache.print_stats()
+            print(f"text cache: {get_text_cache_stats()}")
 
-    def play_sound(self, name, count=1):
+    def get_sound(self, name, count=1):
+        # Returns None if audio is disabled or the sound couldn't be loaded
+        # The sound bank deliberately uses the global random generator rather than self.rng to choose between variants,
+        # as the choice of sound has no effect on the game, and whether or not audio is enabled must not change the
+        # outcome of a replay
+        if self.player and runtime.audio_enabled:
+            return runtime.sound_bank.get_sound(name, count)
+
+    def play_sound(self, name, count=1, priority=SOUND_PRIORITY_NORMAL):
         # Some sounds have multiple varieties. If count > 1, we'll randomly choose one from those
-        # We don't play any sounds if there is no player (e.g. if we're on the menu)
-        if self.player:
-            try:
-                # Pygame Zero allows you to write things like 'sounds.explosion.play()'
-                # This automatically loads and plays a file named 'explosion.wav' (or .ogg) from the sounds folder (if
-                # such a file exists)
-                # But what if you have files named 'explosion0.ogg' to 'explosion5.ogg' and want to randomly choose
-                # one of them to play? You can generate a string such as 'explosion3', but to use such a string
-                # to access an attribute of Pygame Zero's sounds object, we must use Python's built-in function getattr
-                sound = self.get_sound(name, count)
-                sound.play()
-            except Exception as e:
-                # If no sound file of that name was found, print the error that Pygame Zero provides, which
-                # includes the filename.
-                # Also occurs if sound fails to play for another reason (e.g. if this machine has no sound hardware)
-                print(e)
+        # We don't play any sounds if there is no player (e.g. if we're on the menu), or if audio is disabled
+        # Sounds are loaded when the game starts, and played on channels managed by the sound bank, see SoundBank
+        if self.player and runtime.audio_enabled:
+            runtime.sound_bank.play(name, count, priority)
 
 # From Eggzy
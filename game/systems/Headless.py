@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+# Runs the game simulation without a window or sound output, for measuring simulation throughput and for running
+# automated playthroughs on machines with no display.
+# SDL reads these when Pygame is initialised, which happens as a side effect of importing Pygame Zero, so they must be
+# set before anything below imports it
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Importing pgzrun would otherwise set up the __main__ module as a Pygame Zero program, overwriting its globals with
+# Pygame Zero's builtins. We do the necessary parts of that setup ourselves in init_headless
+sys._pgzrun = True
+
+# Fonts are loaded from paths relative to the working directory, so run from the root of the repository
+REPO_ROOT = Path(__file__).resolve().parents[2]
+os.chdir(REPO_ROOT)
+
+import pygame
+import pgzero.loaders
+
+from game.controls.AutoControls import AutoControls
+from game.systems.Game import Game
+import game.runtime as runtime
+
+
+def init_headless():
+    # Pygame Zero normally does this for us in pgzrun.go() - images are loaded relative to the root and converted to
+    # the display format, which requires a display surface to exist (the dummy video driver provides one)
+    pgzero.loaders.set_root(str(REPO_ROOT))
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    runtime.set_audio_enabled(False)
+
+    # Nothing is drawn, so only load images when something asks for them
+    runtime.atlas.preload = False
+    runtime.preloader.enabled = False
+    runtime.instrumentation.enabled = False
+
+
+class HeadlessRunner:
+    # Drives Game.update at a fixed timestep, as fast as possible. Game.draw is never called.
+    # Each call to update represents 1/60th of a second of game time, as the game logic is frame-based
+
+    def __init__(self, controls=None, max_frames=None, seed=None):
+        init_headless()
+        self.controls = controls if controls is not None else AutoControls()
+        self.max_frames = max_frames
+        self.frames = 0
+        self.elapsed = 0.0
+        self.game = Game(self.controls, seed=seed)
+        runtime.set_game(self.game)
+
+    def step(self):
+        # Simulate one frame
+        self.controls.update()
+        self.game.update()
+
+        # Actors normally update their screen position when drawn. Some game logic depends on this (e.g. scrolling
+        # speed and on_screen checks), so without drawing we have to do it here
+        offset = self.game.scroll_offset
+        for obj in [self.game.player] + self.game.enemies + self.game.weapons + self.game.scooters + self.game.powerups:
+            obj.update_screen_pos(offset)
+
+        self.frames += 1
+
+    def is_finished(self):
+        if self.max_frames is not None and self.frames >= self.max_frames:
+            return True
+        return self.game.player.lives <= 0 or self.game.check_won()
+
+    def run(self):
+        start_time = time.perf_counter()
+        while not self.is_finished():
+            self.step()
+        self.elapsed = time.perf_counter() - start_time
+        self.game.shutdown()
+        return self.get_results()
+
+    def get_results(self):
+        if self.game.check_won():
+            outcome = "won"
+        elif self.game.player.lives <= 0:
+            outcome = "lost"
+        else:
+            outcome = "frame limit"
+        return {
+            "outcome": outcome,
+            "frames": self.frames,
+            "game_seconds": self.frames / 60,
+            "wall_seconds": self.elapsed,
+            "frames_per_second": self.frames / self.elapsed if self.elapsed > 0 else 0.0,
+            "stage_index": self.game.stage_index,
+            "score": self.game.score,
+            "seed": self.game.seed,
+            "player_health": self.game.player.health,
+            "player_lives": self.game.player.lives,
+        }
+
+
+def print_results(results):
+    print(f"Outcome: {results['outcome']} (stage {results['stage_index']}, score {results['score']}, "
+          f"lives {results['player_lives']}, health {results['player_health']}, seed {results['seed']})")
+    print(f"Simulated {results['frames']} frames ({results['game_seconds']:.1f}s of game time) "
+          f"in {results['wall_seconds']:.2f}s")
+    print(f"Simulation speed: {results['frames_per_second']:.0f} frames/s "
+          f"({results['frames_per_second'] / 60:.1f}x real time)")
@@ -0,0 +1,154 @@
+import json
+import time
+
+import pygame
+
+
+class SpanHistory:
+    # The total time spent in one named span on each of the last HISTORY_SIZE frames in which it ran, in a ring buffer
+
+    def __init__(self, size):
+        self.times = [0.0] * size
+        self.count = 0
+        self.next = 0
+
+    def add(self, ms):
+        self.times[self.next] = ms
+        self.next = (self.next + 1) % len(self.times)
+        self.count = min(self.count + 1, len(self.times))
+
+    def get_percentiles(self, percentiles=(50, 95, 99)):
+        if self.count == 0:
+            return [0.0] * len(percentiles)
+        times = sorted(self.times[:self.count])
+        return [times[min(self.count - 1, int(self.count * p / 100))] for p in percentiles]
+
+
+class Instrumentation:
+    # Measures how long named parts of each frame take (e.g. "update", "draw.background"), replacing printing timings
+    # to the console, which itself took long enough to distort them.
+    # Usage:
+    #     start = instrumentation.begin()
+    #     ... code to measure ...
+    #     instrumentation.end("name", start)
+    # A span can be measured several times in a frame (e.g. once per enemy), in which case the times are added up.
+    # end_frame must be called once per frame, which adds each span's total for the frame to its history. The 50th,
+    # 95th and 99th percentile times over recent frames can then be shown on screen (see draw_overlay), and a trace of
+    # every span can be recorded and saved in Chrome's trace format, for viewing in chrome://tracing or Perfetto.
+    # When not enabled, begin and end do nothing
+
+    HISTORY_SIZE = 240
+
+    # Recording a trace stops after this many spans, to avoid using an unlimited amount of memory
+    MAX_TRACE_EVENTS = 500000
+
+    OVERLAY_UPDATE_INTERVAL = 30
+    OVERLAY_FONT_SIZE = 18
+    OVERLAY_COLUMN_WIDTH = 44
+
+    def __init__(self):
+        self.enabled = True
+        self.overlay_visible = False
+
+        self.histories = {}
+        self.frame_totals = {}
+        self.class_span_names = {}
+
+        self.tracing = False
+        self.trace_events = []
+        self.trace_start = 0.0
+
+        self.frame = 0
+        self.overlay_lines = []
+        self.overlay_font = None
+
+    def begin(self):
+        if not self.enabled:
+            return 0.0
+        return time.perf_counter()
+
+    def end(self, name, start):
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        ms = (end - start) * 1000
+        self.frame_totals[name] = self.frame_totals.get(name, 0.0) + ms
+        if self.tracing:
+            if len(self.trace_events) < Instrumentation.MAX_TRACE_EVENTS:
+                self.trace_events.append((name, start, end))
+
+    def get_class_span(self, prefix, obj):
+        # Span name for per-class measurements, e.g. "update.EnemyKappa". Cached, to avoid building a string per object
+        # per frame
+        key = (prefix, obj.__class__)
+        name = self.class_span_names.get(key)
+        if name is None:
+            name = self.class_span_names[key] = f"{prefix}.{obj.__class__.__name__}"
+        return name
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        for name, ms in self.frame_totals.items():
+            history = self.histories.get(name)
+            if history is None:
+                history = self.histories[name] = SpanHistory(Instrumentation.HISTORY_SIZE)
+            history.add(ms)
+        self.frame_totals.clear()
+        self.frame += 1
+
+    def get_stats(self):
+        # Span name -> (p50, p95, p99) in milliseconds
+        return {name: tuple(history.get_percentiles()) for name, history in sorted(self.histories.items())}
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_lines = []
+
+    def draw_overlay(self, surface):
+        if not self.overlay_visible:
+            return
+        if self.overlay_font is None:
+            self.overlay_font = pygame.font.Font(None, Instrumentation.OVERLAY_FONT_SIZE)
+
+        # Percentiles are only recalculated, and the text only re-rendered, every so often
+        if not self.overlay_lines or self.frame % Instrumentation.OVERLAY_UPDATE_INTERVAL == 0:
+            self.overlay_lines = self.render_overlay()
+
+        # Table in the top right corner of the screen, one row per span, with the times right-aligned in columns
+        font_height = self.overlay_font.get_linesize()
+        column_width = Instrumentation.OVERLAY_COLUMN_WIDTH
+        name_width = max(row[0].get_width() for row in self.overlay_lines)
+        left = surface.get_width() - name_width - column_width * 3 - 8
+        surface.fill((0, 0, 0), (left - 4, 0, surface.get_width() - left + 4, font_height * len(self.overlay_lines) + 4))
+        for i, row in enumerate(self.overlay_lines):
+            y = 2 + i * font_height
+            surface.blit(row[0], (left, y))
+            for column, cell in enumerate(row[1:]):
+                surface.blit(cell, (left + name_width + column_width * (column + 1) - cell.get_width(), y))
+
+    def render_overlay(self):
+        font = self.overlay_font
+        color = (255, 255, 255)
+        rows = [["span (ms)", "p50", "p95", "p99"]]
+        for name, percentiles in self.get_stats().items():
+            rows.append([name] + [f"{ms:.2f}" for ms in percentiles])
+        if self.tracing:
+            rows.append([f"recording trace: {len(self.trace_events)} spans"])
+        return [[font.render(text, True, color) for text in row] for row in rows]
+
+    def start_trace(self):
+        self.trace_events = []
+        self.trace_start = time.perf_counter()
+        self.tracing = True
+
+    def stop_trace(self, path):
+        # Save the spans recorded since start_trace as a Chrome trace JSON file. Times in the file are in microseconds
+        self.tracing = False
+        events = [{"name": name, "ph": "X", "pid": 0, "tid": 0,
+                   "ts": (start - self.trace_start) * 1000000, "dur": (end - start) * 1000000}
+                  for name, start, end in self.trace_events]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        self.trace_events = []
+        return len(events)
@@ -0,0 +1,96 @@
+import pygame
+from pygame import Rect
+
+
+# Ways of scaling the game's logical screen up to the window or display:
+# "integer" - nearest-neighbour at the largest whole-number scale which fits, gives sharp pixels but may leave larger
+#             black borders
+# "scale" - nearest-neighbour at the largest scale which fits
+# "smoothscale" - filtered at the largest scale which fits, the slowest option
+SCALE_MODES = ("integer", "scale", "smoothscale")
+
+
+class PresentLayout:
+    # Where and how the logical screen is drawn for one combination of display size and scale mode
+    def __init__(self, logical_size, display_size, mode):
+        logical_w, logical_h = logical_size
+        display_w, display_h = display_size
+        scale = min(display_w / logical_w, display_h / logical_h)
+        if mode == "integer" and scale >= 1:
+            scale = int(scale)
+        self.scale = scale
+        self.mode = mode
+
+        scaled_w = int(logical_w * scale)
+        scaled_h = int(logical_h * scale)
+        self.dest_rect = Rect((display_w - scaled_w) // 2, (display_h - scaled_h) // 2, scaled_w, scaled_h)
+
+        # Areas of the display outside dest_rect, which must be cleared to black
+        self.border_rects = [rect for rect in (
+            Rect(0, 0, display_w, self.dest_rect.top),
+            Rect(0, self.dest_rect.bottom, display_w, display_h - self.dest_rect.bottom),
+            Rect(0, self.dest_rect.top, self.dest_rect.left, scaled_h),
+            Rect(self.dest_rect.right, self.dest_rect.top, display_w - self.dest_rect.right, scaled_h),
+        ) if rect.width > 0 and rect.height > 0]
+
+        # Surface the scaled image is written to. Where possible this is the area of the display surface given by
+        # dest_rect, otherwise it is a separate surface which is then blitted to the display. Created the first time we
+        # present, as it depends on the surfaces involved
+        self.scaled_surface = None
+        self.target = None
+        self.scaling_onto_target = False
+
+
+class Presenter:
+    # Scales the logical screen (which the game draws to at a fixed size) onto the real display surface.
+    # The layout for each display size and scale mode is worked out once and cached, and the scaled image is written
+    # into a surface which is reused each frame rather than a new surface being created every frame. If the display
+    # surface has the same pixel format as the logical screen, we scale straight onto it, avoiding a blit
+
+    def __init__(self, logical_size, mode="smoothscale"):
+        self.logical_size = logical_size
+        self.layouts = {}
+        self.mode = None
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        if mode not in SCALE_MODES:
+            raise ValueError(f"Unknown scale mode {mode!r}, should be one of {', '.join(SCALE_MODES)}")
+        self.mode = mode
+
+    def next_mode(self):
+        self.set_mode(SCALE_MODES[(SCALE_MODES.index(self.mode) + 1) % len(SCALE_MODES)])
+        return self.mode
+
+    def get_layout(self, display_size):
+        key = (display_size, self.mode)
+        layout = self.layouts.get(key)
+        if layout is None:
+            layout = self.layouts[key] = PresentLayout(self.logical_size, display_size, self.mode)
+        return layout
+
+    def present(self, source, target):
+        layout = self.get_layout(target.get_size())
+
+        if layout.scale == 1:
+            # No scaling needed
+            target.blit(source, layout.dest_rect)
+        else:
+            if layout.target is not target:
+                # First time presenting to this display surface (it is replaced when switching to or from fullscreen)
+                layout.target = target
+                layout.scaling_onto_target = source.get_bitsize() == target.get_bitsize() \
+                                             and source.get_masks() == target.get_masks()
+                if layout.scaling_onto_target:
+                    layout.scaled_surface = target.subsurface(layout.dest_rect)
+                else:
+                    layout.scaled_surface = pygame.Surface(layout.dest_rect.size, 0, source)
+            if layout.mode == "smoothscale":
+                pygame.transform.smoothscale(source, layout.dest_rect.size, layout.scaled_surface)
+            else:
+                pygame.transform.scale(source, layout.dest_rect.size, layout.scaled_surface)
+            if not layout.scaling_onto_target:
+                target.blit(layout.scaled_surface, layout.dest_rect)
+
+        for rect in layout.border_rects:
+            target.fill((0, 0, 0), rect)
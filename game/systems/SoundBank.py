@@ -0,0 +1,152 @@
+from random import randint
+
+import pygame
+from pgzero.builtins import sounds
+
+
+# Sound priorities. When every channel is busy, a new sound takes over the channel of the oldest sound with the lowest
+# priority, as long as that is no higher than the new sound's priority
+SOUND_PRIORITY_LOW = 0          # e.g. attack whooshes
+SOUND_PRIORITY_NORMAL = 1       # e.g. hits
+SOUND_PRIORITY_HIGH = 2         # e.g. UI sounds, portals
+
+# Sounds other than those used by attacks, which are loaded up front along with the attack sounds. Name and number of
+# variants, as passed to play
+PRELOAD_SOUNDS = (
+    ("sfx/ui/teletype", 1),
+    ("sfx/ui/health", 1),
+    ("sfx/portal/portal_appear", 1),
+    ("sfx/portal/portal_destroyed", 1),
+    ("sfx/portal/portal_enemy_spawn", 1),
+    ("sfx/portal/portal_hit", 1),
+    ("sfx/scooter/scooter_slow", 1),
+    ("sfx/scooter/scooter_accelerate", 6),
+    ("sfx/scooter/scooter_fall", 1),
+    ("sfx/weapons/stick_break", 1),
+    ("sfx/weapons/chain_break", 1),
+)
+
+
+class SoundBank:
+    # Loads sounds once, up front, and plays them on a fixed pool of mixer channels which it manages itself.
+    # Some sounds have multiple variants, named e.g. 'punch_hit0' to 'punch_hit3', one of which is chosen at random each
+    # time the sound is played.
+    # Each channel in the pool is either playing a one-off sound, or is held by an object (e.g. the scooter engine
+    # sound) until that object releases it. Held channels are never taken over by other sounds.
+    # The same sound is only played once per frame, so that a group of enemies being hit at once doesn't start several
+    # copies of the same sound
+
+    NUM_CHANNELS = 16
+
+    def __init__(self):
+        # (sound name, number of variants) -> list of pygame Sound objects for the variants which could be loaded, which
+        # may be fewer than asked for, or none. Loading is only tried once for each
+        self.variants = {}
+
+        # Created on first use, as the mixer must have been set up
+        self.channels = None
+        # For each channel - priority and frame of the sound playing on it, and the object holding it (or None)
+        self.channel_priorities = []
+        self.channel_frames = []
+        self.channel_holders = []
+
+        self.frame = 0
+        self.played_this_frame = set()
+
+    def is_available(self):
+        return pygame.mixer.get_init() is not None
+
+    def load(self, name, count=1):
+        key = (name, count)
+        variants = self.variants.get(key)
+        if variants is None:
+            variants = []
+            for i in range(count):
+                try:
+                    variants.append(sounds.load(f"{name}{i}"))
+                except Exception as e:
+                    # Reported once here, rather than every time the sound is played
+                    print(e)
+            self.variants[key] = variants
+        return variants
+
+    def preload(self, attacks):
+        # Load every sound used by the given attacks (see attacks_data), and those in PRELOAD_SOUNDS
+        if not self.is_available():
+            return
+        for attack in attacks.values():
+            for sound in (attack.initial_sound, attack.hit_sound):
+                if sound is not None:
+                    self.load(*sound)
+        for name, count in PRELOAD_SOUNDS:
+            self.load(name, count)
+
+    def get_sound(self, name, count=1):
+        # Choose one of the sound's variants. Deliberately uses the global random generator rather than the game's, see
+        # Game.get_sound
+        variants = self.load(name, count)
+        if not variants:
+            return None
+        return variants[randint(0, count - 1) % len(variants)]
+
+    def create_channels(self):
+        if pygame.mixer.get_num_channels() < SoundBank.NUM_CHANNELS:
+            pygame.mixer.set_num_channels(SoundBank.NUM_CHANNELS)
+        self.channels = [pygame.mixer.Channel(i) for i in range(SoundBank.NUM_CHANNELS)]
+        self.channel_priorities = [SOUND_PRIORITY_LOW] * SoundBank.NUM_CHANNELS
+        self.channel_frames = [0] * SoundBank.NUM_CHANNELS
+        self.channel_holders = [None] * SoundBank.NUM_CHANNELS
+
+    def find_channel(self, priority):
+        # Returns the index of a free channel, or failing that the channel to steal, or None if all channels are held or
+        # playing higher priority sounds
+        if self.channels is None:
+            self.create_channels()
+        steal_index = None
+        for i, channel in enumerate(self.channels):
+            if self.channel_holders[i] is not None:
+                continue
+            if not channel.get_busy():
+                return i
+            if self.channel_priorities[i] <= priority:
+                # Lowest priority first, then oldest
+                if steal_index is None or (self.channel_priorities[i], self.channel_frames[i]) < (self.channel_priorities[steal_index], self.channel_frames[steal_index]):
+                    steal_index = i
+        return steal_index
+
+    def play(self, name, count=1, priority=SOUND_PRIORITY_NORMAL):
+        if not self.is_available() or name in self.played_this_frame:
+            return
+        sound = self.get_sound(name, count)
+        if sound is None:
+            return
+        index = self.find_channel(priority)
+        if index is None:
+            return
+        self.played_this_frame.add(name)
+        self.channel_priorities[index] = priority
+        self.channel_frames[index] = self.frame
+        self.channels[index].play(sound)
+
+    def hold_channel(self, holder):
+        # Reserve a channel for the holder to use as it wishes until it calls release_channel. Returns None if no
+        # channel is free
+        if not self.is_available():
+            return None
+        index = self.find_channel(SOUND_PRIORITY_HIGH)
+        if index is None:
+            return None
+        channel = self.channels[index]
+        channel.stop()
+        self.channel_holders[index] = holder
+        return channel
+
+    def release_channel(self, channel):
+        if self.channels is not None and channel in self.channels:
+            index = self.channels.index(channel)
+            channel.stop()
+            self.channel_holders[index] = None
+
+    def new_frame(self):
+        self.frame += 1
+        self.played_this_frame.clear()
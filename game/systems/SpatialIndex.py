@@ -0,0 +1,117 @@
+class SpatialGrid:
+    # A uniform grid of square cells, each holding the objects whose position is inside that cell, so that objects near
+    # a point can be found without checking every object.
+    # get_pos is a function which returns an object's position as a Vector2 (e.g. its vpos).
+    # Queries return candidates from all cells touching the square around the given point, in the same order as the list
+    # the grid was built from - callers still need to do their own exact distance check
+
+    def __init__(self, cell_size, get_pos):
+        self.cell_size = cell_size
+        self.get_pos = get_pos
+        self.cells = {}
+        self.object_cells = {}
+        self.order = {}
+
+        # The list the grid was last built from, and its length at the time, used to detect when the grid is out of date
+        self.source = None
+        self.source_len = 0
+        self.dirty = True
+
+    def get_cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def is_stale(self, source):
+        # The grid must be rebuilt if it has been marked as dirty, if the game has replaced the list (which happens
+        # when removing objects), or if objects have been added to it
+        return self.dirty or source is not self.source or len(source) != self.source_len
+
+    def rebuild(self, objects, source=None):
+        self.cells.clear()
+        self.object_cells.clear()
+        self.order.clear()
+        for index, obj in enumerate(objects):
+            pos = self.get_pos(obj)
+            cell = self.get_cell(pos.x, pos.y)
+            self.cells.setdefault(cell, []).append(obj)
+            self.object_cells[obj] = cell
+            self.order[obj] = index
+        self.source = objects if source is None else source
+        self.source_len = len(self.source)
+        self.dirty = False
+
+    def move(self, obj):
+        # Update the cell of an object whose position has changed since the grid was built. Not needed if the grid is
+        # going to be rebuilt before the next query anyway
+        if self.dirty or obj not in self.object_cells:
+            return
+        pos = self.get_pos(obj)
+        cell = self.get_cell(pos.x, pos.y)
+        old_cell = self.object_cells[obj]
+        if cell != old_cell:
+            self.cells[old_cell].remove(obj)
+            self.cells.setdefault(cell, []).append(obj)
+            self.object_cells[obj] = cell
+
+    def query(self, pos, radius):
+        if not self.object_cells:
+            return []
+        cell_size = self.cell_size
+        x, y = pos.x, pos.y
+        min_y = int((y - radius) // cell_size)
+        max_y = int((y + radius) // cell_size)
+        found = []
+        for cell_x in range(int((x - radius) // cell_size), int((x + radius) // cell_size) + 1):
+            for cell_y in range(min_y, max_y + 1):
+                objects = self.cells.get((cell_x, cell_y))
+                if objects:
+                    found.extend(objects)
+        if len(found) > 1:
+            # Keep the order of the original list, so that results don't depend on grid layout
+            found.sort(key=self.order.__getitem__)
+        return found
+
+
+class SpatialIndex:
+    # Owned by Game. Provides proximity queries for weapons, powerups, fighters and enemy target positions, replacing
+    # loops over every object. Each grid is built on the first query of each frame, so it sees the positions at that
+    # point in the frame, which is what the loops it replaces would have seen. Enemy targets change while enemies are
+    # updated, so enemies report their new target at the end of their update (see Enemy.update)
+    CELL_SIZE = 100
+
+    def __init__(self, game):
+        self.game = game
+        self.weapons = SpatialGrid(SpatialIndex.CELL_SIZE, lambda weapon: weapon.vpos)
+        self.powerups = SpatialGrid(SpatialIndex.CELL_SIZE, lambda powerup: powerup.vpos)
+        self.fighters = SpatialGrid(SpatialIndex.CELL_SIZE, lambda fighter: fighter.vpos)
+        self.enemy_targets = SpatialGrid(SpatialIndex.CELL_SIZE, lambda enemy: enemy.target)
+
+    def new_frame(self):
+        # Called by Game at the start of each update, as objects will have moved since last frame
+        self.weapons.dirty = True
+        self.powerups.dirty = True
+        self.fighters.dirty = True
+        self.enemy_targets.dirty = True
+
+    def get_weapons_near(self, pos, radius):
+        if self.weapons.is_stale(self.game.weapons):
+            self.weapons.rebuild(self.game.weapons)
+        return self.weapons.query(pos, radius)
+
+    def get_powerups_near(self, pos, radius):
+        if self.powerups.is_stale(self.game.powerups):
+            self.powerups.rebuild(self.game.powerups)
+        return self.powerups.query(pos, radius)
+
+    def get_fighters_near(self, pos, radius):
+        # Player and enemies, player first
+        if self.fighters.is_stale(self.game.enemies):
+            self.fighters.rebuild([self.game.player] + self.game.enemies, self.game.enemies)
+        return self.fighters.query(pos, radius)
+
+    def get_enemies_with_target_near(self, pos, radius):
+        if self.enemy_targets.is_stale(self.game.enemies):
+            self.enemy_targets.rebuild(self.game.enemies)
+        return self.enemy_targets.query(pos, radius)
+
+    def enemy_target_moved(self, enemy):
+        self.enemy_targets.move(enemy)
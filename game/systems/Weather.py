@@ -4,6 +4,14 @@ import pygame
 
 from game import config
 
+RAIN_COLOR = (100, 100, 130)
+SNOW_COLOR = (240, 245, 255)
+LEAF_TINTS = [(70, 140, 70), (60, 120, 60), (90, 160, 90)]
+LEAF_STEM_COLOR = (40, 80, 40)
+
+# Types of weather which set_weather accepts, and the settings which can be given along with the type
+WEATHER_TYPES = ("rain", "snow", "leaves")
+WEATHER_SETTINGS = ("intensity", "wind", "speed", "length", "ramp_seconds")
 
 class RainEffect:
     def __init__(
@@ -15,7 +23,10 @@ class RainEffect:
         speed_range=(7.0, 12.0),
         length_range=(6.0, 12.0),
         ramp_seconds=2.0,
+        rng=None,
     ):
+        # Random number generator for particle positions etc. Defaults to the random module's global generator
+        self.rng = rng if rng is not None else random
         self.width = width
         self.height = height
         self.intensity_max = max(0, int(drop_count))
@@ -35,11 +46,11 @@ class RainEffect:
         return intensity_max / ramp_frames
 
     def _new_drop(self, start_above=False):
-        x = random.uniform(0, self.width)
-        y = random.uniform(-self.height, 0) if start_above else random.uniform(0, self.height)
-        speed = random.uniform(*self.speed_range)
-        length = random.uniform(*self.length_range)
-        drift = random.uniform(-0.8, 0.8) + self.wind
+        x = self.rng.uniform(0, self.width)
+        y = self.rng.uniform(-self.height, 0) if start_above else self.rng.uniform(0, self.height)
+        speed = self.rng.uniform(*self.speed_range)
+        length = self.rng.uniform(*self.length_range)
+        drift = self.rng.uniform(-0.8, 0.8) + self.wind
         return [x, y, speed, length, drift]
 
     def apply_settings(self, intensity, wind, speed_mult, length_mult, ramp_seconds):
@@ -82,9 +93,8 @@ class RainEffect:
     def draw(self, screen):
         if screen is None:
             return
-        color = (100, 100, 130)
         for x, y, _speed, length, _drift in self.drops:
-            screen.draw.line((x, y), (x + 1, y + length), color)
+            screen.draw.line((x, y), (x + 1, y + length), RAIN_COLOR)
 
     def get_kind(self):
         return "rain"
@@ -115,7 +125,10 @@ class SnowEffect:
         speed_range=(1.0, 3.0),
         size_range=(1.0, 2.0),
         ramp_seconds=2.0,
+        rng=None,
     ):
+        # Random number generator for particle positions etc. Defaults to the random module's global generator
+        self.rng = rng if rng is not None else random
         self.width = width
         self.height = height
         self.intensity_max = max(0, int(drop_count))
@@ -135,12 +148,12 @@ class SnowEffect:
         return intensity_max / ramp_frames
 
     def _new_flake(self, start_above=False):
-        x = random.uniform(0, self.width)
-        y = random.uniform(-self.height, 0) if start_above else random.uniform(0, self.height)
-        speed = random.uniform(*self.speed_range)
-        size = random.uniform(*self.size_range)
-        drift = random.uniform(-0.4, 0.4) + self.wind
-        wobble = random.uniform(0.5, 1.5)
+        x = self.rng.uniform(0, self.width)
+        y = self.rng.uniform(-self.height, 0) if start_above else self.rng.uniform(0, self.height)
+        speed = self.rng.uniform(*self.speed_range)
+        size = self.rng.uniform(*self.size_range)
+        drift = self.rng.uniform(-0.4, 0.4) + self.wind
+        wobble = self.rng.uniform(0.5, 1.5)
         return [x, y, speed, size, drift, wobble]
 
     def apply_settings(self, intensity, wind, speed_mult, length_mult, ramp_seconds):
@@ -183,9 +196,8 @@ class SnowEffect:
     def draw(self, screen):
         if screen is None:
             return
-        color = (240, 245, 255)
         for x, y, _speed, size, _drift, _wobble in self.flakes:
-            screen.draw.filled_circle((x, y), max(1, int(round(size))), color)
+            screen.draw.filled_circle((x, y), max(1, int(round(size))), SNOW_COLOR)
 
     def get_kind(self):
         return "snow"
@@ -210,7 +222,10 @@ class LeavesEffect:
         speed_range=(1.5, 4.0),
         size_range=(2.0, 4.0),
         ramp_seconds=2.0,
+        rng=None,
     ):
+        # Random number generator for particle positions etc. Defaults to the random module's global generator
+        self.rng = rng if rng is not None else random
         self.width = width
         self.height = height
         self.intensity_max = max(0, int(drop_count))
@@ -230,17 +245,17 @@ class LeavesEffect:
         return intensity_max / ramp_frames
 
     def _new_leaf(self, start_above=False):
-        x = random.uniform(0, self.width)
-        y = random.uniform(-self.height, 0) if start_above else random.uniform(0, self.height)
-        speed = random.uniform(*self.speed_range)
-        size = random.uniform(*self.size_range)
-        drift = random.uniform(-0.6, 0.6) + self.wind
-        wobble = random.uniform(0.8, 1.6)
-        angle = math.radians(-45.0 * (1.0 + random.uniform(-0.1, 0.1)))
-        phase = random.uniform(0.0, math.tau)
-        phase_speed = random.uniform(0.04, 0.08)
-        sway = random.uniform(0.8, 1.4)
-        tint = random.choice([(70, 140, 70), (60, 120, 60), (90, 160, 90)])
+        x = self.rng.uniform(0, self.width)
+        y = self.rng.uniform(-self.height, 0) if start_above else self.rng.uniform(0, self.height)
+        speed = self.rng.uniform(*self.speed_range)
+        size = self.rng.uniform(*self.size_range)
+        drift = self.rng.uniform(-0.6, 0.6) + self.wind
+        wobble = self.rng.uniform(0.8, 1.6)
+        angle = math.radians(-45.0 * (1.0 + self.rng.uniform(-0.1, 0.1)))
+        phase = self.rng.uniform(0.0, math.tau)
+        phase_speed = self.rng.uniform(0.04, 0.08)
+        sway = self.rng.uniform(0.8, 1.4)
+        tint = self.rng.choice(LEAF_TINTS)
         return [x, y, speed, size, drift, wobble, angle, tint, phase, phase_speed, sway]
 
     def apply_settings(self, intensity, wind, speed_mult, length_mult, ramp_seconds):
@@ -303,7 +318,7 @@ class LeavesEffect:
             stem_len = size * 1.65
             stem_start = (x + cos_a * size * 0.6, y + sin_a * size * 0.6)
             stem_end = (x + cos_a * (size * 0.6 + stem_len), y + sin_a * (size * 0.6 + stem_len))
-            screen.draw.line(stem_start, stem_end, (40, 80, 40))
+            screen.draw.line(stem_start, stem_end, LEAF_STEM_COLOR)
 
     def get_kind(self):
         return "leaves"
@@ -318,7 +333,23 @@ class LeavesEffect:
         return self.target_count <= 0 and self.current_count <= 0 and len(self.leaves) == 0
 
 
-def create_weather(kind):
+def get_effect_class(kind_type):
+    # Use the NumPy versions of the effects if NumPy is installed (see WeatherParticles.py), otherwise the ones above
+    if config.WEATHER_USE_NUMPY:
+        try:
+            from game.systems import WeatherParticles
+        except ImportError:
+            pass
+        else:
+            return {
+                "rain": WeatherParticles.ParticleRainEffect,
+                "snow": WeatherParticles.ParticleSnowEffect,
+                "leaves": WeatherParticles.ParticleLeavesEffect,
+            }.get(kind_type)
+    return {"rain": RainEffect, "snow": SnowEffect, "leaves": LeavesEffect}.get(kind_type)
+
+
+def create_weather(kind, rng=None):
     if isinstance(kind, dict):
         kind_type = kind.get("type")
         if kind_type == "rain":
@@ -329,12 +360,13 @@ def create_weather(kind):
             ramp_seconds = float(kind.get("ramp_seconds", 2.0))
             speed_range = (7.0 * speed_mult, 12.0 * speed_mult)
             length_range = (6.0 * length_mult, 12.0 * length_mult)
-            return RainEffect(
+            return get_effect_class("rain")(
                 drop_count=intensity,
                 wind=wind,
                 speed_range=speed_range,
                 length_range=length_range,
                 ramp_seconds=ramp_seconds,
+                rng=rng,
             )
         if kind_type == "snow":
             intensity = int(kind.get("intensity", 140))
@@ -344,12 +376,13 @@ def create_weather(kind):
             ramp_seconds = float(kind.get("ramp_seconds", 2.0))
             speed_range = (1.0 * speed_mult, 3.0 * speed_mult)
             size_range = (1.0 * length_mult, 2.0 * length_mult)
-            return SnowEffect(
+            return get_effect_class("snow")(
                 drop_count=intensity,
                 wind=wind,
                 speed_range=speed_range,
                 size_range=size_range,
                 ramp_seconds=ramp_seconds,
+                rng=rng,
             )
         if kind_type == "leaves":
             intensity = int(kind.get("intensity", 140))
@@ -359,20 +392,21 @@ def create_weather(kind):
             ramp_seconds = float(kind.get("ramp_seconds", 2.0))
             speed_range = (1.5 * speed_mult, 4.0 * speed_mult)
             size_range = (2.0 * length_mult, 4.0 * length_mult)
-            return LeavesEffect(
+            return get_effect_class("leaves")(
                 drop_count=intensity,
                 wind=wind,
                 speed_range=speed_range,
                 size_range=size_range,
                 ramp_seconds=ramp_seconds,
+                rng=rng,
             )
         return None
     if kind == "rain":
-        return RainEffect()
+        return get_effect_class("rain")(rng=rng)
     if kind == "snow":
-        return SnowEffect()
+        return get_effect_class("snow")(rng=rng)
     if kind == "leaves":
-        return LeavesEffect()
+        return get_effect_class("leaves")(rng=rng)
     return None
 
 
@@ -405,6 +439,11 @@ class WeatherSystem:
             "leaves": {"intensity": 50, "wind": 0, "speed": 0.25, "length": 1.0, "ramp_seconds": 2.5},
         }
         self.settings = self.presets["rain"].copy()
+        # Weather has its own random number generator, so that it doesn't affect the random decisions made by the game
+        self.rng = random.Random()
+
+    def reseed(self, seed):
+        self.rng.seed(seed)
 
     def set_weather(self, kind):
         if kind is None:
@@ -413,7 +452,7 @@ class WeatherSystem:
             return
         if isinstance(kind, dict):
             kind_type = kind.get("type")
-            if kind_type not in ("rain", "snow", "leaves"):
+            if kind_type not in WEATHER_TYPES:
                 self.stop()
                 self.active_kind = None
                 return
@@ -426,12 +465,7 @@ class WeatherSystem:
                 "ramp_seconds": float(kind.get("ramp_seconds", base["ramp_seconds"])),
             }
             if self.active_kind != kind_type or self.effect is None:
-                if kind_type == "rain":
-                    self.effect = RainEffect()
-                elif kind_type == "snow":
-                    self.effect = SnowEffect()
-                else:
-                    self.effect = LeavesEffect()
+                self.effect = get_effect_class(kind_type)(rng=self.rng)
             self.effect.apply_settings(
                 self.settings["intensity"],
                 self.settings["wind"],
@@ -442,15 +476,10 @@ class WeatherSystem:
             self.effect.set_target(self.settings["intensity"], self.settings["ramp_seconds"])
             self.active_kind = kind_type
             return
-        if kind in ("rain", "snow", "leaves"):
+        if kind in WEATHER_TYPES:
             self.settings = self.presets[kind].copy()
             if self.active_kind != kind or self.effect is None:
-                if kind == "rain":
-                    self.effect = RainEffect()
-                elif kind == "snow":
-                    self.effect = SnowEffect()
-                else:
-                    self.effect = LeavesEffect()
+                self.effect = get_effect_class(kind)(rng=self.rng)
             self.effect.apply_settings(
                 self.settings["intensity"],
                 self.settings["wind"],
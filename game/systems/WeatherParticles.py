@@ -0,0 +1,251 @@
+import math
+
+import numpy
+import pygame
+
+from game.systems.Weather import RainEffect, SnowEffect, LeavesEffect, LEAF_TINTS, LEAF_STEM_COLOR, RAIN_COLOR, SNOW_COLOR
+
+
+# Versions of the weather effects which store their particles as NumPy arrays - one array per particle property, rather
+# than one list per particle - so that moving and respawning particles is done for all of them at once, and which draw
+# each particle by blitting a sprite rendered in advance, all in a single call to Surface.blits. This allows for
+# thousands of particles rather than a few hundred.
+# Used in place of the list-based effects in Weather.py when NumPy is installed, see get_effect_class
+
+
+class ParticleEffectMixin:
+    # Particle storage, and the parts of the update common to all effects. Classes using this must define FIELDS (the
+    # names of the particle properties), _spawn (which returns a dictionary of arrays of new values for each property)
+    # and _move (which returns a mask of particles which have left the screen)
+
+    FIELDS = ()
+
+    def _init_particles(self):
+        # NumPy has its own random number generator, seeded from the effect's generator so that the weather is still
+        # the same each time the game is played with the same seed
+        self.np_rng = numpy.random.default_rng(self.rng.getrandbits(64))
+        self.particles = {name: numpy.zeros(0) for name in self.FIELDS}
+        self.sprites = {}
+
+    def get_particle_count(self):
+        return len(self.particles[self.FIELDS[0]])
+
+    def _set_particle_count(self, desired):
+        count = self.get_particle_count()
+        if desired > count:
+            new = self._spawn(desired - count)
+            for name in self.FIELDS:
+                self.particles[name] = numpy.concatenate((self.particles[name], new[name]))
+        elif desired < count:
+            for name in self.FIELDS:
+                self.particles[name] = self.particles[name][:desired]
+
+    def _respawn(self, mask):
+        count = int(numpy.count_nonzero(mask))
+        if count > 0:
+            new = self._spawn(count)
+            for name in self.FIELDS:
+                self.particles[name][mask] = new[name]
+
+    def _uniform(self, low_high, count):
+        return self.np_rng.uniform(low_high[0], low_high[1], count)
+
+    def _spawn_positions(self, count):
+        # New particles always start above the screen, as in the list-based effects
+        return self.np_rng.uniform(0, self.width, count), self.np_rng.uniform(-self.height, 0, count)
+
+    def apply_settings(self, intensity, wind, speed_mult, length_mult, ramp_seconds):
+        super().apply_settings(intensity, wind, speed_mult, length_mult, ramp_seconds)
+        desired = int(round(self.current_count))
+        if desired < self.get_particle_count():
+            self._set_particle_count(desired)
+
+    def update(self):
+        if self.current_count != self.target_count:
+            delta = self.target_count - self.current_count
+            step = self.ramp_speed if delta > 0 else -self.ramp_speed
+            if abs(delta) <= abs(step) or step == 0:
+                self.current_count = self.target_count
+            else:
+                self.current_count += step
+            self._set_particle_count(int(round(self.current_count)))
+
+        if self.get_particle_count() > 0:
+            self._respawn(self._move())
+
+    def _blit_sprites(self, screen, keys, x, y):
+        # keys gives the sprite to use for each particle, x and y the top left position to draw it at
+        sprites = self.sprites
+        get_sprite = self._get_sprite
+        sprite_list = []
+        for key in keys:
+            sprite = sprites.get(key)
+            if sprite is None:
+                sprite = sprites[key] = get_sprite(key)
+            sprite_list.append(sprite)
+        screen.surface.blits(zip(sprite_list, zip(x.tolist(), y.tolist())), False)
+
+    def _new_sprite(self, width, height):
+        # Particles are solid colours, so use a colour key for transparency rather than per-pixel alpha, which is
+        # faster to blit
+        sprite = pygame.Surface((width, height))
+        sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        return sprite
+
+    def is_finished(self):
+        return self.target_count <= 0 and self.current_count <= 0 and self.get_particle_count() == 0
+
+
+class ParticleRainEffect(ParticleEffectMixin, RainEffect):
+    FIELDS = ("x", "y", "speed", "length", "drift")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._init_particles()
+
+    def _spawn(self, count):
+        x, y = self._spawn_positions(count)
+        return {
+            "x": x,
+            "y": y,
+            "speed": self._uniform(self.speed_range, count),
+            "length": self._uniform(self.length_range, count),
+            "drift": self.np_rng.uniform(-0.8, 0.8, count) + self.wind,
+        }
+
+    def _move(self):
+        p = self.particles
+        p["x"] += p["drift"]
+        p["y"] += p["speed"]
+        return (p["y"] - p["length"] > self.height) | (p["x"] < -10) | (p["x"] > self.width + 10)
+
+    def _get_sprite(self, length):
+        # A line one pixel across and length pixels down, as in RainEffect.draw
+        sprite = self._new_sprite(2, length + 1)
+        pygame.draw.line(sprite, RAIN_COLOR, (0, 0), (1, length), 1)
+        return sprite
+
+    def draw(self, screen):
+        if screen is None or self.get_particle_count() == 0:
+            return
+        p = self.particles
+        lengths = numpy.rint(p["length"]).astype(int)
+        self._blit_sprites(screen, lengths.tolist(), numpy.rint(p["x"]), numpy.rint(p["y"]))
+
+
+class ParticleSnowEffect(ParticleEffectMixin, SnowEffect):
+    FIELDS = ("x", "y", "speed", "size", "drift", "wobble")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._init_particles()
+
+    def _spawn(self, count):
+        x, y = self._spawn_positions(count)
+        return {
+            "x": x,
+            "y": y,
+            "speed": self._uniform(self.speed_range, count),
+            "size": self._uniform(self.size_range, count),
+            "drift": self.np_rng.uniform(-0.4, 0.4, count) + self.wind,
+            "wobble": self.np_rng.uniform(0.5, 1.5, count),
+        }
+
+    def _move(self):
+        p = self.particles
+        p["x"] += p["drift"] + p["wobble"] * 0.05
+        p["y"] += p["speed"]
+        return (p["y"] - p["size"] > self.height) | (p["x"] < -10) | (p["x"] > self.width + 10)
+
+    def _get_sprite(self, radius):
+        sprite = self._new_sprite(radius * 2 + 1, radius * 2 + 1)
+        pygame.draw.circle(sprite, SNOW_COLOR, (radius, radius), radius, 0)
+        return sprite
+
+    def draw(self, screen):
+        if screen is None or self.get_particle_count() == 0:
+            return
+        p = self.particles
+        radii = numpy.maximum(1, numpy.rint(p["size"])).astype(int)
+        self._blit_sprites(screen, radii.tolist(), numpy.rint(p["x"]) - radii, numpy.rint(p["y"]) - radii)
+
+
+class ParticleLeavesEffect(ParticleEffectMixin, LeavesEffect):
+    FIELDS = ("x", "y", "speed", "size", "drift", "wobble", "angle", "tint", "phase", "phase_speed", "sway")
+
+    # Leaf sprites are rendered for sizes rounded to the nearest SIZE_STEP and angles rounded to the nearest
+    # ANGLE_STEP degrees, which keeps the number of sprites needed small
+    SIZE_STEP = 0.25
+    ANGLE_STEP = 1.0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._init_particles()
+
+    def _spawn(self, count):
+        x, y = self._spawn_positions(count)
+        rng = self.np_rng
+        return {
+            "x": x,
+            "y": y,
+            "speed": self._uniform(self.speed_range, count),
+            "size": self._uniform(self.size_range, count),
+            "drift": rng.uniform(-0.6, 0.6, count) + self.wind,
+            "wobble": rng.uniform(0.8, 1.6, count),
+            # Angle in degrees, unlike LeavesEffect, as it is only used to choose a sprite
+            "angle": -45.0 * (1.0 + rng.uniform(-0.1, 0.1, count)),
+            "tint": rng.integers(0, len(LEAF_TINTS), count).astype(float),
+            "phase": rng.uniform(0.0, math.tau, count),
+            "phase_speed": rng.uniform(0.04, 0.08, count),
+            "sway": rng.uniform(0.8, 1.4, count),
+        }
+
+    def _move(self):
+        p = self.particles
+        p["phase"] += p["phase_speed"]
+        p["x"] += p["drift"] + p["wobble"] * 0.08 + numpy.sin(p["phase"]) * (p["sway"] * 0.9)
+        p["y"] += p["speed"]
+        return (p["y"] - p["size"] > self.height) | (p["x"] < -20) | (p["x"] > self.width + 20)
+
+    def _get_sprite(self, key):
+        # Same shape as LeavesEffect.draw, centred on the middle of the sprite
+        size_index, angle_index, tint_index = key
+        size = size_index * ParticleLeavesEffect.SIZE_STEP
+        angle = math.radians(angle_index * ParticleLeavesEffect.ANGLE_STEP)
+        radius = int(math.ceil(size * 2.25)) + 1
+        sprite = self._new_sprite(radius * 2 + 1, radius * 2 + 1)
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        dx = size * 0.6
+        dy = size * 1.4 * 0.6
+        points = [(-0.0, -dy), (dx, 0.0), (0.0, dy), (-dx, 0.0)]
+        rotated = [(radius + px * cos_a - py * sin_a, radius + px * sin_a + py * cos_a) for px, py in points]
+        pygame.draw.polygon(sprite, LEAF_TINTS[tint_index], rotated, 0)
+        stem_len = size * 1.65
+        stem_start = (radius + cos_a * size * 0.6, radius + sin_a * size * 0.6)
+        stem_end = (radius + cos_a * (size * 0.6 + stem_len), radius + sin_a * (size * 0.6 + stem_len))
+        pygame.draw.line(sprite, LEAF_STEM_COLOR, stem_start, stem_end, 1)
+        return sprite, radius
+
+    def _blit_sprites(self, screen, keys, x, y):
+        # Leaf sprites vary in size, so each one is stored along with the offset from its top left to the leaf's centre
+        sprites = self.sprites
+        sprite_list = []
+        offsets = []
+        for key in keys:
+            entry = sprites.get(key)
+            if entry is None:
+                entry = sprites[key] = self._get_sprite(key)
+            sprite_list.append(entry[0])
+            offsets.append(entry[1])
+        offsets = numpy.array(offsets)
+        screen.surface.blits(zip(sprite_list, zip((x - offsets).tolist(), (y - offsets).tolist())), False)
+
+    def draw(self, screen):
+        if screen is None or self.get_particle_count() == 0:
+            return
+        p = self.particles
+        sizes = numpy.rint(p["size"] / ParticleLeavesEffect.SIZE_STEP).astype(int).tolist()
+        angles = numpy.rint(p["angle"] / ParticleLeavesEffect.ANGLE_STEP).astype(int).tolist()
+        tints = p["tint"].astype(int).tolist()
+        self._blit_sprites(screen, zip(sizes, angles, tints), numpy.rint(p["x"]), numpy.rint(p["y"]))
@@ -0,0 +1,97 @@
+import pygame
+from pygame import Rect
+from pgzero.builtins import images
+
+from game.config import *
+
+
+class BackgroundLayer:
+    # Draws the road and the background tiles.
+    # Rather than drawing the road and every visible tile each frame, the background is composed onto a strip the width
+    # of the screen, which is then drawn onto the screen. The strip is used as a ring buffer - the background at level X
+    # position x is stored in strip column x % WIDTH - so that when the screen scrolls, only the newly exposed columns
+    # need to be composed, and when it doesn't scroll, nothing needs to be composed.
+    # Positions are whole pixels, the scroll position being rounded down.
+    # Tiles are loaded by name when they're composed, rather than kept here, so that the surface cache can discard
+    # tiles which have scrolled past
+
+    ROAD_IMAGE = "backgrounds/road"
+
+    # Tiles are BACKGROUND_TILE_WIDTH wide, and overlap the next tile as they're wider than BACKGROUND_TILE_SPACING.
+    # Due to the isometric nature of the background, each tile includes a transparent part, which for the first tile is
+    # off the left of the level - tile i is drawn at level X position (i - 1) * BACKGROUND_TILE_SPACING
+
+    def __init__(self):
+        self.strip = None
+        self.road_image = None
+
+        # Level X position of the left edge of the screen when the strip was last drawn, and the scroll Y position
+        # which the tiles were composed at
+        self.scroll_x = None
+        self.scroll_y = None
+
+    def load(self, screen):
+        # Images can only be loaded once the display has been set up, so this happens on first draw
+        self.strip = pygame.Surface((WIDTH, HEIGHT), 0, screen.surface)
+        self.road_image = images.load(BackgroundLayer.ROAD_IMAGE)
+
+    def get_first_visible_tile(self, x):
+        # Index of the first tile which extends to the right of level X position x. Tile x // BACKGROUND_TILE_SPACING
+        # starts just before x, but the one before that may still overlap x
+        index = max(0, int(x // BACKGROUND_TILE_SPACING))
+        if (index - 1) * BACKGROUND_TILE_SPACING + BACKGROUND_TILE_WIDTH <= x:
+            index += 1
+        return index
+
+    def compose(self, left, right):
+        # Compose the background between level X positions left and right onto the strip, splitting the range where
+        # it wraps around the end of the strip
+        while left < right:
+            strip_x = left % WIDTH
+            end = min(right, left + WIDTH - strip_x)
+            self.compose_section(left, end, left - strip_x)
+            left = end
+
+    def compose_section(self, left, right, strip_left):
+        # strip_left is the level X position which strip column 0 represents for this section
+        strip = self.strip
+        strip.set_clip(Rect(left - strip_left, 0, right - left, HEIGHT))
+
+        # The road repeats every WIDTH pixels
+        for road_x in range(left // WIDTH * WIDTH, right, WIDTH):
+            strip.blit(self.road_image, (road_x - strip_left, 0))
+
+        # Tiles in order, as each one overlaps the previous one
+        index = self.get_first_visible_tile(left)
+        tile_y = -self.scroll_y
+        while index < len(BACKGROUND_TILES):
+            tile_x = (index - 1) * BACKGROUND_TILE_SPACING
+            if tile_x >= right:
+                break
+            strip.blit(images.load(BACKGROUND_TILES[index]), (tile_x - strip_left, tile_y))
+            index += 1
+
+        strip.set_clip(None)
+
+    def draw(self, screen, scroll_offset):
+        if self.strip is None:
+            self.load(screen)
+
+        x = int(scroll_offset.x // 1)
+        y = int(scroll_offset.y // 1)
+        if self.scroll_x is None or y != self.scroll_y or abs(x - self.scroll_x) >= WIDTH:
+            # Compose the whole screen
+            self.scroll_y = y
+            self.compose(x, x + WIDTH)
+        elif x > self.scroll_x:
+            # Scrolled right, compose the columns which have come onto the screen on the right
+            self.compose(self.scroll_x + WIDTH, x + WIDTH)
+        elif x < self.scroll_x:
+            self.compose(x, self.scroll_x)
+        self.scroll_x = x
+
+        # Strip column x % WIDTH is drawn at the left of the screen, with the rest of the strip wrapping around
+        strip_x = x % WIDTH
+        screen.surface.blit(self.strip, (0, 0), Rect(strip_x, 0, WIDTH - strip_x, HEIGHT))
+        if strip_x > 0:
+            screen.surface.blit(self.strip, (WIDTH - strip_x, 0), Rect(0, 0, strip_x, HEIGHT))
@@ -0,0 +1,125 @@
+import pygame
+from pgzero.builtins import images
+
+from game.config import *
+
+
+class CreditsRenderer:
+    # Draws the scrolling credits. All images are loaded and scaled, and all text rendered, once when the credits start
+    # rather than every frame. This is done on the main thread, as the font is shared with the rest of the game, and
+    # SDL_ttf can't be used from more than one thread at once. The credits are then drawn onto a strip made of
+    # horizontal tiles - a tile is drawn when it first scrolls onto the screen and discarded once it has scrolled off
+    # the top, so only enough tiles to cover the screen are kept in memory at once.
+    # The strip has per-pixel transparency, so that weather effects drawn underneath it show through
+
+    IMAGE_SCALE = 0.3
+    SPACING = 40
+    TILE_HEIGHT = 128
+
+    # Entries this far outside the screen are still considered visible, see is_entry_visible
+    VISIBLE_MARGIN = 200
+
+    def __init__(self, items, font):
+        self.items = items
+        self.font = font
+        self.line_height = font.size("A")[1] + 4
+
+        # List of dictionaries with the item, and its position and height in the strip
+        self.layout = []
+
+        # Surfaces to draw onto the strip, as tuples of surface, x and y (in strip coordinates), sorted by y
+        self.blits = []
+
+        # Tiles which have been drawn, keyed on tile index (0 being the top of the strip)
+        self.tiles = {}
+        self.height = 0
+
+    def start(self):
+        self.build()
+
+    def load_image(self, name):
+        try:
+            img = images.load(name)
+            return pygame.transform.smoothscale(img, (img.get_width() * CreditsRenderer.IMAGE_SCALE, img.get_height() * CreditsRenderer.IMAGE_SCALE))
+        except Exception as ex:
+            return None
+
+    def render_lines(self, lines, color):
+        return [self.font.render(line, True, color) for line in lines]
+
+    def build(self):
+        self.font.set_italic(False)
+        self.font.set_bold(False)
+        self.font.set_underline(False)
+
+        layout = []
+        blits = []
+        y = 0
+        for item in self.items:
+            item_type = item.get("type")
+            text = item.get("text", "")
+            lines = text.splitlines() if text else []
+            img = self.load_image(item["image"]) if item_type in ["side", "center"] and item.get("image") else None
+
+            if item_type == "center" and item.get("image") is None:
+                color = (255, 0, 0) if item.get("header") == "True" else (255, 255, 255)
+                for i, surf in enumerate(self.render_lines(lines, color)):
+                    blits.append((surf, WIDTH // 2 - surf.get_width() // 2, y + i * self.line_height))
+            elif item_type == "center":
+                if img is not None:
+                    blits.append((img, WIDTH // 2 - img.get_width() // 2, y))
+            elif item_type == "side":
+                side = item.get("side", "left")
+                if img is not None:
+                    img_x = 0 if side == "left" else WIDTH - img.get_width() - 60
+                    blits.append((img, img_x, y))
+                text_x = WIDTH // 2 - 100 if side == "left" else 30
+                for i, surf in enumerate(self.render_lines(lines, (255, 255, 255))):
+                    blits.append((surf, text_x, y + i * self.line_height))
+
+            text_h = max(1, len(lines)) * self.line_height
+            image_h = img.get_height() if img is not None else 0
+            height = max(text_h, image_h) + CreditsRenderer.SPACING
+            layout.append({"item": item, "y": y, "height": height})
+            y += height
+
+        blits.sort(key=lambda blit: blit[2])
+        self.blits = blits
+        self.layout = layout
+        self.height = y
+
+    def is_entry_visible(self, entry, scroll_y):
+        y = scroll_y + entry["y"]
+        return -CreditsRenderer.VISIBLE_MARGIN - entry["height"] <= y <= HEIGHT + CreditsRenderer.VISIBLE_MARGIN
+
+    def get_tile(self, index):
+        tile = self.tiles.get(index)
+        if tile is None:
+            tile = pygame.Surface((WIDTH, CreditsRenderer.TILE_HEIGHT), pygame.SRCALPHA)
+            tile_top = index * CreditsRenderer.TILE_HEIGHT
+            tile_bottom = tile_top + CreditsRenderer.TILE_HEIGHT
+            for surf, x, y in self.blits:
+                if y >= tile_bottom:
+                    break
+                if y + surf.get_height() > tile_top:
+                    # Normal blending onto the tile's transparent black would darken partially transparent pixels, so
+                    # instead copy them exactly. BLEND_RGBA_MAX does that as the tile starts out as all zeros, and
+                    # credits items don't overlap
+                    tile.blit(surf, (x, y - tile_top), special_flags=pygame.BLEND_RGBA_MAX)
+            self.tiles[index] = tile
+        return tile
+
+    def draw(self, screen, scroll_y):
+        # Tiles covering the screen, scroll_y being the screen Y position of the top of the strip. Position everything
+        # relative to a whole pixel, so that tiles line up with each other
+        scroll_y = int(scroll_y)
+        first_tile = max(0, int(-scroll_y // CreditsRenderer.TILE_HEIGHT))
+        last_tile = min(int((HEIGHT - scroll_y) // CreditsRenderer.TILE_HEIGHT), (self.height - 1) // CreditsRenderer.TILE_HEIGHT)
+
+        # Discard tiles which have scrolled off the top of the screen. The credits only scroll upwards so they won't
+        # be needed again
+        for index in [index for index in self.tiles if index < first_tile]:
+            del self.tiles[index]
+
+        for index in range(first_tile, last_tile + 1):
+            screen.blit(self.get_tile(index), (0, scroll_y + index * CreditsRenderer.TILE_HEIGHT))
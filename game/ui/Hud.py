@@ -0,0 +1,91 @@
+import pygame
+from pygame import Rect
+from pgzero.builtins import images
+
+from game.config import *
+from game.ui.text import font_credits_big, glyph_cache
+
+
+class Hud:
+    # Draws the status bar at the top of the screen - player health, stamina, lives and score.
+    # The images used are loaded, scaled and converted once. Everything is drawn onto a separate layer, which is only
+    # redrawn when one of the displayed values changes, and otherwise the layer is simply drawn onto the screen.
+    # The layer has per-pixel transparency, so that the background shows through around the status bar. Images are
+    # drawn onto it, and it is drawn onto the screen, using premultiplied alpha - otherwise partially transparent edges
+    # would be blended with the layer's transparent black and end up darker than when drawn directly onto the screen
+
+    LIFE_ICON_SCALE = 0.2
+    SCORE_COLOR = (0, 0, 255)
+
+    def __init__(self):
+        # Images can only be converted once the display has been set up, so they're loaded on first use
+        self.loaded = False
+        self.layer = None
+        self.layer_state = None
+
+    def load(self):
+        self.health_image = images.load("ui/health").premul_alpha()
+        self.stamina_image = images.load("ui/stamina").premul_alpha()
+        self.status_image = images.load("ui/status").premul_alpha()
+        life_image = images.load("ui/status_life9")
+        life_size = (life_image.get_width() * Hud.LIFE_ICON_SCALE, life_image.get_height() * Hud.LIFE_ICON_SCALE)
+        self.life_image = pygame.transform.smoothscale(life_image, life_size).convert_alpha().premul_alpha()
+
+        # Drawn directly onto the screen rather than onto the layer, so doesn't need to be premultiplied
+        self.boss_health_image = images.load("ui/health_boss")
+
+        # Premultiplied score digits, see draw_score
+        self.score_glyphs = {}
+
+        layer_height = max(self.status_image.get_height(), 35 + self.life_image.get_height(), 18 + font_credits_big.get_height())
+        self.layer = pygame.Surface((WIDTH, layer_height), pygame.SRCALPHA)
+        self.loaded = True
+
+    def draw(self, screen, player, score):
+        if not self.loaded:
+            self.load()
+
+        health_bar_w = int((player.health / player.start_health) * HEALTH_STAMINA_BAR_WIDTH)
+        stamina_bar_w = int((player.stamina / player.max_stamina) * HEALTH_STAMINA_BAR_WIDTH)
+
+        # Only redraw the layer if something it shows has changed
+        state = (health_bar_w, stamina_bar_w, player.lives, score)
+        if state != self.layer_state:
+            self.layer_state = state
+            self.draw_layer(health_bar_w, stamina_bar_w, player.lives, score)
+
+        screen.surface.blit(self.layer, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    def draw_layer(self, health_bar_w, stamina_bar_w, lives, score):
+        layer = self.layer
+        layer.fill((0, 0, 0, 0))
+
+        # Blit only the part of the health and stamina bars which should be shown. The bars are below the status image
+        # so that they appear within its frame
+        if health_bar_w > 0:
+            layer.blit(self.health_image, (48, 11), Rect(0, 0, health_bar_w, HEALTH_STAMINA_BAR_HEIGHT), pygame.BLEND_PREMULTIPLIED)
+        if stamina_bar_w > 0:
+            layer.blit(self.stamina_image, (517, 11), Rect(0, 0, stamina_bar_w, HEALTH_STAMINA_BAR_HEIGHT), pygame.BLEND_PREMULTIPLIED)
+
+        layer.blit(self.status_image, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+
+        for i in range(lives):
+            layer.blit(self.life_image, (i * 35 + 15, 35), special_flags=pygame.BLEND_PREMULTIPLIED)
+
+        self.draw_score(layer, score)
+
+    def draw_score(self, layer, score):
+        # Centred on the screen, same as draw_text with per_glyph=True
+        glyphs = [self.get_score_glyph(char) for char in f"{score:04}"]
+        x = WIDTH // 2 - sum(glyph.get_width() for glyph in glyphs) // 2
+        for glyph in glyphs:
+            layer.blit(glyph, (x, 18), special_flags=pygame.BLEND_PREMULTIPLIED)
+            x += glyph.get_width()
+
+    def get_score_glyph(self, char):
+        glyph = self.score_glyphs.get(char)
+        if glyph is None:
+            # Converting first also avoids premul_alpha giving wrong results for some font-rendered surfaces
+            glyph = glyph_cache.get(font_credits_big, char, Hud.SCORE_COLOR).convert_alpha().premul_alpha()
+            self.score_glyphs[char] = glyph
+        return glyph
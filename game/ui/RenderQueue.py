@@ -0,0 +1,49 @@
+from game.config import DEBUG_SHOW_ANCHOR_POINTS, DEBUG_SHOW_HEALTH_AND_STAMINA, DEBUG_SHOW_HIT_AREA_WIDTH, \
+    DEBUG_SHOW_LOGS, DEBUG_SHOW_TARGET_POS
+
+
+def get_draw_order(obj):
+    # Objects are drawn lowest on screen first. The Y pos used is modified by the result of get_draw_order_offset, for
+    # certain cases where we need more nuance than just "lowest on screen first"
+    return obj.vpos.y + obj.get_draw_order_offset()
+
+
+class RenderQueue:
+    # Draws the game's objects (fighters, weapons, scooters and powerups) in draw order.
+    # Each object adds the surfaces it's made of (e.g. its shadow and itself) and where to draw them to a list - see
+    # ScrollHeightActor.add_blits - and the whole list is then drawn with a single call to Surface.blits, rather than
+    # each object drawing itself.
+    # The objects are kept in draw order between frames. Objects only move a little each frame, so the order rarely
+    # changes, and sorting a list which is already in order or nearly so takes one pass (Python's sort detects runs of
+    # items which are already in order). Objects with the same draw order keep the order they had on the previous frame
+
+    DEBUG_DRAW = DEBUG_SHOW_ANCHOR_POINTS or DEBUG_SHOW_HEALTH_AND_STAMINA or DEBUG_SHOW_HIT_AREA_WIDTH \
+                 or DEBUG_SHOW_LOGS or DEBUG_SHOW_TARGET_POS
+
+    def __init__(self):
+        self.objects = []
+        self.blits = []
+
+    def update_objects(self, objects):
+        # Objects which have been removed since the last frame are dropped, and new ones added on the end before
+        # sorting
+        current = set(objects)
+        if len(current) != len(self.objects) or not current.issuperset(self.objects):
+            kept = [obj for obj in self.objects if obj in current]
+            known = set(kept)
+            kept.extend(obj for obj in objects if obj not in known)
+            self.objects = kept
+        self.objects.sort(key=get_draw_order)
+
+    def draw(self, screen, objects, offset):
+        self.update_objects(objects)
+        blits = self.blits
+        for obj in self.objects:
+            obj.add_blits(blits, offset)
+        screen.surface.blits(blits, doreturn=False)
+        blits.clear()
+
+        # Debug information is drawn on top of all objects, rather than just on top of the object it's for
+        if RenderQueue.DEBUG_DRAW:
+            for obj in self.objects:
+                obj.draw_debug(offset)
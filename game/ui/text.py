@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from pgzero.builtins import images
 
 import pgzero
@@ -14,6 +16,55 @@ font_mikachan = pygame.font.Font("fonts/mikachan-PB.otf", 20)
 font_credits_big = pygame.font.Font("fonts/RiiT_F.otf", 40)
 font_credits = pygame.font.Font("fonts/RiiT_F.otf", 20)
 
+
+class TextSurfaceCache:
+    # Rendering text with a TrueType font is slow, so we keep the surfaces for recently drawn text, keyed on font,
+    # text, colour and style. When the cache is full, the least recently used surface is discarded.
+    # hits and misses count how many requested surfaces were and weren't already in the cache
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, font, text, color, italic=False, bold=False, underline=False):
+        key = (font, text, color, italic, bold, underline)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        font.set_italic(italic)
+        font.set_bold(bold)
+        font.set_underline(underline)
+        surf = font.render(text, True, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def get_stats(self):
+        return {"entries": len(self.surfaces), "hits": self.hits, "misses": self.misses}
+
+
+# Whole lines of text, e.g. boss names and credits
+text_cache = TextSurfaceCache(256)
+
+# Individual characters, for text which changes often such as the score and the intro text, which would otherwise
+# need a new surface for every new string
+glyph_cache = TextSurfaceCache(512)
+
+
+def get_text_cache_stats():
+    return {"text": text_cache.get_stats(), "glyph": glyph_cache.get_stats()}
+
+
 def get_char_image_and_width(char):
     # Return width of given character. ord() gives the ASCII/Unicode code for the given character.
     if char == " ":
@@ -39,10 +90,7 @@ def text_width(text):
     return sum([get_char_image_and_width(c)[1] for c in text])
 
 def draw_text_otf(screen, text, x, y, font=font_mikachan, color= (0,0,0), italic=False, bold=False, underline=False, align="left"):
-    font.set_italic(italic)
-    font.set_bold(bold)
-    font.set_underline(underline)
-    surf = font.render(text, True, color )
+    surf = text_cache.get(font, text, color, italic, bold, underline)
     if align == "center":
         x = x - surf.get_width() // 2
     screen.blit(surf, (x, y))
@@ -63,18 +111,28 @@ def draw_text_scaled(screen, text, X, Y, scale = 1):
             X += width * scale
 
 
-def draw_text(screen, text, x, y, centre=False, font=font_credits_big, color=(255, 255, 255), italic=False, bold=False, underline=False):
+def draw_text(screen, text, x, y, centre=False, font=font_credits_big, color=(255, 255, 255), italic=False, bold=False, underline=False, per_glyph=False):
     # Uses TrueType font rendering (same base logic as draw_text_otf).
-    font.set_italic(italic)
-    font.set_bold(bold)
-    font.set_underline(underline)
-
+    # If per_glyph is True, each character is drawn separately using cached character surfaces. Use this for text
+    # which changes often, so that each new string doesn't need to be rendered and cached
     lines = text.splitlines() if text else [""]
-    line_height = font.size("A")[1] + 4
-    if centre:
-        max_width = max(font.size(line)[0] for line in lines)
-        x -= max_width // 2
+    line_height = font.get_height() + 4
+    if per_glyph:
+        line_glyphs = [[glyph_cache.get(font, char, color, italic, bold, underline) for char in line] for line in lines]
+        line_widths = [sum(glyph.get_width() for glyph in glyphs) for glyphs in line_glyphs]
+    else:
+        line_surfs = [text_cache.get(font, line, color, italic, bold, underline) for line in lines]
+        line_widths = [surf.get_width() for surf in line_surfs]
 
-    for i, line in enumerate(lines):
-        surf = font.render(line, True, color)
-        screen.blit(surf, (x, y + i * line_height))
+    if centre:
+        x -= max(line_widths) // 2
+
+    for i in range(len(lines)):
+        line_y = y + i * line_height
+        if per_glyph:
+            glyph_x = x
+            for glyph in line_glyphs[i]:
+                screen.blit(glyph, (glyph_x, line_y))
+                glyph_x += glyph.get_width()
+        else:
+            screen.blit(line_surfs[i], (x, line_y))
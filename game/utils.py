@@ -1,6 +1,3 @@
-import time
-
-
 def clamp(value, min_val, max_val):
     # Clamp a value within a given range
     return min(max(value, min_val), max_val)
@@ -35,17 +32,3 @@ def move_towards(n, target, speed):
         return max(n - speed, target), -1
     return n, 0
 
-
-class Profiler:
-    # Class for measuring how long code takes to run
-    def __init__(self, name=""):
-        self.start_time = time.perf_counter()
-        self.name = name
-
-    def get_ms(self):
-        end_time = time.perf_counter()
-        diff = end_time - self.start_time
-        return diff * 1000
-
-    def __str__(self):
-        return f"{self.name}: {self.get_ms()}ms"
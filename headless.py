@@ -0,0 +1,58 @@
+# Runs the game without a display or sound, as fast as possible, using a simple computer-controlled player or a
+# recording of a previous game's input. Reports how many simulated frames per second were achieved, which measures the
+# cost of the game logic on its own (nothing is drawn).
+#
+# Usage: python headless.py [--frames N] [--runs N] [--seed N] [--record FILE | --replay FILE]
+
+import argparse
+import sys
+
+from game.controls.AutoControls import AutoControls
+from game.controls.InputRecorder import InputRecorder
+from game.controls.ReplayControls import ReplayControls
+from game.systems.Headless import HeadlessRunner, print_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Masuku no Monogatari without a display")
+    parser.add_argument("--frames", type=int, default=None, help="stop after this many frames (default: play until the game is won or lost)")
+    parser.add_argument("--runs", type=int, default=1, help="number of playthroughs to run")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the game (default: random)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="FILE", help="record the computer player's input to FILE")
+    group.add_argument("--replay", metavar="FILE", help="replay input recorded by the game or by --record")
+    args = parser.parse_args()
+
+    total_frames = 0
+    total_seconds = 0
+    for run in range(args.runs):
+        if args.runs > 1:
+            print(f"Run {run + 1}/{args.runs}")
+
+        seed = args.seed
+        max_frames = args.frames
+        if args.replay:
+            controls = ReplayControls.load(args.replay)
+            seed = controls.seed
+            max_frames = controls.get_frame_count() if max_frames is None else min(max_frames, controls.get_frame_count())
+        elif args.record:
+            controls = InputRecorder(AutoControls())
+        else:
+            controls = AutoControls()
+
+        runner = HeadlessRunner(controls, max_frames=max_frames, seed=seed)
+        results = runner.run()
+        print_results(results)
+        total_frames += results["frames"]
+        total_seconds += results["wall_seconds"]
+
+        if args.record:
+            controls.save(args.record, runner.game.seed)
+            print(f"Saved input recording of {controls.get_frame_count()} frames to {args.record}")
+
+    if args.runs > 1 and total_seconds > 0:
+        print(f"Overall: {total_frames} frames in {total_seconds:.2f}s, {total_frames / total_seconds:.0f} frames/s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
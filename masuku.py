@@ -27,7 +27,9 @@ from pgzero.builtins import images, music, keys
 from game import config
 from game.controls.KeyboardControls import KeyboardControls
 from game.controls.JoystickControls import JoystickControls
+from game.controls.InputRecorder import InputRecorder
 from game.systems.Game import Game
+from game.systems.Presenter import Presenter
 from game.systems.State import State
 from game.ui.text import draw_text, draw_text_otf
 import game.runtime as runtime
@@ -61,6 +63,12 @@ FULLSCREEN = False
 # Virtual surface for resolution-independent rendering
 VIRTUAL_SURFACE = pygame.Surface((LOGICAL_WIDTH, LOGICAL_HEIGHT))
 
+# Scales the virtual surface up to the real one
+presenter = Presenter((LOGICAL_WIDTH, LOGICAL_HEIGHT), config.DISPLAY_SCALE_MODE)
+
+# F9 toggles the frame time overlay
+runtime.instrumentation.overlay_visible = config.DEBUG_PROFILING
+
 def apply_display_mode(fullscreen):
     global DISPLAY_WIDTH, DISPLAY_HEIGHT, WIDTH, HEIGHT, FULLSCREEN
     FULLSCREEN = fullscreen
@@ -100,13 +108,16 @@ def update_controls():
         setup_joystick_controls()
     if joystick_controls is not None:
         joystick_controls.update()
+    if input_recorder is not None:
+        input_recorder.update()
 
 
 # Pygame Zero calls the update and draw functions each frame
 
 def update():
-    global state, game, total_frames, screen, last_state_weather, last_state_music
+    global state, game, total_frames, screen, last_state_weather, last_state_music, input_recorder
 
+    update_start = runtime.instrumentation.begin()
     total_frames += 1
 
     update_controls()
@@ -153,6 +164,11 @@ def update():
         if controls is not None:
             # Switch to play state, and create a new Game object, passing it the controls object which was used to start the game
             state = State.PLAY
+            if RECORD_INPUT_PATH:
+                # The keyboard and joystick controls are already updated every frame, so the recorder mustn't update
+                # them again
+                input_recorder = InputRecorder(controls, update_source=False)
+                controls = input_recorder
             game = Game(controls)
             runtime.set_game(game)
 
@@ -165,6 +181,10 @@ def update():
             # Need to call game.shutdown to turn off scooter engine sound
             game.shutdown()
             state = State.GAME_OVER
+            if input_recorder is not None:
+                input_recorder.save(RECORD_INPUT_PATH, game.seed)
+                print(f"Saved input recording of {input_recorder.get_frame_count()} frames to {RECORD_INPUT_PATH}")
+                input_recorder = None
 
     elif state == State.GAME_OVER:
         if weather is not None and last_state_weather != "game_over":
@@ -200,15 +220,29 @@ def update():
             game = None
             runtime.set_game(game)
             state = State.TITLE
-            
+
+    runtime.instrumentation.end("update", update_start)
+
 
 def on_key_down(key):
     if key == keys.F11:
         apply_display_mode(not FULLSCREEN)
+    elif key == keys.F10:
+        print(f"Display scale mode: {presenter.next_mode()}")
+    elif key == keys.F9:
+        runtime.instrumentation.toggle_overlay()
+    elif key == keys.F8:
+        if runtime.instrumentation.tracing:
+            count = runtime.instrumentation.stop_trace(config.PROFILE_TRACE_PATH)
+            print(f"Saved trace of {count} spans to {config.PROFILE_TRACE_PATH}")
+        else:
+            runtime.instrumentation.start_trace()
+            print("Recording trace, press F8 again to save")
 
 
 def draw():
     global screen
+    draw_start = runtime.instrumentation.begin()
     weather = runtime.get_weather()
 
     real_surface = screen.surface
@@ -248,14 +282,15 @@ def draw():
     elif state == State.CREDITS:
         game.draw(screen)
 
+    runtime.instrumentation.end("draw", draw_start)
+    runtime.instrumentation.draw_overlay(VIRTUAL_SURFACE)
+
     pgzgame.screen = real_game_surface
     screen.surface = real_surface
-    scale = min(DISPLAY_WIDTH / LOGICAL_WIDTH, DISPLAY_HEIGHT / LOGICAL_HEIGHT)
-    scaled_w = int(LOGICAL_WIDTH * scale)
-    scaled_h = int(LOGICAL_HEIGHT * scale)
-    scaled = pygame.transform.smoothscale(VIRTUAL_SURFACE, (scaled_w, scaled_h))
-    real_surface.fill((0, 0, 0))
-    real_surface.blit(scaled, ((DISPLAY_WIDTH - scaled_w) // 2, (DISPLAY_HEIGHT - scaled_h) // 2))
+    present_start = runtime.instrumentation.begin()
+    presenter.present(VIRTUAL_SURFACE, real_surface)
+    runtime.instrumentation.end("present", present_start)
+    runtime.instrumentation.end_frame()
 
 
 ##############################################################################
@@ -276,6 +311,11 @@ except Exception:
 
 total_frames = 0
 last_state_weather = None
+
+# Set the MASUKU_RECORD_INPUT environment variable to a filename to record the input of each game played, which can
+# then be replayed exactly with 'python headless.py --replay <filename>'
+RECORD_INPUT_PATH = os.environ.get("MASUKU_RECORD_INPUT")
+input_recorder = None
 last_state_music = None
 
 # Set up controls